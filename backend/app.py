@@ -1,21 +1,110 @@
-from flask import Flask, redirect
+import os
+import time
+
+from flask import Flask, g, jsonify, redirect, request
 from flask_cors import CORS
-from flasgger import Swagger
+from routers.admin import admin_bp
+from routers.charts import charts_bp
 from routers.health import health_bp
+from routers.jobs import jobs_bp
+from routers.organizations import organizations_bp
+from routers.reports import reports_bp
+from routers.scoring_sessions import scoring_sessions_bp
 from routers.stress_check import stress_check_bp
+from routers.submissions import submissions_bp
+from utils.data_loader import DataLoader
+from utils.json_provider import FastJSONProvider
+from utils.metrics import REGISTRY, REQUEST_LATENCY, REQUEST_SIZE, RESPONSE_SIZE
+
+# Swagger UI at /apidocs (flasgger is imported only when enabled); set SWAGGER_ENABLED=0 in production
+SWAGGER_ENABLED = os.environ.get('SWAGGER_ENABLED', '1').lower() not in ('0', 'false', 'no')
+
+# jsonify/get_json through orjson when installed (utils/json_provider.py); FAST_JSON_ENABLED=0 keeps the stdlib provider
+FAST_JSON_ENABLED = os.environ.get('FAST_JSON_ENABLED', '1').lower() not in ('0', 'false', 'no')
+
+
+# Registration order of the API blueprints
+BLUEPRINTS = (
+    health_bp, stress_check_bp, admin_bp, jobs_bp, organizations_bp, charts_bp, reports_bp,
+    submissions_bp, scoring_sessions_bp,
+)
+
+
+def create_app(swagger=None, fast_json=None, blueprints=None):
+    """
+    Application factory. Routers compile the scoring data when first imported, so calling this
+    in the gunicorn master (preload_app, see gunicorn.conf.py) shares that work with every
+    worker via copy-on-write. Background threads are started separately, see start_background_tasks().
+    :param swagger: Serve the Swagger UI (default: SWAGGER_ENABLED)
+    :param fast_json: Use FastJSONProvider (default: FAST_JSON_ENABLED)
+    :param blueprints: Names of the blueprints to register (default: all, see BLUEPRINTS)
+    """
+    app = Flask(__name__)
+    if FAST_JSON_ENABLED if fast_json is None else fast_json:
+        app.json = FastJSONProvider(app)
+    # Enable CORS for all routes (for development convenience)
+    CORS(app)
+
+    if SWAGGER_ENABLED if swagger is None else swagger:
+        # The spec itself is built from the route docstrings on request, not at startup
+        from flasgger import Swagger
+        Swagger(app)
+        app.add_url_rule('/', 'index', lambda: redirect('/apidocs'))
+    else:
+        app.add_url_rule('/', 'index', lambda: jsonify({"status": "ok"}))
+
+    # Register Blueprints
+    for blueprint in BLUEPRINTS:
+        if blueprints is None or blueprint.name in blueprints:
+            app.register_blueprint(blueprint)
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            # Route template (not the raw path) keeps label cardinality bounded
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            REQUEST_LATENCY.observe(time.perf_counter() - started, request.method, route, response.status_code)
+            if request.content_length:
+                REQUEST_SIZE.observe(request.content_length, route)
+            if response.content_length is not None:
+                RESPONSE_SIZE.observe(response.content_length, route)
+        return response
+
+    return app
+
+
+def start_background_tasks():
+    """
+    Starts per-process background threads. Threads do not survive fork(), so with a preloaded
+    app this runs in each worker (gunicorn post_fork hook) rather than in create_app().
+    """
+    # Optional hot reload: poll the scoring data files (and DATA_RELOAD_DIR) every N seconds
+    if os.environ.get('DATA_RELOAD_INTERVAL'):
+        DataLoader.get_instance().start_watcher(float(os.environ['DATA_RELOAD_INTERVAL']))
+    # With METRICS_DIR, publish this worker's metrics to the other workers' /metrics
+    REGISTRY.start_exporter()
+
+
+_app = None
 
-app = Flask(__name__)
-# Enable CORS for all routes (for development convenience)
-CORS(app)
-swagger = Swagger(app)
 
-# Register Blueprints
-app.register_blueprint(health_bp)
-app.register_blueprint(stress_check_bp)
+def __getattr__(name):
+    # Module-level `app` (gunicorn app:app, flask run, tests) is created on first access,
+    # so importing this module for create_app() does not build a second application.
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+            start_background_tasks()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-@app.route('/')
-def index():
-    return redirect('/apidocs')
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    start_background_tasks()
+    create_app().run(debug=True, port=5000)
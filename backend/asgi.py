@@ -0,0 +1,51 @@
+"""
+Async serving mode for the questionnaire traffic (from backend/):
+    SCORING_SNAPSHOT_FILE=scoring_snapshot.pkl uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers N
+
+Serves the health, stress_check and scoring_sessions blueprints through AsyncWSGIBridge
+(utils/asgi_bridge.py): slow clients are handled on the event loop, and the Flask views
+(the same DiagnosisService as under gunicorn) run in a bounded executor. Admin, jobs,
+reports and the other blueprints stay on the gunicorn deployment (gunicorn.conf.py).
+"""
+import os
+
+# No Swagger UI in production unless asked for
+os.environ.setdefault("SWAGGER_ENABLED", "0")
+
+from app import create_app, start_background_tasks  # noqa: E402
+from utils.asgi_bridge import AsyncWSGIBridge  # noqa: E402
+from utils.metrics import REGISTRY  # noqa: E402
+
+ASGI_BLUEPRINTS = ("health", "stress_check", "scoring_sessions")
+
+# Scoring is CPU-bound and holds the GIL, so threads beyond the CPU count add no throughput
+EXECUTOR_WORKERS = int(os.environ.get("ASGI_EXECUTOR_WORKERS", os.cpu_count() or 1))
+MAX_PENDING = int(os.environ.get("ASGI_MAX_PENDING", 256))
+# Slow clients upload concurrently; their buffered bodies stay within MAX_UPLOADS * MAX_BODY_BYTES
+MAX_UPLOADS = int(os.environ.get("ASGI_MAX_UPLOADS", 1024))
+# Questionnaire requests are about 1 KB; a batch of 7,000 records fits (larger batches belong on gunicorn)
+MAX_BODY_BYTES = int(os.environ.get("ASGI_MAX_BODY_BYTES", 4 * 1024 * 1024))
+
+app = AsyncWSGIBridge(
+    create_app(blueprints=ASGI_BLUEPRINTS),
+    max_workers=EXECUTOR_WORKERS,
+    max_pending=MAX_PENDING,
+    max_body_bytes=MAX_BODY_BYTES,
+    max_uploads=MAX_UPLOADS,
+    inline_paths=("/health-check",),
+    on_startup=start_background_tasks,
+)
+
+REGISTRY.callback(
+    "asgi_pending_requests", "Requests waiting for or running in the scoring executor.", "gauge",
+    lambda: {(): app.pending},
+)
+REGISTRY.callback(
+    "asgi_uploading_requests", "Requests whose bodies are being received.", "gauge",
+    lambda: {(): app.uploading},
+)
+REGISTRY.callback(
+    "asgi_rejected_requests_total", "Requests answered with 503 because the upload or executor limit was reached.",
+    "counter",
+    lambda: {(): app.rejected},
+)
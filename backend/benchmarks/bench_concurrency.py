@@ -0,0 +1,163 @@
+"""
+Concurrent-connection capacity: the sync gunicorn deployment (gunicorn.conf.py) against the
+async serving mode (asgi.py under uvicorn), with the same worker count.
+
+Each simulated respondent opens a connection, sends POST /api/diagnosis, reads the response
+and starts over, for --duration seconds per concurrency level. A --slow-fraction of them are
+slow mobile clients that upload the body in --parts pieces --delay seconds apart; the rest
+send it at once. Results are reported per client kind. A request counts as a timeout when it
+takes longer than --timeout, and as an error on any other failure or non-200/503 status.
+
+Usage (from backend/):
+    python -m benchmarks.bench_concurrency --workers 1 --concurrency 50,200,1000 --output concurrency.json
+    python -m benchmarks.bench_concurrency --servers uvicorn --slow-fraction 0  # fast clients only
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_http import _free_port, _wait_until_ready
+from benchmarks.common import BACKEND_DIR, parse_sizes, random_records, summarize, write_report
+
+SERVERS = ("gunicorn", "uvicorn")
+
+
+def _server_command(server, port, workers):
+    if server == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}",
+                "--workers", str(workers), "--log-level", "warning"]
+    return [sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+
+
+def _request_bytes(port, body):
+    head = (f"POST /api/diagnosis HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode('latin-1')
+    return head, body
+
+
+async def _one_request(port, head, body, parts, delay):
+    """
+    :return: HTTP status of one request, its body uploaded in `parts` pieces
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(head)
+        size = -(-len(body) // parts)
+        for i in range(parts):
+            if i:
+                await asyncio.sleep(delay)
+            writer.write(body[i * size:(i + 1) * size])
+            await writer.drain()
+        response = await reader.read()  # Connection: close, so the body ends at EOF
+    finally:
+        writer.close()
+    status_line = response.split(b"\r\n", 1)[0].split()
+    return int(status_line[1]) if len(status_line) > 1 else 0
+
+
+async def _drive(port, body, concurrency, slow_fraction, duration, parts, delay, timeout):
+    """
+    :return: (wall time, {client kind: (latencies, counts)})
+    """
+    head, body = _request_bytes(port, body)
+    slow_clients = round(concurrency * slow_fraction)
+    kinds = {kind: ([], {"errors": 0, "timeouts": 0, "rejected": 0}) for kind in ("fast", "slow")}
+    deadline = time.perf_counter() + duration
+
+    async def client(kind):
+        latencies, counts = kinds[kind]
+        client_parts = parts if kind == "slow" else 1
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(_one_request(port, head, body, client_parts, delay), timeout)
+            except asyncio.TimeoutError:
+                counts["timeouts"] += 1
+                continue
+            except OSError:
+                counts["errors"] += 1
+                await asyncio.sleep(0.05)  # e.g. connection refused: do not spin
+                continue
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            elif status == 503:
+                counts["rejected"] += 1  # Shed by the async mode's bounded queue
+                await asyncio.sleep(0.05)
+            else:
+                counts["errors"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client("slow" if i < slow_clients else "fast") for i in range(concurrency)))
+    if not slow_clients:
+        del kinds["slow"]
+    return time.perf_counter() - started, kinds
+
+
+def _raise_open_files_limit(concurrency):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = concurrency * 2 + 256
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+
+
+def run(servers, workers, levels, slow_fraction, duration, parts, delay, timeout, seed=0):
+    body = json.dumps(random_records(1, seed=seed)[0]).encode('utf-8')
+    _raise_open_files_limit(max(levels))
+    results = []
+    for server in servers:
+        port = _free_port()
+        process = subprocess.Popen(_server_command(server, port, workers), cwd=BACKEND_DIR,
+                                   env={**os.environ, "WEB_CONCURRENCY": str(workers)})
+        try:
+            _wait_until_ready(port)
+            for concurrency in levels:
+                wall, kinds = asyncio.run(
+                    _drive(port, body, concurrency, slow_fraction, duration, parts, delay, timeout))
+                for kind, (latencies, counts) in kinds.items():
+                    result = {"benchmark": f"{server}:diagnosis:{kind}", "workers": workers,
+                              "concurrency": concurrency, "slow_fraction": slow_fraction, **counts}
+                    if latencies:
+                        result.update(summarize(latencies, wall_time=wall))
+                    else:
+                        result["calls"] = 0
+                    results.append(result)
+                    print(json.dumps(result), file=sys.stderr)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servers', default=",".join(SERVERS),
+                        help=f"Comma-separated servers to compare (default: {','.join(SERVERS)})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes per server")
+    parser.add_argument('--concurrency', type=parse_sizes, default=[50, 200, 1000],
+                        help="Comma-separated concurrent client counts (default: 50,200,1000)")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument('--slow-fraction', type=float, default=0.1, help="Share of slow clients (default: 0.1)")
+    parser.add_argument('--parts', type=int, default=4, help="Pieces a slow client uploads its body in")
+    parser.add_argument('--delay', type=float, default=1.0, help="Seconds between a slow client's body pieces")
+    parser.add_argument('--timeout', type=float, default=10.0, help="Seconds before a request counts as timed out")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    servers = [s for s in args.servers.split(",") if s]
+    unknown = set(servers) - set(SERVERS)
+    if unknown:
+        parser.error(f"Unknown servers: {', '.join(sorted(unknown))}")
+    results = run(servers, args.workers, args.concurrency, args.slow_fraction, args.duration, args.parts,
+                  args.delay, args.timeout, args.seed)
+    write_report("concurrency", results, args.output)
+
+
+if __name__ == '__main__':
+    main()
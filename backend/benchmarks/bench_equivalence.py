@@ -0,0 +1,47 @@
+"""
+Scoring correctness at scale: exhaustive scale-table check plus fuzzing of the compiled
+engine against the reference rules (services/scoring_equivalence.py), with throughput.
+
+Usage (from backend/):
+    python -m benchmarks.bench_equivalence --vectors 5000000 --output equivalence.json
+
+Exits with 1 when any mismatch is found.
+"""
+import argparse
+import sys
+
+from benchmarks.common import write_report
+from services.diagnosis_service import DiagnosisService
+from services.scoring_equivalence import check_scale_tables, fuzz
+
+
+def run(vectors, seed=0):
+    service = DiagnosisService(cache_size=0)
+    tables = check_scale_tables(service)
+    fuzzed = fuzz(service, vectors, seed=seed)
+    return [
+        {
+            "benchmark": "scale_tables",
+            "checked": tables["checked"],
+            "fallback_raw_scores": sum(len(raws) for raws in tables["fallbacks"].values()),
+            "mismatch_count": len(tables["mismatches"]),
+            "mismatches": tables["mismatches"][:10],
+        },
+        {"benchmark": "fuzz", **fuzzed},
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vectors', type=int, default=1_000_000, help="Random answer vectors to fuzz")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    report = write_report("equivalence", run(args.vectors, args.seed), args.output)
+    if any(result["mismatch_count"] for result in report["results"]):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
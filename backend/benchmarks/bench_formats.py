@@ -0,0 +1,66 @@
+"""
+Response size and encode time of the diagnosis result formats (utils/result_formats.py):
+default JSON (jsonify) against compact JSON rows and MessagePack rows, for batches of
+several sizes. Encode time covers the row conversion plus serialization; sizes are
+reported raw and gzip-compressed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_formats --sizes 1,1000,20000 --output formats.json
+"""
+import argparse
+import gzip
+
+from benchmarks.common import parse_sizes, random_records, summarize, time_repeated, write_report
+from services.diagnosis_service import DiagnosisService
+from utils.result_formats import (
+    FORMAT_COMPACT, FORMAT_JSON, FORMAT_MSGPACK, compact_result, format_response, msgpack
+)
+
+
+def encode(results, section_keys, response_format):
+    payload = {"count": len(results), "error_count": 0, "results": results}
+    if response_format != FORMAT_JSON:
+        payload["data_version"] = results[0]["data_version"]
+        payload["results"] = [compact_result(result, section_keys) for result in results]
+    return format_response(payload, response_format).get_data()
+
+
+def run(sizes, seed=0):
+    from app import create_app
+
+    service = DiagnosisService(cache_size=0)
+    section_keys = service.engine.section_keys
+    formats = [FORMAT_JSON, FORMAT_COMPACT] + ([FORMAT_MSGPACK] if msgpack is not None else [])
+    results = []
+    with create_app(swagger=False).app_context():
+        for size in sizes:
+            scored = service.calculate_batch(random_records(size, seed=seed))
+            repeat = max(3, min(200, 200_000 // max(size, 1)))
+            json_bytes = None
+            for response_format in formats:
+                body = encode(scored, section_keys, response_format)
+                latencies = time_repeated(lambda: encode(scored, section_keys, response_format), repeat)
+                result = {"benchmark": f"encode_{response_format}", "respondents": size}
+                result.update(summarize(latencies, items_per_call=size))
+                result["bytes"] = len(body)
+                result["gzip_bytes"] = len(gzip.compress(body, compresslevel=6, mtime=0))
+                if json_bytes is None:
+                    json_bytes = result["bytes"]
+                result["size_vs_json"] = round(result["bytes"] / json_bytes, 4)
+                results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_sizes, default=[1, 1000, 20000],
+                        help="Comma-separated batch sizes (default: 1,1000,20000)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    write_report("formats", run(args.sizes, args.seed), args.output)
+
+
+if __name__ == '__main__':
+    main()
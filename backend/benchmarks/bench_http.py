@@ -0,0 +1,236 @@
+"""
+HTTP load tests for the diagnosis API.
+
+Modes:
+    inprocess  Flask test client, no sockets (isolates Flask/JSON overhead)
+    gunicorn   Starts gunicorn with --workers N and drives it with concurrent keep-alive clients
+    url        Drives an already running server (e.g. --url http://localhost:5000)
+
+Usage (from backend/):
+    python -m benchmarks.bench_http --mode inprocess --sizes 1,1000,100000 --output http.json
+    python -m benchmarks.bench_http --mode gunicorn --workers 4 --concurrency 16 --requests 2000
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.common import (
+    BACKEND_DIR, parse_sizes, random_records, summarize, time_repeated, write_report
+)
+
+# Distinct respondents the single-diagnosis case cycles through, so it measures scoring
+# rather than hits in the individual result cache
+DIAGNOSIS_RECORDS = 2000
+
+
+def _payloads(size, seed):
+    """
+    :return: {case: (method, path, list of payloads sent in rotation)}
+    """
+    records = random_records(size, seed=seed)
+    return {
+        "diagnosis": ("POST", "/api/diagnosis", random_records(DIAGNOSIS_RECORDS, seed=seed + 1)),
+        "batch": ("POST", "/api/diagnosis/batch", [{"records": records}]),
+        "organization": ("POST", "/api/diagnosis/organization", [{"answers_list": [r['answers'] for r in records]}]),
+        "questions": ("GET", "/api/questions", [None]),
+    }
+
+
+def _encode(payloads):
+    return [json.dumps(payload).encode('utf-8') if payload is not None else None for payload in payloads]
+
+
+def _skip_reason(name, size):
+    """
+    :return: Why the case cannot run at this size (the server would answer 400), or None
+    """
+    from routers.stress_check import MAX_BATCH_RECORDS
+
+    if name == "batch" and size > MAX_BATCH_RECORDS:
+        return f"exceeds MAX_BATCH_RECORDS ({MAX_BATCH_RECORDS})"
+    return None
+
+
+def run_inprocess(sizes, requests_per_case, seed=0):
+    from app import app
+
+    client = app.test_client()
+    results = []
+    for size in sizes:
+        for name, (method, path, payloads) in _payloads(size, seed).items():
+            if name in ("diagnosis", "questions") and size != sizes[0]:
+                continue  # Independent of size; measured once
+            skipped = _skip_reason(name, size)
+            if skipped:
+                results.append({"benchmark": f"inprocess:{name}", "respondents": size, "skipped": skipped})
+                continue
+
+            bodies = _encode(payloads)
+            body = bodies[0]
+            rotation = itertools.cycle(bodies)
+            repeat = requests_per_case if name in ("diagnosis", "questions") else max(3, min(50, 100_000 // size))
+
+            def call():
+                response = client.open(path, method=method, data=next(rotation), content_type='application/json')
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}: {response.data[:200]}")
+
+            items = 1 if name in ("diagnosis", "questions") else size
+            result = {"benchmark": f"inprocess:{name}", "respondents": items,
+                      "request_bytes": len(body) if body else 0}
+            result.update(summarize(time_repeated(call, repeat), items_per_call=items))
+            results.append(result)
+    return results
+
+
+def _load_test(host, port, method, path, bodies, total_requests, concurrency):
+    """
+    Sends total_requests requests over `concurrency` keep-alive connections, cycling through bodies.
+    :return: (latencies of the successful requests, wall time, error count)
+    """
+    headers = {"Content-Type": "application/json"} if bodies[0] is not None else {}
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    remaining = [total_requests]
+
+    def worker():
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        local = []
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+                body = bodies[remaining[0] % len(bodies)]
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                ok = False
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=60)
+            if ok:
+                local.append(time.perf_counter() - start)
+            else:
+                with lock:
+                    errors[0] += 1
+        connection.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started, errors[0]
+
+
+def run_remote(base_url, sizes, total_requests, concurrency, seed=0, label="url"):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    results = []
+    for size in sizes:
+        for name, (method, path, payloads) in _payloads(size, seed).items():
+            if name in ("diagnosis", "questions") and size != sizes[0]:
+                continue
+            skipped = _skip_reason(name, size)
+            if skipped:
+                results.append({"benchmark": f"{label}:{name}", "respondents": size, "skipped": skipped})
+                continue
+            bodies = _encode(payloads)
+            body = bodies[0]
+            items = 1 if name in ("diagnosis", "questions") else size
+            # Bulk payloads: fewer requests so large sizes finish in reasonable time
+            count = total_requests if items == 1 else max(concurrency, min(total_requests, 200_000 // size))
+
+            latencies, wall, errors = _load_test(host, port, method, path, bodies, count, concurrency)
+            result = {"benchmark": f"{label}:{name}", "respondents": items, "concurrency": concurrency,
+                      "errors": errors, "request_bytes": len(body) if body else 0}
+            if latencies:
+                # Failed requests are left out: only successful ones count towards latency and throughput
+                result.update(summarize(latencies, items_per_call=items, wall_time=wall))
+            else:
+                result["calls"] = 0
+            if errors:
+                print(f"{label}:{name} n={items}: {errors} of {count} requests failed", file=sys.stderr)
+            results.append(result)
+    return results
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_ready(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health-check")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not become ready")
+
+
+def run_gunicorn(workers, sizes, total_requests, concurrency, seed=0, gunicorn_args=()):
+    port = _free_port()
+    command = [
+        sys.executable, "-m", "gunicorn", "--workers", str(workers),
+        "--bind", f"127.0.0.1:{port}", "--log-level", "warning", *gunicorn_args, "app:app",
+    ]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR)
+    try:
+        _wait_until_ready(port)
+        results = run_remote(f"http://127.0.0.1:{port}", sizes, total_requests, concurrency, seed,
+                             label=f"gunicorn[w={workers}]")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    for result in results:
+        result["workers"] = workers
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['inprocess', 'gunicorn', 'url'], default='inprocess')
+    parser.add_argument('--sizes', type=parse_sizes, default=[1, 1000, 100000],
+                        help="Comma-separated respondent counts for bulk endpoints (default: 1,1000,100000)")
+    parser.add_argument('--requests', type=int, default=1000, help="Requests per single-respondent case")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent connections (gunicorn/url modes)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="gunicorn worker count")
+    parser.add_argument('--url', default='http://localhost:5000', help="Server for --mode url")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.mode == 'inprocess':
+        results = run_inprocess(args.sizes, args.requests, args.seed)
+    elif args.mode == 'gunicorn':
+        results = run_gunicorn(args.workers, args.sizes, args.requests, args.concurrency, args.seed)
+    else:
+        results = run_remote(args.url, args.sizes, args.requests, args.concurrency, args.seed)
+
+    write_report(f"http:{args.mode}", results, args.output)
+
+
+if __name__ == '__main__':
+    main()
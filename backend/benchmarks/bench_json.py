@@ -0,0 +1,96 @@
+"""
+JSON provider comparison: Flask's stdlib DefaultJSONProvider against FastJSONProvider
+(utils/json_provider.py, orjson) on realistic payloads, plus whole requests through the
+Flask test client for the diagnosis endpoints.
+
+- encode_*: provider.response(payload), i.e. what jsonify() does
+- decode_*: provider.loads(body), i.e. what request.get_json() does
+- request_*: POST through create_app(fast_json=False/True) (decode + scoring + encode)
+
+Usage (from backend/):
+    python -m benchmarks.bench_json --sizes 1,1000,20000 --output json.json
+"""
+import argparse
+import json
+
+from benchmarks.common import parse_sizes, random_records, summarize, time_repeated, write_report
+from services.diagnosis_service import DiagnosisService
+from utils.json_provider import fast_json_available
+
+PROVIDERS = ("stdlib", "fast")
+
+
+def _payloads(service, size, seed):
+    records = random_records(size, seed=seed)
+    results = service.calculate_batch(records)
+    answers_list = [r['answers'] for r in records]
+    return {
+        "diagnosis": (
+            {"gender": records[0]['gender'], "answers": records[0]['answers']},
+            results[0],
+        ),
+        "batch": (
+            {"records": records},
+            {"count": len(results), "error_count": 0, "results": results},
+        ),
+        "organization": (
+            {"answers_list": answers_list},
+            service.calculate_organization_distribution(answers_list),
+        ),
+    }
+
+
+def run(sizes, seed=0):
+    from app import create_app
+
+    service = DiagnosisService(cache_size=0)
+    apps = {name: create_app(swagger=False, fast_json=name == "fast") for name in PROVIDERS}
+    routes = {"diagnosis": "/api/diagnosis", "batch": "/api/diagnosis/batch",
+              "organization": "/api/diagnosis/organization?distributions=true"}
+    results = []
+    for size in sizes:
+        payloads = _payloads(service, size, seed)
+        repeat = max(5, min(200, 100_000 // max(size, 1)))
+        for kind, (request_body, response_body) in payloads.items():
+            if kind == "diagnosis" and size != sizes[0]:
+                continue  # Single-respondent payload does not depend on size
+            body = json.dumps(request_body).encode('utf-8')
+            items = 1 if kind == "diagnosis" else size
+            for name, app in apps.items():
+                provider = app.json
+                with app.app_context():
+                    encoded = provider.response(response_body).get_data()
+                    benchmarks = {
+                        "encode": lambda: provider.response(response_body),
+                        "decode": lambda: provider.loads(body),
+                    }
+                    for stage, func in benchmarks.items():
+                        result = {"benchmark": f"{stage}_{kind}", "provider": name, "respondents": items}
+                        result.update(summarize(time_repeated(func, repeat), items_per_call=items))
+                        result["bytes"] = len(encoded) if stage == "encode" else len(body)
+                        results.append(result)
+
+                client = app.test_client()
+                post = lambda: client.post(routes[kind], data=body, content_type='application/json')
+                assert post().status_code == 200
+                result = {"benchmark": f"request_{kind}", "provider": name, "respondents": items}
+                result.update(summarize(time_repeated(post, max(3, repeat // 4)), items_per_call=items))
+                results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_sizes, default=[1, 1000, 20000],
+                        help="Comma-separated respondent counts for the batch/organization payloads (default: 1,1000,20000)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    if not fast_json_available():
+        parser.error("orjson is not installed; both providers would use the stdlib encoder")
+    write_report("json", run(args.sizes, args.seed), args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Throughput of the bulk re-scoring pipeline (services/bulk_rescore.py) by worker count.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rescore --respondents 200000 --workers 1,2,4,8 --output rescore.json
+
+Scaling is bounded by the physical cores available (see environment.cpu_count in the report).
+"""
+import argparse
+import io
+import json
+import time
+
+from benchmarks.common import parse_sizes, random_records, write_report
+from services.bulk_rescore import rescore_stream
+
+
+def run(respondents, worker_counts, seed=0):
+    records = random_records(respondents, seed=seed)
+    body = "".join(json.dumps({"id": i, **record}) + "\n" for i, record in enumerate(records)).encode('utf-8')
+
+    results = []
+    baseline = None
+    for workers in worker_counts:
+        output = io.BytesIO()
+        started = time.perf_counter()
+        count = rescore_stream(io.BytesIO(body), output, workers=workers)
+        elapsed = time.perf_counter() - started
+
+        throughput = count / elapsed
+        baseline = baseline or throughput
+        results.append({
+            "benchmark": "rescore",
+            "respondents": respondents,
+            "workers": workers,
+            "seconds": round(elapsed, 3),
+            "items_per_sec": round(throughput, 2),
+            "speedup": round(throughput / baseline, 2),
+            "output_bytes": len(output.getvalue()),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--respondents', type=int, default=200000)
+    parser.add_argument('--workers', type=parse_sizes, default=[1, 2, 4, 8],
+                        help="Comma-separated worker counts (default: 1,2,4,8)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    write_report("rescore", run(args.respondents, args.workers, args.seed), args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Micro-benchmarks for DiagnosisService at several respondent counts.
+
+Usage (from backend/):
+    python -m benchmarks.bench_service --sizes 1,1000,100000 --output service.json
+"""
+import argparse
+import random
+import shutil
+import tempfile
+
+from benchmarks.common import (
+    parse_sizes, random_records, summarize, time_calls, time_repeated, write_report
+)
+from services.diagnosis_service import DiagnosisService
+from services.response_store import ResponseStore
+from services.scoring_session import ScoringSessionStore
+
+# Single-respondent runs are repeated so percentiles are meaningful
+MIN_CALLS = 200
+
+
+def bench_calculate(service, records):
+    args = [(r['answers'], r['gender']) for r in records]
+    if len(args) < MIN_CALLS:
+        args = (args * MIN_CALLS)[:MIN_CALLS]
+    return summarize(time_calls(service.calculate, args))
+
+
+def bench_calculate_batch(service, records, repeat):
+    latencies = time_repeated(lambda: service.calculate_batch(records), repeat)
+    return summarize(latencies, items_per_call=len(records))
+
+
+def bench_sum_section_answers(service, records):
+    args = [(r['answers'], "B", 29) for r in records]
+    if len(args) < MIN_CALLS:
+        args = (args * MIN_CALLS)[:MIN_CALLS]
+    return summarize(time_calls(service._sum_section_answers, args))
+
+
+def bench_map_score_to_scale(service, count, seed=0):
+    rng = random.Random(seed)
+    scoring_maps = list(service.scoring_maps.values())
+    args = [(rng.randint(0, 44), rng.choice(scoring_maps)) for _ in range(max(count, MIN_CALLS))]
+    return summarize(time_calls(service._map_score_to_scale, args))
+
+
+def bench_session_update(service, records, seed=0):
+    # One answer changed per call, replayed over each respondent's answers
+    rng = random.Random(seed)
+    store = ScoringSessionStore(service)
+    session_id, _ = store.create("male")
+    args = [(session_id, {q_id: answer}) for r in records for q_id, answer in r['answers'].items()]
+    rng.shuffle(args)
+    if len(args) < MIN_CALLS:
+        args = (args * MIN_CALLS)[:MIN_CALLS]
+    return summarize(time_calls(store.update, args[:100_000]))
+
+
+def bench_organization(service, records, repeat):
+    answers_list = [r['answers'] for r in records]
+    latencies = time_repeated(lambda: service.calculate_organization_diagnosis(answers_list), repeat)
+    return summarize(latencies, items_per_call=len(answers_list))
+
+
+def bench_organization_distribution(service, records, repeat):
+    answers_list = [r['answers'] for r in records]
+    latencies = time_repeated(lambda: service.calculate_organization_distribution(answers_list), repeat)
+    return summarize(latencies, items_per_call=len(answers_list))
+
+
+def bench_organization_store(service, store, repeat):
+    latencies = time_repeated(lambda: service.aggregate_organization_store(store), repeat)
+    return summarize(latencies, items_per_call=len(store))
+
+
+def bench_score_store(service, store, repeat):
+    def score_all():
+        for _ in service.score_store(store):
+            pass
+    return summarize(time_repeated(score_all, repeat), items_per_call=len(store))
+
+
+def run(sizes, seed=0):
+    # Result cache off: repeated calls would otherwise measure cache hits, not scoring
+    service = DiagnosisService(cache_size=0)
+    results = []
+    store_dir = tempfile.mkdtemp()
+    for size in sizes:
+        records = random_records(size, seed=seed)
+        store = ResponseStore.create(f"{store_dir}/{size}", [q['id'] for q in service.questions], capacity=size)
+        store.extend(records)
+        # Fewer repetitions for the bulk calls at large sizes
+        repeat = max(3, min(100, 100_000 // max(size, 1)))
+
+        benchmarks = {
+            "calculate": lambda: bench_calculate(service, records),
+            "calculate_batch": lambda: bench_calculate_batch(service, records, repeat),
+            "session_update": lambda: bench_session_update(service, records, seed),
+            "_sum_section_answers": lambda: bench_sum_section_answers(service, records),
+            "_map_score_to_scale": lambda: bench_map_score_to_scale(service, size, seed),
+            "calculate_organization_diagnosis": lambda: bench_organization(service, records, repeat),
+            "calculate_organization_distribution": lambda: bench_organization_distribution(service, records, repeat),
+            "aggregate_organization_store": lambda: bench_organization_store(service, store, repeat),
+            "score_store": lambda: bench_score_store(service, store, repeat),
+        }
+        for name, bench in benchmarks.items():
+            result = {"benchmark": name, "respondents": size}
+            result.update(bench())
+            results.append(result)
+    shutil.rmtree(store_dir)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=parse_sizes, default=[1, 1000, 100000],
+                        help="Comma-separated respondent counts (default: 1,1000,100000)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    write_report("service", run(args.sizes, args.seed), args.output)
+
+
+if __name__ == '__main__':
+    main()
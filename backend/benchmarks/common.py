@@ -0,0 +1,131 @@
+"""
+Shared helpers for the benchmark scripts: timing, percentile summaries, sample data and JSON output.
+"""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Organization diagnosis items (see services/organization_aggregate.AXES)
+AXIS_ITEMS = ["A1", "A2", "A3", "A8", "A9", "A10", "C1", "C2", "C4", "C5", "C7", "C8"]
+
+
+def load_question_ids():
+    from utils.data_loader import DataLoader
+    return [q['id'] for q in DataLoader.get_instance().get_questions()]
+
+
+def random_answers(question_ids, rng):
+    return {q_id: rng.randint(1, 4) for q_id in question_ids}
+
+
+def random_records(count, seed=0):
+    """
+    Deterministic random {"gender", "answers"} records, so runs are comparable between commits.
+    """
+    rng = random.Random(seed)
+    question_ids = load_question_ids()
+    return [
+        {"gender": rng.choice(("male", "female")), "answers": random_answers(question_ids, rng)}
+        for _ in range(count)
+    ]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def summarize(latencies, items_per_call=1, wall_time=None):
+    """
+    Summarizes per-call latencies (seconds).
+    :param items_per_call: Respondents processed per call (for throughput)
+    :param wall_time: Total elapsed time; defaults to the sum of latencies (sequential runs)
+    :return: Dict with latency percentiles in milliseconds and throughput per second
+    """
+    values = sorted(latencies)
+    total = wall_time if wall_time is not None else sum(values)
+    calls = len(values)
+    return {
+        "calls": calls,
+        "items_per_call": items_per_call,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 4),
+        "mean_ms": round(sum(values) / calls * 1000, 4),
+        "calls_per_sec": round(calls / total, 2) if total else None,
+        "items_per_sec": round(calls * items_per_call / total, 2) if total else None,
+    }
+
+
+def time_calls(func, args_list):
+    """
+    Calls func(*args) for every args tuple and returns the per-call latencies.
+    """
+    latencies = []
+    perf_counter = time.perf_counter
+    for args in args_list:
+        start = perf_counter()
+        func(*args)
+        latencies.append(perf_counter() - start)
+    return latencies
+
+
+def time_repeated(func, repeat, min_time=0.0):
+    """
+    Calls func() `repeat` times (or until min_time seconds have elapsed) and returns the latencies.
+    """
+    latencies = []
+    perf_counter = time.perf_counter
+    started = perf_counter()
+    while len(latencies) < repeat or perf_counter() - started < min_time:
+        start = perf_counter()
+        func()
+        latencies.append(perf_counter() - start)
+    return latencies
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_report(suite, results, output=None):
+    """
+    Writes {"suite", "environment", "results"} as JSON to `output` (or stdout).
+    """
+    report = {"suite": suite, "environment": environment(), "results": results}
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return report
+
+
+def parse_sizes(value):
+    return [int(size) for size in value.split(',') if size]
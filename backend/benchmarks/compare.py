@@ -0,0 +1,84 @@
+"""
+Compares two benchmark reports (e.g. from two commits).
+
+Usage (from backend/):
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.15
+
+Exits with status 1 if any p50/p95/p99 latency grew (or throughput dropped) by more than the threshold,
+or if a candidate case had failed requests.
+"""
+import argparse
+import json
+import math
+import sys
+
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+THROUGHPUT_METRIC = "items_per_sec"
+
+
+def _key(result):
+    return (result["benchmark"], result.get("respondents"), result.get("workers"), result.get("concurrency"))
+
+
+def compare(baseline, candidate, threshold):
+    """
+    :return: (rows, regressions) where rows are printable comparison lines
+    """
+    baseline_results = {_key(r): r for r in baseline["results"] if "skipped" not in r}
+    rows = []
+    regressions = []
+    for result in candidate["results"]:
+        if "skipped" in result:
+            continue
+        key = _key(result)
+        before = baseline_results.get(key)
+        if before is None:
+            continue
+
+        # A metric the candidate lacks (e.g. every request failed) counts as an unbounded slowdown
+        changes = {}
+        for metric in LATENCY_METRICS:
+            if before.get(metric):
+                changes[metric] = result[metric] / before[metric] - 1 if result.get(metric) else math.inf
+        if before.get(THROUGHPUT_METRIC):
+            # Positive = slower, to match the latency metrics
+            after = result.get(THROUGHPUT_METRIC)
+            changes[THROUGHPUT_METRIC] = before[THROUGHPUT_METRIC] / after - 1 if after else math.inf
+
+        worst = max(changes.values()) if changes else 0.0
+        label = f"{key[0]} n={key[1]}" + (f" w={key[2]}" if key[2] else "") + (f" c={key[3]}" if key[3] else "")
+        rows.append((label, changes))
+        if worst > threshold or result.get("errors"):
+            regressions.append(label)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="Relative slowdown treated as a regression (default: 0.15 = 15%%)")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding='utf-8') as f:
+        candidate = json.load(f)
+
+    rows, regressions = compare(baseline, candidate, args.threshold)
+
+    print(f"baseline {baseline['environment'].get('commit')} -> candidate {candidate['environment'].get('commit')}")
+    for label, changes in rows:
+        formatted = "  ".join(f"{metric} {change:+.1%}" for metric, change in changes.items())
+        print(f"{label:60s} {formatted}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+        for label in regressions:
+            print(f"  {label}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
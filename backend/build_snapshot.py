@@ -0,0 +1,41 @@
+"""
+Prebuilds the compiled scoring snapshot for fast startup.
+
+Loads questions.json, factor_definitions.json and scoring_maps.json, compiles them the way the
+app does (scoring engine, answer validator, ...), and pickles the result. Point
+SCORING_SNAPSHOT_FILE at the output; it is ignored (with a warning) once the data files or the
+scoring code (utils.data_loader.SNAPSHOT_CODE_FILES) change.
+
+Usage (from backend/):
+    python build_snapshot.py -o scoring_snapshot.pkl
+"""
+import argparse
+import os
+import sys
+import time
+
+# Always compile from the data files, never from an existing snapshot
+os.environ.pop('SCORING_SNAPSHOT_FILE', None)
+
+from app import create_app
+from utils.data_loader import DataLoader
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-o', '--output', default='scoring_snapshot.pkl', help="Snapshot file to write")
+    args = parser.parse_args()
+
+    # Building the app imports every router, which registers every data compiler
+    started = time.perf_counter()
+    create_app(swagger=False)
+    loader = DataLoader.get_instance()
+    loader.save_snapshot(args.output)
+
+    elapsed = time.perf_counter() - started
+    print(f"Wrote scoring snapshot {loader.snapshot.version} ({', '.join(sorted(loader.snapshot.compiled))}) "
+          f"to {args.output} in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
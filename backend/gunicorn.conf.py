@@ -0,0 +1,74 @@
+"""
+Production gunicorn settings (from backend/):
+    python build_snapshot.py -o scoring_snapshot.pkl
+    SCORING_SNAPSHOT_FILE=scoring_snapshot.pkl gunicorn -c gunicorn.conf.py
+
+The app is created once in the master (preload_app) and shared with the workers via
+copy-on-write, so worker boots skip imports, data loading and compilation.
+"""
+import gc
+import os
+import shutil
+import tempfile
+
+wsgi_app = "app:create_app()"
+preload_app = True
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+# No Swagger UI in production unless asked for
+os.environ.setdefault("SWAGGER_ENABLED", "0")
+
+# Reloads reach every worker: each one polls the data files and the reload directory, where
+# POST /api/admin/reload-data requests a data version and the workers report theirs
+os.environ.setdefault("DATA_RELOAD_INTERVAL", "2")
+_reload_dir = None
+if not os.environ.get("DATA_RELOAD_DIR"):
+    _reload_dir = tempfile.mkdtemp(prefix="jp-stress-reload-")
+    os.environ["DATA_RELOAD_DIR"] = _reload_dir
+
+# Live preview sessions are short-lived but must be shared by the workers: unless configured, keep them
+# in a private (0700) directory that is removed when the server exits
+_session_dir = None
+if not os.environ.get("SCORING_SESSION_DB"):
+    _session_dir = tempfile.mkdtemp(prefix="jp-stress-sessions-")
+    os.environ["SCORING_SESSION_DB"] = os.path.join(_session_dir, "sessions.sqlite3")
+
+# /metrics reports the sum over all workers: each one writes its values to a file in this directory
+_metrics_dir = None
+if not os.environ.get("METRICS_DIR"):
+    _metrics_dir = tempfile.mkdtemp(prefix="jp-stress-metrics-")
+    os.environ["METRICS_DIR"] = _metrics_dir
+
+
+def on_starting(server):
+    # Counts of an earlier run in a configured METRICS_DIR would otherwise be added to this one's
+    from utils.metrics import remove_process_files
+    remove_process_files(os.environ["METRICS_DIR"])
+
+
+def pre_fork(server, worker):
+    # Keep the preloaded objects out of the cyclic GC, whose bookkeeping writes would
+    # otherwise copy the shared pages into every worker
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Threads (e.g. the data reload watcher) do not survive fork, so start them per worker
+    from app import start_background_tasks
+    start_background_tasks()
+
+
+def worker_exit(server, worker):
+    # Stop reporting a data version, so reloads do not wait for this worker
+    from utils.data_loader import DataLoader
+    DataLoader.get_instance().stop_watcher()
+    # Keep this worker's final counts in the host-wide metrics
+    from utils.metrics import REGISTRY
+    REGISTRY.stop_exporter()
+
+
+def on_exit(server):
+    for directory in (_reload_dir, _session_dir, _metrics_dir):
+        if directory is not None:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,45 @@
+"""
+Bulk re-scoring of historical respondents (e.g. after the scoring maps changed).
+
+Reads NDJSON records ({"id": ..., "gender": "male", "answers": {"A1": 3, ...}}) and writes one
+NDJSON result per record, in input order, in the /api/diagnosis response shape (plus "id" when
+given). Records are sharded across a process pool; each worker compiles the scoring data once.
+
+Usage (from backend/):
+    python rescore.py respondents.ndjson -o rescored.ndjson --workers 4
+    cat respondents.ndjson | python rescore.py - > rescored.ndjson
+"""
+import argparse
+import os
+import sys
+import time
+
+from services.bulk_rescore import RESCORE_CHUNK_LINES, rescore_stream
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="NDJSON input file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="NDJSON output file (default: stdout)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--chunk-lines', type=int, default=RESCORE_CHUNK_LINES, help="Records per task")
+    args = parser.parse_args()
+
+    input_stream = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    output_stream = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    started = time.perf_counter()
+    try:
+        count = rescore_stream(input_stream, output_stream, args.workers, args.chunk_lines)
+    finally:
+        if input_stream is not sys.stdin.buffer:
+            input_stream.close()
+        if output_stream is not sys.stdout.buffer:
+            output_stream.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Re-scored {count} records in {elapsed:.2f}s ({count / elapsed:.0f}/s) with {args.workers} worker(s)",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import hmac
+import os
+
+from flask import Blueprint, jsonify, request
+from utils.data_loader import DataLoader
+
+admin_bp = Blueprint('admin', __name__)
+
+# Admin endpoints are disabled unless ADMIN_TOKEN is set; requests must send it as X-Admin-Token.
+ADMIN_TOKEN_ENV = 'ADMIN_TOKEN'
+
+# Upper bound for waiting until every worker serves the reloaded data (seconds)
+RELOAD_WAIT_SECONDS = 10
+
+
+def _check_admin_token():
+    expected = os.environ.get(ADMIN_TOKEN_ENV)
+    if not expected:
+        return jsonify({"error": "Admin endpoints are disabled"}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), expected):
+        return jsonify({"error": "Invalid admin token"}), 401
+    return None
+
+@admin_bp.route('/api/admin/reload-data', methods=['POST'])
+def reload_data():
+    """
+    Reload Scoring Data Endpoint
+    Re-reads questions.json, factor_definitions.json and scoring_maps.json and atomically
+    swaps in the new compiled snapshot. In-flight requests finish on the previous version.
+    With DATA_RELOAD_DIR (set by gunicorn.conf.py), every worker of the server switches, and the
+    response waits until they all serve the new version.
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: X-Admin-Token
+        in: header
+        required: true
+        type: string
+      - name: force
+        in: query
+        required: false
+        type: boolean
+        description: Reload even if file modification times did not change.
+    responses:
+      200:
+        description: Reload result
+        schema:
+          type: object
+          properties:
+            reloaded:
+              type: boolean
+            data_version:
+              type: string
+            workers:
+              type: integer
+              description: Workers reporting to DATA_RELOAD_DIR (0 without it)
+            pending_workers:
+              type: integer
+              description: Workers still serving another data version
+      401:
+        description: Invalid admin token
+      403:
+        description: Admin endpoints are disabled (ADMIN_TOKEN not set)
+      500:
+        description: New data failed to load or compile; the previous version stays active
+      503:
+        description: Some workers did not switch within the wait; they keep retrying
+    """
+    error = _check_admin_token()
+    if error:
+        return error
+
+    loader = DataLoader.get_instance()
+    force = request.args.get('force', 'false').lower() in ('1', 'true', 'yes')
+
+    try:
+        reloaded, version = loader.request_reload(force=force)
+    except Exception as e:
+        return jsonify({
+            "error": f"Reload failed: {e}",
+            "data_version": loader.snapshot.version
+        }), 500
+
+    workers, pending = loader.wait_for_workers(version, RELOAD_WAIT_SECONDS)
+    body = {
+        "reloaded": reloaded,
+        "data_version": version,
+        "workers": workers,
+        "pending_workers": pending,
+    }
+    if pending:
+        body["error"] = f"{pending} of {workers} workers still serve another data version"
+        return jsonify(body), 503, {'Retry-After': str(RELOAD_WAIT_SECONDS)}
+    return jsonify(body)
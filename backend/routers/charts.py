@@ -0,0 +1,85 @@
+import os
+
+from flask import Blueprint, Response, jsonify, request
+from services.chart_backgrounds import (
+    CHARTS, COEFFICIENT_SETS, DEFAULT_COEFFICIENT_SET, RenderCache, RendererUnavailable,
+    background_spec, load_coefficient_sets, render_background, spec_key
+)
+
+charts_bp = Blueprint('charts', __name__)
+
+# Extra coefficient sets (e.g. per gender or industry), see load_coefficient_sets()
+if os.environ.get('COEFFICIENT_SETS_FILE'):
+    load_coefficient_sets(os.environ['COEFFICIENT_SETS_FILE'])
+
+render_cache = RenderCache(os.environ.get('CHART_CACHE_DIR') or None)
+
+# Images are content addressed (ETag = spec hash), so clients may revalidate cheaply
+CACHE_CONTROL = "public, max-age=3600"
+
+@charts_bp.route('/api/charts/backgrounds', methods=['GET'])
+def list_backgrounds():
+    """
+    Available Risk Chart Backgrounds
+    ---
+    tags:
+      - Charts
+    responses:
+      200:
+        description: Chart names and coefficient sets
+    """
+    return jsonify({
+        "charts": sorted(CHARTS),
+        "coefficient_sets": sorted(COEFFICIENT_SETS),
+        "default_coefficient_set": DEFAULT_COEFFICIENT_SET,
+    })
+
+@charts_bp.route('/api/charts/backgrounds/<chart>.png', methods=['GET'])
+def get_background(chart):
+    """
+    Risk Contour Chart Background
+    Rendered on demand from the live health-risk coefficients and cached (memory + disk).
+    ---
+    tags:
+      - Charts
+    produces:
+      - image/png
+    parameters:
+      - name: chart
+        in: path
+        required: true
+        type: string
+        enum: [job_stress, support]
+      - name: set
+        in: query
+        required: false
+        type: string
+        description: "Coefficient set (default: default)"
+    responses:
+      200:
+        description: PNG image
+      304:
+        description: Not modified (If-None-Match)
+      404:
+        description: Unknown chart or coefficient set
+      503:
+        description: Chart rendering is not available (matplotlib not installed)
+    """
+    try:
+        try:
+            spec = background_spec(chart, request.args.get('set', DEFAULT_COEFFICIENT_SET))
+        except KeyError:
+            return jsonify({"error": "Unknown chart or coefficient set"}), 404
+
+        key = spec_key(spec)
+        headers = {"ETag": f'"{key}"', "Cache-Control": CACHE_CONTROL}
+        if request.if_none_match.contains(key):
+            return Response(status=304, headers=headers)
+
+        data = render_cache.get(key, lambda: render_background(spec["coefficients"], spec["axis_range"]))
+        return Response(data, mimetype='image/png', headers=headers)
+
+    except RendererUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,4 +1,5 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, jsonify
+from utils.metrics import REGISTRY
 
 health_bp = Blueprint('health', __name__)
 
@@ -19,3 +20,21 @@ def health_check():
               type: string
     """
     return jsonify({"message": "Hello from Flask Backend!"})
+
+@health_bp.route('/metrics')
+def metrics():
+    """
+    Prometheus Metrics Endpoint
+    Request latency histograms per route, per-stage diagnosis timings,
+    payload sizes and batch sizes (Prometheus text format). With METRICS_DIR
+    (set by gunicorn.conf.py), the values are summed over all worker processes.
+    ---
+    tags:
+      - Health
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Metrics in Prometheus text exposition format
+    """
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
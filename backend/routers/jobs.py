@@ -0,0 +1,143 @@
+from flask import Blueprint, jsonify, request
+from services.job_queue import OrganizationJobQueue, QueueFullError
+from utils.stream_readers import STREAM_READERS
+
+jobs_bp = Blueprint('jobs', __name__)
+
+job_queue = OrganizationJobQueue()
+
+# Upper bound for one long poll (seconds)
+MAX_WAIT_SECONDS = 30
+# Suggested client back-off when the queue is full (seconds)
+RETRY_AFTER_SECONDS = 5
+
+@jobs_bp.route('/api/diagnosis/organization/jobs', methods=['POST'])
+def submit_organization_job():
+    """
+    Submit Organization Diagnosis Job
+    Same input as /api/diagnosis/organization (JSON 'answers_list', NDJSON or CSV body).
+    Returns immediately with a job ID; the diagnosis runs in a background process pool.
+    ---
+    tags:
+      - Jobs
+    consumes:
+      - application/json
+      - application/x-ndjson
+      - text/csv
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            answers_list:
+              type: array
+              items:
+                type: object
+                example: {"A1": 1, "A2": 3, "B1": 4}
+    responses:
+      202:
+        description: Job accepted
+        schema:
+          $ref: '#/definitions/OrganizationJob'
+      400:
+        description: Invalid input
+      429:
+        description: Too many pending jobs; retry after the Retry-After header
+    definitions:
+      OrganizationJob:
+        type: object
+        properties:
+          job_id:
+            type: string
+          status:
+            type: string
+            enum: [queued, running, completed, failed]
+          total_chunks:
+            type: integer
+          completed_chunks:
+            type: integer
+          progress:
+            type: number
+            description: Fraction of chunks completed (0-1)
+          respondents:
+            type: integer
+            description: Respondents read so far
+          result:
+            type: object
+            description: Same shape as the /api/diagnosis/organization response (when completed)
+          error:
+            type: string
+    """
+    try:
+        if request.mimetype in STREAM_READERS:
+            data = request.get_data()
+            if not data:
+                return jsonify({"error": "No input data provided"}), 400
+            job = job_queue.submit_stream(request.mimetype, data)
+        else:
+            data = request.get_json()
+            if not data:
+                return jsonify({"error": "No input data provided"}), 400
+
+            answers_list = data.get('answers_list')
+
+            if not answers_list or not isinstance(answers_list, list):
+                return jsonify({"error": "Missing or invalid 'answers_list'"}), 400
+
+            job = job_queue.submit_answers(answers_list)
+
+        response = jsonify(job.to_dict())
+        response.status_code = 202
+        response.headers['Location'] = f"/api/diagnosis/organization/jobs/{job.id}"
+        return response
+
+    except QueueFullError as e:
+        response = jsonify({"error": str(e)})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(RETRY_AFTER_SECONDS)
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@jobs_bp.route('/api/diagnosis/organization/jobs/<job_id>', methods=['GET'])
+def get_organization_job(job_id):
+    """
+    Organization Diagnosis Job Status
+    Poll for progress and the result. With ?wait=N the request blocks up to N seconds
+    (max 30) until the job finishes (long poll).
+    ---
+    tags:
+      - Jobs
+    parameters:
+      - name: job_id
+        in: path
+        required: true
+        type: string
+      - name: wait
+        in: query
+        required: false
+        type: number
+        description: Seconds to wait for completion (long poll)
+    responses:
+      200:
+        description: Job status
+        schema:
+          $ref: '#/definitions/OrganizationJob'
+      404:
+        description: Unknown or expired job
+    """
+    try:
+        try:
+            wait = min(max(float(request.args.get('wait', 0)), 0.0), MAX_WAIT_SECONDS)
+        except ValueError:
+            return jsonify({"error": "'wait' must be a number"}), 400
+
+        job = job_queue.get(job_id, wait)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,148 @@
+import os
+
+from flask import Blueprint, jsonify, request
+from services.diagnosis_service import DiagnosisService
+from services.organization_tracker import ORG_TRACKER_DB, OrganizationTracker
+
+organizations_bp = Blueprint('organizations', __name__)
+
+# Only used for answer validation here, so no result cache
+diagnosis_service = DiagnosisService(cache_size=0)
+
+# Shared by every worker on the host through one SQLite file when ORG_TRACKER_DB is set
+organization_tracker = OrganizationTracker(ORG_TRACKER_DB)
+
+# Journal of earlier versions, imported once into an empty tracker. Not into memory: the journal
+# would be renamed while the imported state vanishes with the process
+if os.environ.get('ORG_TRACKER_JOURNAL'):
+    if ORG_TRACKER_DB == ":memory:":
+        raise RuntimeError("ORG_TRACKER_JOURNAL requires ORG_TRACKER_DB to be set")
+    organization_tracker.import_journal(os.environ['ORG_TRACKER_JOURNAL'])
+
+@organizations_bp.route('/api/organizations/<org_id>/respondents/<respondent_id>', methods=['PUT'])
+def submit_respondent(org_id, respondent_id):
+    """
+    Submit or Amend a Respondent (Live Organization Diagnosis)
+    Adds the respondent to the organization, or replaces their previous answers.
+    The organization result is updated in O(1) and returned; below MIN_GROUP_SIZE
+    respondents it only reports the count.
+    ---
+    tags:
+      - Organizations
+    parameters:
+      - name: org_id
+        in: path
+        required: true
+        type: string
+      - name: respondent_id
+        in: path
+        required: true
+        type: string
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            answers:
+              type: object
+              example: {"A1": 1, "A2": 3, "A3": 2, "A8": 3, "A9": 2, "A10": 1, "C1": 2, "C2": 3, "C4": 2, "C5": 3, "C7": 2, "C8": 3}
+    responses:
+      200:
+        description: Updated organization diagnosis (same shape as /api/diagnosis/organization, or count and suppressed) plus status
+      400:
+        description: Invalid input
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "No input data provided"}), 400
+
+        answers = data.get('answers')
+        if not answers or not isinstance(answers, dict):
+            return jsonify({"error": "Missing or invalid 'answers'"}), 400
+
+        errors = diagnosis_service.validate_answers(answers, allow_unknown=True)
+        if errors:
+            return jsonify({"error": "Invalid answers", "fields": errors}), 400
+
+        try:
+            status = organization_tracker.submit(org_id, respondent_id, answers)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        result = organization_tracker.result(org_id)
+        result["status"] = status
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@organizations_bp.route('/api/organizations/<org_id>/respondents/<respondent_id>', methods=['DELETE'])
+def withdraw_respondent(org_id, respondent_id):
+    """
+    Withdraw a Respondent (Live Organization Diagnosis)
+    ---
+    tags:
+      - Organizations
+    parameters:
+      - name: org_id
+        in: path
+        required: true
+        type: string
+      - name: respondent_id
+        in: path
+        required: true
+        type: string
+    responses:
+      200:
+        description: Updated organization diagnosis
+      404:
+        description: Unknown respondent
+    """
+    try:
+        if not organization_tracker.withdraw(org_id, respondent_id):
+            return jsonify({"error": "Respondent not found"}), 404
+        return jsonify(organization_tracker.result(org_id))
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@organizations_bp.route('/api/organizations/<org_id>/diagnosis', methods=['GET'])
+def get_organization_diagnosis(org_id):
+    """
+    Current Organization Diagnosis (Live)
+    Served from the running aggregate; no recomputation over respondents.
+    Organizations with fewer than min_group_size respondents only report their count
+    ("suppressed": true). min_group_size can only raise the server's floor (MIN_GROUP_SIZE, default 10).
+    ---
+    tags:
+      - Organizations
+    parameters:
+      - name: org_id
+        in: path
+        required: true
+        type: string
+      - name: min_group_size
+        in: query
+        type: integer
+        required: false
+    responses:
+      200:
+        description: Same shape as /api/diagnosis/organization, or count and suppressed
+      400:
+        description: Invalid min_group_size
+      404:
+        description: Organization has no respondents
+    """
+    try:
+        try:
+            result = organization_tracker.result(org_id, request.args.get('min_group_size'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if "error" in result:
+            return jsonify(result), 404
+        return jsonify(result)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
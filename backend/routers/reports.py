@@ -0,0 +1,80 @@
+import io
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from services.diagnosis_service import DiagnosisService
+from services.report_pipeline import generate_report_zip
+from utils.stream_readers import StreamFormatError, iter_ndjson
+
+reports_bp = Blueprint('reports', __name__)
+
+# Reports are generated in bulk, so cached single results would not be reused
+diagnosis_service = DiagnosisService(cache_size=0)
+
+@reports_bp.route('/api/reports/batch', methods=['POST'])
+def generate_reports():
+    """
+    Batch Report Generation
+    Scores every record and returns a ZIP archive with one SVG report per respondent
+    (three spider charts + high-stress verdict) and a summary.csv.
+    The archive is streamed while reports are being generated.
+    ---
+    tags:
+      - Reports
+    consumes:
+      - application/json
+      - application/x-ndjson
+    produces:
+      - application/zip
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            records:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: string
+                    description: Optional respondent ID (used in file names)
+                  gender:
+                    type: string
+                    enum: [male, female]
+                  answers:
+                    type: object
+                    example: {"A1": 1, "A2": 3, "B1": 4}
+    responses:
+      200:
+        description: ZIP archive (reports/*.svg, summary.csv)
+      400:
+        description: Invalid input
+    """
+    try:
+        if request.mimetype == 'application/x-ndjson':
+            data = request.get_data()
+            if not data:
+                return jsonify({"error": "No input data provided"}), 400
+            try:
+                records = list(iter_ndjson(io.BytesIO(data)))
+            except StreamFormatError as e:
+                return jsonify({"error": str(e)}), 400
+        else:
+            data = request.get_json()
+            if not data:
+                return jsonify({"error": "No input data provided"}), 400
+            records = data.get('records')
+
+        if not records or not isinstance(records, list):
+            return jsonify({"error": "Missing or invalid 'records'"}), 400
+
+        return Response(
+            stream_with_context(generate_report_zip(diagnosis_service, records)),
+            mimetype='application/zip',
+            headers={"Content-Disposition": "attachment; filename=reports.zip"},
+        )
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
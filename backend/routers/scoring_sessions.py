@@ -0,0 +1,189 @@
+from flask import Blueprint, jsonify, request
+from services.diagnosis_service import DiagnosisService
+from services.scoring_session import SCORING_SESSION_DB, ScoringSessionStore
+
+scoring_sessions_bp = Blueprint('scoring_sessions', __name__)
+
+# Sessions score incrementally; the result cache is never consulted
+diagnosis_service = DiagnosisService(cache_size=0)
+
+# Shared by every worker on the host through one SQLite file (SCORING_SESSION_DB), so no sticky routing is needed
+scoring_sessions = ScoringSessionStore(diagnosis_service, SCORING_SESSION_DB)
+
+def _answer_errors(answers):
+    # null clears an answer; everything else must be a valid option index
+    if not isinstance(answers, dict):
+        return {"answers": "Must be an object"}
+    return diagnosis_service.validate_answers({q_id: v for q_id, v in answers.items() if v is not None})
+
+def _session_response(session_id, session):
+    result = session.result()
+    result["session_id"] = session_id
+    result["answered"] = len(session.answers)
+    return result
+
+@scoring_sessions_bp.route('/api/diagnosis/sessions', methods=['POST'])
+def create_session():
+    """
+    Start a Live Preview Session
+    Creates a scoring session for incremental answer updates (see PATCH).
+    Unanswered questions count as 0, like a partial /api/diagnosis request.
+    ---
+    tags:
+      - Stress Check
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            gender:
+              type: string
+              enum: [male, female]
+            answers:
+              type: object
+              description: Optional answers given so far
+              example: {"A1": 1, "A2": 3}
+    responses:
+      201:
+        description: Partial result (same shape as /api/diagnosis) plus session_id and answered
+      400:
+        description: Invalid input
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "No input data provided"}), 400
+
+        gender = data.get('gender')
+        answers = data.get('answers') or {}
+        if gender not in ['male', 'female']:
+            return jsonify({"error": "Invalid gender. Must be 'male' or 'female'"}), 400
+
+        errors = _answer_errors(answers)
+        if errors:
+            return jsonify({"error": "Invalid answers", "fields": errors}), 400
+
+        session_id, session = scoring_sessions.create(gender, answers)
+        return jsonify(_session_response(session_id, session)), 201
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@scoring_sessions_bp.route('/api/diagnosis/sessions/<session_id>', methods=['PATCH'])
+def update_session(session_id):
+    """
+    Update Answers of a Live Preview Session
+    Applies single-answer changes. Only the factors that reference the changed questions
+    and their section sums are rescored.
+    ---
+    tags:
+      - Stress Check
+    parameters:
+      - name: session_id
+        in: path
+        required: true
+        type: string
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            answers:
+              type: object
+              description: Changed answers; null clears an answer
+              example: {"A3": 2}
+    responses:
+      200:
+        description: 'Changed chart points by factor ID plus the current summary, e.g. {"changed": {"F-A1": 4}, "result": {"high_stress": false, "summary_scores": {...}}, "answered": 3}'
+      400:
+        description: Invalid input
+      404:
+        description: Unknown or expired session
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "No input data provided"}), 400
+
+        answers = data.get('answers')
+        if not answers or not isinstance(answers, dict):
+            return jsonify({"error": "Missing or invalid 'answers'"}), 400
+
+        errors = _answer_errors(answers)
+        if errors:
+            return jsonify({"error": "Invalid answers", "fields": errors}), 400
+
+        session, changed = scoring_sessions.update(session_id, answers)
+        if session is None:
+            return jsonify({"error": "Session not found"}), 404
+
+        chart_points = dict(zip(session.engine.factor_ids, session.chart_points))
+        return jsonify({
+            "changed": {factor_id: chart_points[factor_id] for factor_id in changed},
+            "result": session.summary(),
+            "answered": len(session.answers),
+            "data_version": session.version,
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@scoring_sessions_bp.route('/api/diagnosis/sessions/<session_id>', methods=['GET'])
+def get_session(session_id):
+    """
+    Current Result of a Live Preview Session
+    ---
+    tags:
+      - Stress Check
+    parameters:
+      - name: session_id
+        in: path
+        required: true
+        type: string
+    responses:
+      200:
+        description: Partial result (same shape as /api/diagnosis) plus session_id and answered
+      404:
+        description: Unknown or expired session
+    """
+    try:
+        session = scoring_sessions.get(session_id)
+        if session is None:
+            return jsonify({"error": "Session not found"}), 404
+        return jsonify(_session_response(session_id, session))
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@scoring_sessions_bp.route('/api/diagnosis/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    """
+    End a Live Preview Session
+    ---
+    tags:
+      - Stress Check
+    parameters:
+      - name: session_id
+        in: path
+        required: true
+        type: string
+    responses:
+      204:
+        description: Session removed
+      404:
+        description: Unknown or expired session
+    """
+    try:
+        if not scoring_sessions.delete(session_id):
+            return jsonify({"error": "Session not found"}), 404
+        return '', 204
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
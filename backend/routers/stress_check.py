@@ -1,10 +1,56 @@
 from flask import Blueprint, jsonify, request
 from services.diagnosis_service import DiagnosisService
+from services.organization_rollup import effective_min_group_size
+from utils.stream_readers import STREAM_READERS, StreamFormatError, iter_csv
+from utils.metrics import BATCH_SIZE, DIAGNOSES, REGISTRY, StageTimer
+from utils.static_response import PrecomputedResponse
+from utils.result_formats import FORMAT_JSON, compact_result, format_response, negotiate_format, result_schema
 
 stress_check_bp = Blueprint('stress_check', __name__)
 
 diagnosis_service = DiagnosisService()
 
+CACHE_EVENTS = ("hits", "misses", "evictions", "expirations", "invalidations")
+REGISTRY.callback(
+    "diagnosis_result_cache_events_total", "Individual result cache events.", "counter",
+    lambda: {(event,): diagnosis_service.result_cache.stats()[event] for event in CACHE_EVENTS},
+    labelnames=("event",),
+)
+REGISTRY.callback(
+    "diagnosis_result_cache_entries", "Entries in the individual result cache.", "gauge",
+    lambda: {(): len(diagnosis_service.result_cache)},
+)
+
+# /api/questions only changes with the scoring data version: serialize (and compress) it
+# once per version. (version, response) is swapped as one tuple, so readers need no lock.
+_questions_response = (None, None)
+
+
+def _get_questions_response():
+    global _questions_response
+    state = diagnosis_service.get_state()
+    version, response = _questions_response
+    if version != state.version:
+        response = PrecomputedResponse(state.questions)
+        _questions_response = (state.version, response)
+    return response
+
+# Same for /api/diagnosis/schema
+_schema_response = (None, None)
+
+
+def _get_schema_response():
+    global _schema_response
+    state = diagnosis_service.get_state()
+    version, response = _schema_response
+    if version != state.version:
+        response = PrecomputedResponse(result_schema(state.engine, state.version))
+        _schema_response = (state.version, response)
+    return response
+
+# Upper bound on records per /api/diagnosis/batch request
+MAX_BATCH_RECORDS = 20000
+
 @stress_check_bp.route('/api/diagnosis', methods=['POST'])
 def diagnose():
     """
@@ -30,6 +76,12 @@ def diagnose():
                 A1: 1
                 A2: 3
                 B1: 4
+      - name: Accept
+        in: header
+        required: false
+        type: string
+        enum: [application/json, application/vnd.jp-stress.compact+json, application/msgpack]
+        description: 'Compact formats return {"data_version", "result": row}; see /api/diagnosis/schema'
     responses:
       200:
         description: Diagnosis result with spider chart data
@@ -68,11 +120,16 @@ def diagnose():
                           type: string
                         score:
                           type: integer
+            data_version:
+              type: string
+              description: Version hash of the scoring data used for this result
       400:
-        description: Invalid input
+        description: 'Invalid input. Invalid answers are reported per question ID, e.g. {"error": "Invalid answers", "fields": {"A99": "Unknown question ID"}}.'
     """
     try:
+        timer = StageTimer("diagnosis")
         data = request.get_json()
+        timer.mark("json_parse")
         if not data:
             return jsonify({"error": "No input data provided"}), 400
             
@@ -85,8 +142,108 @@ def diagnose():
         if gender not in ['male', 'female']:
              return jsonify({"error": "Invalid gender. Must be 'male' or 'female'"}), 400
 
-        result = diagnosis_service.calculate(answers, gender)
-        return jsonify(result)
+        errors = diagnosis_service.validate_answers(answers)
+        if errors:
+            return jsonify({"error": "Invalid answers", "fields": errors}), 400
+
+        result = diagnosis_service.calculate(answers, gender, timer)
+        response_format = negotiate_format(request)
+        if response_format != FORMAT_JSON:
+            section_keys = diagnosis_service.engine.section_keys
+            result = {"data_version": result["data_version"], "result": compact_result(result, section_keys)}
+        response = format_response(result, response_format)
+        timer.mark("serialization")
+        DIAGNOSES.inc(1, "diagnosis")
+        return response
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@stress_check_bp.route('/api/diagnosis/batch', methods=['POST'])
+def diagnose_batch():
+    """
+    JP Job/Stress Batch Diagnosis Endpoint
+    ---
+    tags:
+      - Stress Check
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            records:
+              type: array
+              description: List of individual diagnosis inputs (same shape as /api/diagnosis).
+              items:
+                type: object
+                properties:
+                  gender:
+                    type: string
+                    enum: [male, female]
+                  answers:
+                    type: object
+                    example: {"A1": 1, "A2": 3, "B1": 4}
+      - name: Accept
+        in: header
+        required: false
+        type: string
+        enum: [application/json, application/vnd.jp-stress.compact+json, application/msgpack]
+        description: Compact formats return one row per result plus a top-level data_version; see /api/diagnosis/schema
+    responses:
+      200:
+        description: Diagnosis results in input order. Invalid records are reported inline.
+        schema:
+          type: object
+          properties:
+            count:
+              type: integer
+            error_count:
+              type: integer
+            results:
+              type: array
+              description: 'Same shape as the /api/diagnosis response, or {"error": message} for invalid records.'
+              items:
+                type: object
+      400:
+        description: Invalid input
+    """
+    try:
+        timer = StageTimer("batch")
+        data = request.get_json()
+        timer.mark("json_parse")
+        if not data:
+            return jsonify({"error": "No input data provided"}), 400
+
+        records = data.get('records')
+
+        if not records or not isinstance(records, list):
+            return jsonify({"error": "Missing or invalid 'records'"}), 400
+
+        if len(records) > MAX_BATCH_RECORDS:
+            return jsonify({"error": f"Too many records. Maximum is {MAX_BATCH_RECORDS}"}), 400
+
+        BATCH_SIZE.observe(len(records), "batch")
+        results = diagnosis_service.calculate_batch(records, timer)
+        error_count = sum(1 for r in results if "error" in r)
+
+        payload = {
+            "count": len(results),
+            "error_count": error_count,
+            "results": results
+        }
+        response_format = negotiate_format(request)
+        if response_format != FORMAT_JSON:
+            # calculate_batch() scores every record with one data version
+            section_keys = diagnosis_service.engine.section_keys
+            payload["data_version"] = next((r["data_version"] for r in results if "data_version" in r),
+                                           diagnosis_service.data_version)
+            payload["results"] = [compact_result(result, section_keys) for result in results]
+        response = format_response(payload, response_format)
+        timer.mark("serialization")
+        DIAGNOSES.inc(len(results), "batch")
+        return response
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -95,10 +252,29 @@ def diagnose():
 def diagnose_organization():
     """
     JP Organization Stress Diagnosis Endpoint
+    Accepts a JSON body with 'answers_list', or a streamed body with one respondent per line:
+    NDJSON (Content-Type: application/x-ndjson, one answers object per line) or
+    CSV (Content-Type: text/csv, header row of question IDs). Streamed bodies are folded
+    into running sums line by line, so memory use does not grow with the respondent count.
     ---
     tags:
       - Stress Check
+    consumes:
+      - application/json
+      - application/x-ndjson
+      - text/csv
     parameters:
+      - name: gender
+        in: query
+        required: false
+        type: string
+        enum: [male, female]
+        description: "Gender for streamed (NDJSON/CSV) bodies."
+      - name: distributions
+        in: query
+        required: false
+        type: boolean
+        description: "Also return standard deviations, percentiles and histograms per axis and factor, and the high-stress rate."
       - name: body
         in: body
         required: true
@@ -143,6 +319,130 @@ def diagnose_organization():
                   type: number
                 comprehensive_risk:
                   type: number
+            distributions:
+              type: object
+              description: Only with ?distributions=true
+      400:
+        description: Invalid input
+    """
+    try:
+        answers_list, gender, error = _read_organization_answers()
+        if error:
+            return error
+
+        if request.args.get('distributions', '').lower() in ('1', 'true'):
+            result = diagnosis_service.calculate_organization_distribution(answers_list)
+        else:
+            result = diagnosis_service.calculate_organization_diagnosis(answers_list, gender)
+        
+        if "error" in result:
+             return jsonify(result), 400
+
+        BATCH_SIZE.observe(result["count"], "organization")
+        DIAGNOSES.inc(result["count"], "organization")
+             
+        return jsonify(result)
+
+    except StreamFormatError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@stress_check_bp.route('/api/diagnosis/organization/partial', methods=['POST'])
+def diagnose_organization_partial():
+    """
+    JP Organization Partial Aggregate Endpoint
+    Same input as /api/diagnosis/organization (JSON, NDJSON or CSV), but returns the
+    mergeable aggregate state (axis sums, sums of squares, count) instead of the final risk.
+    Partials from departments, workers or nodes are combined with /api/diagnosis/organization/merge.
+    ---
+    tags:
+      - Stress Check
+    consumes:
+      - application/json
+      - application/x-ndjson
+      - text/csv
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            answers_list:
+              type: array
+              items:
+                type: object
+                example: {"A1": 1, "A2": 3, "B1": 4}
+    responses:
+      200:
+        description: Partial aggregate
+        schema:
+          type: object
+          properties:
+            partial:
+              $ref: '#/definitions/OrganizationPartial'
+      400:
+        description: Invalid input
+    definitions:
+      OrganizationPartial:
+        type: object
+        properties:
+          version:
+            type: integer
+          count:
+            type: integer
+          sums:
+            type: object
+            properties:
+              quantitative_burden:
+                type: number
+              control:
+                type: number
+              supervisor_support:
+                type: number
+              coworker_support:
+                type: number
+          sum_squares:
+            type: object
+            description: Optional. Same keys as sums.
+    """
+    try:
+        answers_list, _, error = _read_organization_answers()
+        if error:
+            return error
+
+        aggregate = diagnosis_service.aggregate_organization(answers_list)
+        return jsonify({"partial": aggregate.to_dict()})
+
+    except StreamFormatError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@stress_check_bp.route('/api/diagnosis/organization/merge', methods=['POST'])
+def merge_organization_partials():
+    """
+    JP Organization Partial Merge Endpoint
+    Combines partial aggregates into the organization diagnosis result
+    without re-sending raw answers.
+    ---
+    tags:
+      - Stress Check
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            partials:
+              type: array
+              items:
+                $ref: '#/definitions/OrganizationPartial'
+    responses:
+      200:
+        description: Organizational diagnosis result (same as /api/diagnosis/organization) plus the merged partial
       400:
         description: Invalid input
     """
@@ -150,29 +450,168 @@ def diagnose_organization():
         data = request.get_json()
         if not data:
             return jsonify({"error": "No input data provided"}), 400
-            
-        answers_list = data.get('answers_list')
-        
-        if not answers_list or not isinstance(answers_list, list):
-             return jsonify({"error": "Missing or invalid 'answers_list'"}), 400
 
-        # Optional gender (defaults to male in service if not handled specially)
-        gender = data.get('gender', 'male')
+        partials = data.get('partials')
+
+        if not partials or not isinstance(partials, list):
+            return jsonify({"error": "Missing or invalid 'partials'"}), 400
+
+        try:
+            merged = diagnosis_service.merge_organization_partials(partials)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        result = merged.result()
 
-        result = diagnosis_service.calculate_organization_diagnosis(answers_list, gender)
-        
         if "error" in result:
-             return jsonify(result), 400
-             
+            return jsonify(result), 400
+
+        result["standard_deviations"] = merged.standard_deviations()
+        result["partial"] = merged.to_dict()
         return jsonify(result)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@stress_check_bp.route('/api/diagnosis/organization/rollup', methods=['POST'])
+def diagnose_organization_rollup():
+    """
+    JP Organization Hierarchy Rollup Endpoint
+    Health risk for every unit of the org tree (company, division, department, team, ...)
+    in a single pass: each respondent counts towards every prefix of its org path.
+    Units with fewer respondents than min_group_size are suppressed (count only), and so
+    is the smallest sibling of a suppressed unit when parent minus siblings would reveal it.
+    min_group_size can only raise the server's floor (MIN_GROUP_SIZE, default 10).
+    Streamed bodies are also accepted: NDJSON (one respondent object per line) or
+    CSV (question ID columns plus an org_path column with "/"-separated unit names).
+    ---
+    tags:
+      - Stress Check
+    consumes:
+      - application/json
+      - application/x-ndjson
+      - text/csv
+    parameters:
+      - name: min_group_size
+        in: query
+        required: false
+        type: integer
+        description: "Minimum respondents per reported unit for streamed bodies (default and floor: MIN_GROUP_SIZE)."
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            respondents:
+              type: array
+              items:
+                type: object
+                properties:
+                  org_path:
+                    type: array
+                    items:
+                      type: string
+                    example: ["Company", "Sales", "Team 1"]
+                  answers:
+                    type: object
+                    example: {"A1": 1, "A2": 3, "B1": 4}
+            min_group_size:
+              type: integer
+              description: "Minimum respondents per reported unit (default and floor: MIN_GROUP_SIZE)."
+    responses:
+      200:
+        description: Results for every org unit, parents before children
+        schema:
+          type: object
+          properties:
+            min_group_size:
+              type: integer
+            skipped:
+              type: integer
+            nodes:
+              type: array
+              items:
+                type: object
+                properties:
+                  path:
+                    type: array
+                    items:
+                      type: string
+                  level:
+                    type: integer
+                  count:
+                    type: integer
+                  suppressed:
+                    type: boolean
+                  averages:
+                    type: object
+                  health_risk:
+                    type: object
+      400:
+        description: Invalid input
+    """
+    try:
+        stream_reader = STREAM_READERS.get(request.mimetype)
+        if stream_reader:
+            respondents = stream_reader(request.stream)
+            if stream_reader is iter_csv:
+                # CSV rows are flat: question ID columns plus an org_path column
+                respondents = ({"org_path": row.get('org_path'), "answers": row} for row in respondents)
+            min_group_size = request.args.get('min_group_size')
+        else:
+            data = request.get_json()
+            if not data:
+                return jsonify({"error": "No input data provided"}), 400
+
+            respondents = data.get('respondents')
+
+            if not respondents or not isinstance(respondents, list):
+                return jsonify({"error": "Missing or invalid 'respondents'"}), 400
+
+            min_group_size = data.get('min_group_size')
+
+        try:
+            min_group_size = effective_min_group_size(min_group_size)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        result = diagnosis_service.calculate_organization_rollup(respondents, min_group_size)
+        return jsonify(result)
+
+    except StreamFormatError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _read_organization_answers():
+    """
+    Reads the respondents of an organization request: a streamed NDJSON/CSV body
+    (parsed lazily) or a JSON body with 'answers_list'.
+    :return: (answers iterable, gender, None) or (None, None, error response)
+    """
+    stream_reader = STREAM_READERS.get(request.mimetype)
+    if stream_reader:
+        return stream_reader(request.stream), request.args.get('gender', 'male'), None
+
+    data = request.get_json()
+    if not data:
+        return None, None, (jsonify({"error": "No input data provided"}), 400)
+
+    answers_list = data.get('answers_list')
+
+    if not answers_list or not isinstance(answers_list, list):
+        return None, None, (jsonify({"error": "Missing or invalid 'answers_list'"}), 400)
+
+    # Optional gender (defaults to male in service if not handled specially)
+    return answers_list, data.get('gender', 'male'), None
+
 @stress_check_bp.route('/api/questions', methods=['GET'])
 def get_questions():
     """
     Get All Survey Questions
+    The payload is serialized once per scoring data version (with gzip/brotli variants).
+    Supports conditional requests: If-None-Match with the returned ETag yields 304.
     ---
     tags:
       - Stress Check
@@ -205,5 +644,25 @@ def get_questions():
                       type: string
                     score:
                       type: integer
+      304:
+        description: Not modified (If-None-Match matched the current ETag)
+    """
+    return _get_questions_response().make_response(request)
+
+@stress_check_bp.route('/api/diagnosis/schema', methods=['GET'])
+def get_result_schema():
+    """
+    Compact Result Schema
+    Row layout of the compact /api/diagnosis and /api/diagnosis/batch formats, with the factor
+    and chart labels they leave out. Built from factor_definitions.json once per scoring data
+    version; supports If-None-Match like /api/questions.
+    ---
+    tags:
+      - Stress Check
+    responses:
+      200:
+        description: '{"data_version", "row": ["high_stress", "sum_a", "sum_b", "sum_c", "F-A1", ...], "factors": [{"id", "label", "chart"}], "charts": [labels], "mimetypes": [...]}'
+      304:
+        description: Not modified (If-None-Match matched the current ETag)
     """
-    return jsonify(diagnosis_service.questions)
+    return _get_schema_response().make_response(request)
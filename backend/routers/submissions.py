@@ -0,0 +1,209 @@
+from flask import Blueprint, jsonify, request
+from services.diagnosis_service import DiagnosisService
+from services.organization_rollup import effective_min_group_size
+from services.submission_store import SUBMISSION_DB, SubmissionStore
+
+submissions_bp = Blueprint('submissions', __name__)
+
+# Submissions are scored in bulk; single-result caching would not be reused
+diagnosis_service = DiagnosisService(cache_size=0)
+
+# Shared by every worker on the host through one SQLite file when SUBMISSION_DB is set; scale columns come from
+# the factor definitions
+submission_store = SubmissionStore(SUBMISSION_DB, factor_ids=diagnosis_service.engine.factor_ids)
+
+# Upper bound for one POST /api/submissions body
+MAX_SUBMISSIONS_PER_REQUEST = 10000
+
+def _filters():
+    return request.args.get('org'), request.args.get('period')
+
+def _min_group_size():
+    return effective_min_group_size(request.args.get('min_group_size'))
+
+@submissions_bp.route('/api/submissions', methods=['POST'])
+def create_submissions():
+    """
+    Record Submissions
+    Scores individual submissions and stores them (with factor scales and the high-stress flag)
+    for later organization, period and high-stress queries. One transaction per request.
+    ---
+    tags:
+      - Submissions
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            submissions:
+              type: array
+              items:
+                type: object
+                properties:
+                  org:
+                    type: string
+                    example: "ACME/Sales"
+                  period:
+                    type: string
+                    example: "2025-H1"
+                  respondent_id:
+                    type: string
+                  gender:
+                    type: string
+                    enum: [male, female]
+                  answers:
+                    type: object
+                    example: {"A1": 1, "A2": 3, "B1": 4}
+    responses:
+      201:
+        description: Number of stored submissions and per-record errors
+      400:
+        description: Invalid input
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "No input data provided"}), 400
+
+        submissions = data.get('submissions')
+        if not submissions or not isinstance(submissions, list):
+            return jsonify({"error": "Missing or invalid 'submissions'"}), 400
+        if len(submissions) > MAX_SUBMISSIONS_PER_REQUEST:
+            return jsonify({"error": f"At most {MAX_SUBMISSIONS_PER_REQUEST} submissions per request"}), 400
+
+        stored, errors = diagnosis_service.store_submissions(submission_store, submissions)
+        return jsonify({"stored": stored, "errors": errors}), 201
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@submissions_bp.route('/api/submissions/organization', methods=['GET'])
+def stored_organization_diagnosis():
+    """
+    Organization Diagnosis from Stored Submissions
+    Selections with fewer than min_group_size submissions only report their count
+    ("suppressed": true). min_group_size can only raise the server's floor (MIN_GROUP_SIZE, default 10).
+    ---
+    tags:
+      - Submissions
+    parameters:
+      - name: org
+        in: query
+        required: false
+        type: string
+        description: Organization path; includes its sub-units
+      - name: period
+        in: query
+        required: false
+        type: string
+      - name: min_group_size
+        in: query
+        required: false
+        type: integer
+    responses:
+      200:
+        description: Same shape as /api/diagnosis/organization, plus standard_deviations and high_stress (or count and suppressed)
+      404:
+        description: No matching submissions
+    """
+    try:
+        org, period = _filters()
+        min_group_size = _min_group_size()
+        aggregate = submission_store.organization_aggregate(org, period)
+        result = aggregate.result()
+        if "error" in result:
+            return jsonify(result), 404
+        high_stress = submission_store.high_stress_counts(org, period, group_by=(), min_group_size=min_group_size)[0]
+        if aggregate.count < min_group_size or high_stress["suppressed"]:
+            return jsonify({"count": aggregate.count, "suppressed": True, "min_group_size": min_group_size})
+        result["standard_deviations"] = aggregate.standard_deviations()
+        result["high_stress"] = high_stress
+        return jsonify(result)
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@submissions_bp.route('/api/submissions/high-stress', methods=['GET'])
+def stored_high_stress_counts():
+    """
+    High-Stress Counts from Stored Submissions
+    Groups with fewer than min_group_size submissions only report their submission count
+    ("suppressed": true), and so does the smallest group next to them when the rest of their
+    total would reveal them. min_group_size can only raise the server's floor (MIN_GROUP_SIZE, default 10).
+    ---
+    tags:
+      - Submissions
+    parameters:
+      - name: org
+        in: query
+        required: false
+        type: string
+      - name: period
+        in: query
+        required: false
+        type: string
+      - name: group_by
+        in: query
+        required: false
+        type: string
+        description: "Comma-separated: org, period (default: org,period; empty for one total)"
+      - name: min_group_size
+        in: query
+        required: false
+        type: integer
+    responses:
+      200:
+        description: Submission and high-stress counts per group
+      400:
+        description: Invalid group_by or min_group_size
+    """
+    try:
+        org, period = _filters()
+        group_by = [name for name in request.args.get('group_by', 'org,period').split(',') if name]
+        return jsonify({"groups": submission_store.high_stress_counts(org, period, group_by, _min_group_size())})
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@submissions_bp.route('/api/submissions/factors', methods=['GET'])
+def stored_factor_distributions():
+    """
+    Factor Scale Distributions from Stored Submissions
+    ---
+    tags:
+      - Submissions
+    parameters:
+      - name: org
+        in: query
+        required: false
+        type: string
+      - name: period
+        in: query
+        required: false
+        type: string
+      - name: min_group_size
+        in: query
+        required: false
+        type: integer
+    responses:
+      200:
+        description: 'Per factor ID, the number of submissions at each scale (1-5): {"F-A1": {"1": 12, ...}}; only count and suppressed below min_group_size'
+    """
+    try:
+        org, period = _filters()
+        min_group_size = _min_group_size()
+        count = submission_store.count(org, period)
+        if 0 < count < min_group_size:
+            return jsonify({"count": count, "suppressed": True, "min_group_size": min_group_size})
+        return jsonify({"factors": submission_store.factor_distributions(org, period)})
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,54 @@
+INT_ONLY = frozenset((int,))
+
+
+class AnswerValidator:
+    """
+    Validates answer dicts ({"A1": 3, ...}) against questions.json, compiled once per data version.
+
+    Valid answers map known question IDs to 1-based option indices (1..number of options).
+    Unanswered questions are allowed. The common case (everything valid) is checked with a
+    few set operations; per-field messages are only built when something is wrong.
+    """
+
+    UNKNOWN_ID = "Unknown question ID"
+
+    def __init__(self, questions):
+        self.option_counts = {q['id']: len(q.get('options', [])) for q in questions}
+        self.question_ids = frozenset(self.option_counts)
+        counts = set(self.option_counts.values())
+        # Shared value domain when every question has the same number of options
+        self.uniform_domain = frozenset(range(1, counts.pop() + 1)) if len(counts) == 1 else None
+
+    def validate(self, answers, allow_unknown=False):
+        """
+        :param allow_unknown: Ignore keys that are not question IDs (e.g. extra CSV columns)
+        :return: None if valid, otherwise a dict of field -> error message
+        """
+        if not isinstance(answers, dict):
+            return {"answers": "Must be an object"}
+
+        if self.uniform_domain is not None:
+            values = answers.values()
+            try:
+                if (self.question_ids.issuperset(answers)
+                        and self.uniform_domain.issuperset(values)
+                        and INT_ONLY.issuperset(map(type, values))):
+                    return None
+            except TypeError:
+                pass  # Unhashable values; reported below
+
+        return self._field_errors(answers, allow_unknown) or None
+
+    def _field_errors(self, answers, allow_unknown):
+        errors = {}
+        option_counts = self.option_counts
+        for q_id, value in answers.items():
+            count = option_counts.get(q_id)
+            if count is None:
+                if not allow_unknown:
+                    errors[str(q_id)] = self.UNKNOWN_ID
+            elif type(value) is not int:
+                errors[q_id] = f"Must be an integer option index (1-{count})"
+            elif not 1 <= value <= count:
+                errors[q_id] = f"Must be between 1 and {count}"
+        return errors
@@ -0,0 +1,93 @@
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Records per pool task: large enough to amortize IPC, small enough to keep workers busy
+RESCORE_CHUNK_LINES = 2000
+
+# Per-process DiagnosisService, created once by the pool initializer
+_worker_service = None
+
+
+def init_worker():
+    """
+    Pool initializer: loads and compiles the scoring data once per worker process.
+    Tasks then only carry raw input lines, never the scoring data itself.
+    """
+    global _worker_service
+    from services.diagnosis_service import DiagnosisService
+    _worker_service = DiagnosisService()
+
+
+def rescore_lines(lines):
+    """
+    Scores a chunk of NDJSON records ({"id"?, "gender", "answers"}).
+    :return: The NDJSON output for the chunk (one result per input line, same order)
+    """
+    if _worker_service is None:
+        init_worker()
+
+    records = []
+    invalid = []
+    for i, line in enumerate(lines):
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            records.append(None)
+            invalid.append(i)
+
+    results = _worker_service.calculate_batch(records)
+    for i in invalid:
+        results[i] = {"error": "Invalid JSON"}
+
+    out = []
+    for record, result in zip(records, results):
+        if isinstance(record, dict) and "id" in record:
+            result = {"id": record["id"], **result}
+        out.append(json.dumps(result, ensure_ascii=False, separators=(",", ":")))
+    out.append("")
+    return "\n".join(out).encode('utf-8')
+
+
+def iter_chunks(stream, chunk_lines=RESCORE_CHUNK_LINES):
+    """
+    Groups the non-blank lines of a binary stream into lists of chunk_lines lines.
+    """
+    lines = (line for line in stream if line.strip())
+    while True:
+        chunk = list(islice(lines, chunk_lines))
+        if not chunk:
+            return
+        yield chunk
+
+
+def rescore_stream(input_stream, output_stream, workers=1, chunk_lines=RESCORE_CHUNK_LINES):
+    """
+    Re-scores every record of an NDJSON stream and writes the results, in input order, as NDJSON.
+    With workers > 1 the chunks are scored in a process pool; at most 2 chunks per worker are
+    in flight, so memory stays bounded regardless of the input size.
+    :return: Number of records written
+    """
+    written = 0
+    chunks = iter_chunks(input_stream, chunk_lines)
+
+    if workers <= 1:
+        for chunk in chunks:
+            output_stream.write(rescore_lines(chunk))
+            written += len(chunk)
+        return written
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            in_flight.append((len(chunk), executor.submit(rescore_lines, chunk)))
+            if len(in_flight) >= 2 * workers:
+                count, future = in_flight.popleft()
+                output_stream.write(future.result())
+                written += count
+        while in_flight:
+            count, future = in_flight.popleft()
+            output_stream.write(future.result())
+            written += count
+    return written
@@ -0,0 +1,237 @@
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from services.organization_aggregate import (
+    COEFF_A, COEFF_B, COEFF_ALPHA, COEFF_BETA, COEFF_C, COEFF_D, COEFF_GAMMA, COEFF_DELTA
+)
+
+# Bump when the drawing code changes, so cached images are not reused
+RENDERER_VERSION = 1
+
+# Chart name -> (coefficient key in a coefficient set, axis range)
+CHARTS = {
+    "job_stress": ("job_stress", (3, 12)),  # Burden (A1-A3) vs Control (A8-A10)
+    "support": ("support", (3, 12)),        # Supervisor (C1/C4/C7) vs Coworker (C2/C5/C8)
+}
+
+# Coefficient sets: name -> {"job_stress": (A, B, alpha, beta), "support": (C, D, gamma, delta)}
+DEFAULT_COEFFICIENT_SET = "default"
+COEFFICIENT_SETS = {
+    DEFAULT_COEFFICIENT_SET: {
+        "job_stress": (COEFF_A, COEFF_B, COEFF_ALPHA, COEFF_BETA),
+        "support": (COEFF_C, COEFF_D, COEFF_GAMMA, COEFF_DELTA),
+    },
+}
+
+FILL_LEVELS = [100, 120, 140, 160, 180, 500]
+FILL_COLORS = ['#FFFFCC', '#FFFF00', '#FFCC99', '#FF9900', '#FF0000']
+LINE_LEVELS = [70, 80, 90, 100, 110, 120, 130, 140, 150, 160, 170, 180]
+
+
+class RendererUnavailable(RuntimeError):
+    """Raised when matplotlib is not installed."""
+
+
+def renderer_available():
+    return importlib.util.find_spec("matplotlib") is not None
+
+
+def _import_matplotlib():
+    """
+    Imports matplotlib on the first render rather than at startup: it is optional (charts
+    extra) and its import takes several hundred milliseconds in every worker.
+    :return: (matplotlib.colors, FigureCanvasAgg, Figure)
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.colors as mcolors
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+    except ImportError:
+        raise RendererUnavailable("matplotlib is not installed")
+    return mcolors, FigureCanvasAgg, Figure
+
+
+def load_coefficient_sets(path):
+    """
+    Adds coefficient sets (e.g. per gender or industry) from a JSON file:
+    {"manufacturing": {"job_stress": [A, B, alpha, beta], "support": [C, D, gamma, delta]}, ...}
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    for name, charts in data.items():
+        coefficient_set = {}
+        for chart in CHARTS:
+            values = charts.get(chart)
+            if not isinstance(values, list) or len(values) != 4:
+                raise ValueError(f"Coefficient set '{name}' needs 4 '{chart}' coefficients")
+            coefficient_set[chart] = tuple(float(v) for v in values)
+        COEFFICIENT_SETS[name] = coefficient_set
+
+
+def render_background(coefficients, axis_range, size_inches=6, dpi=150):
+    """
+    Renders a risk contour background (same drawing as tools/generate_bg.py) to PNG bytes.
+    Risk = 100 * exp((x - A) * alpha + (y - B) * beta)
+    """
+    mcolors, FigureCanvasAgg, Figure = _import_matplotlib()
+
+    A_val, B_val, a_val, b_val = coefficients
+    low, high = axis_range
+
+    # Object-oriented API (no pyplot global state), safe to call from worker threads
+    fig = Figure(figsize=(size_inches, size_inches), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    x = np.linspace(low, high, 200)
+    y = np.linspace(low, high, 200)
+    X, Y = np.meshgrid(x, y)
+    Z = 100 * np.exp((X - A_val) * a_val + (Y - B_val) * b_val)
+
+    cmap = mcolors.ListedColormap(FILL_COLORS)
+    norm = mcolors.BoundaryNorm(FILL_LEVELS, cmap.N)
+    ax.contourf(X, Y, Z, levels=FILL_LEVELS, cmap=cmap, norm=norm, alpha=0.6, extend='max')
+    CS = ax.contour(X, Y, Z, levels=LINE_LEVELS, colors='k', linewidths=0.5, alpha=0.3)
+    ax.clabel(CS, inline=True, fontsize=8, fmt='%d')
+
+    ax.set_xlim(axis_range)
+    ax.set_ylim(axis_range)
+    ax.set_axis_off()
+
+    grid_ticks = [low, low + (high - low) / 3, low + 2 * (high - low) / 3, high]
+    for tick in grid_ticks:
+        style = '-' if tick in (low, high) else '--'
+        ax.axvline(x=tick, color='#888888', alpha=0.5, linewidth=0.5, linestyle=style)
+        ax.axhline(y=tick, color='#888888', alpha=0.5, linewidth=0.5, linestyle=style)
+
+    ax.plot([low, high], [low, low], color='black', linewidth=1)
+    ax.plot([low, high], [high, high], color='black', linewidth=1)
+    ax.plot([low, low], [low, high], color='black', linewidth=1)
+    ax.plot([high, high], [low, high], color='black', linewidth=1)
+
+    fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
+
+    buffer = io.BytesIO()
+    # Fixed metadata keeps the output byte-identical across renders
+    fig.savefig(buffer, format='png', transparent=False, metadata={"Software": None})
+    return buffer.getvalue()
+
+
+def background_spec(chart, coefficient_set=DEFAULT_COEFFICIENT_SET):
+    """
+    Everything that determines the rendered image.
+    :raises KeyError: for unknown charts or coefficient sets
+    """
+    coefficient_key, axis_range = CHARTS[chart]
+    coefficients = COEFFICIENT_SETS[coefficient_set][coefficient_key]
+    return {
+        "renderer": RENDERER_VERSION,
+        "chart": chart,
+        "coefficients": list(coefficients),
+        "axis_range": list(axis_range),
+    }
+
+
+def spec_key(spec):
+    """
+    Content address of a rendering: sha256 over the canonical JSON of its spec.
+    """
+    canonical = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+class RenderCache:
+    """
+    Two-level (memory LRU + disk) cache of rendered images keyed by spec_key().
+
+    Renders are lazy and single-flight: concurrent requests for a missing key wait for
+    one render instead of each starting their own. Disk writes are atomic (rename), so
+    several processes can share the cache directory.
+    """
+
+    def __init__(self, cache_dir=None, max_memory_items=32):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "jp-stress-chart-cache")
+        self.max_memory_items = max_memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> lock held by the rendering thread
+        self.renders = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def _remember(self, key, data):
+        # Caller holds self._lock
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key, render):
+        """
+        :param render: Zero-argument callable producing the image bytes on a miss
+        :return: Image bytes
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                inflight = self._inflight[key] = threading.Lock()
+                inflight.acquire()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # Another thread is loading/rendering this key: wait for it, then read memory
+            with inflight:
+                pass
+            with self._lock:
+                data = self._memory.get(key)
+            if data is not None:
+                return data
+            return self.get(key, render)  # The owner failed; try again
+
+        try:
+            data = self._read_disk(key)
+            if data is None:
+                data = render()
+                self.renders += 1
+                self._write_disk(key, data)
+            with self._lock:
+                self._remember(key, data)
+            return data
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            inflight.release()
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            pass  # Disk cache is best effort; the memory cache still holds the image
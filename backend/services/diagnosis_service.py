@@ -1,17 +1,96 @@
+import os
+from itertools import repeat
+
 from utils.data_loader import DataLoader
-import math
+from utils.result_cache import ResultCache
+from services.answer_validator import AnswerValidator
+from services.scoring_engine import MAX_ANSWER, ScoringEngine
+from services.distribution_stats import DistributionAggregate
+from services.organization_aggregate import OrganizationAggregate, axis_score_matrix
+from services.organization_rollup import (
+    DEFAULT_MIN_GROUP_SIZE, ORG_PATH_SEPARATOR, OrganizationRollup, normalize_org_path
+)
+import numpy as np
+
+# Individual result cache (see DiagnosisService.calculate); RESULT_CACHE_SIZE=0 disables it
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 4096))
+RESULT_CACHE_TTL = float(os.environ['RESULT_CACHE_TTL']) if os.environ.get('RESULT_CACHE_TTL') else None
+
+# Rows per chunk when scoring a ResponseStore (bounds temporary memory)
+STORE_CHUNK_SIZE = 65536
+# Respondents encoded per vectorized step of calculate_organization_distribution
+DISTRIBUTION_CHUNK_SIZE = 4096
+
+
+class ScoringState:
+    """
+    Everything DiagnosisService needs from one DataSnapshot, compiled once per data version.
+    Built by the DataLoader before a new snapshot is published (see DataLoader.register_compiler).
+    """
+
+    def __init__(self, snapshot):
+        self.version = snapshot.version
+        self.factors = snapshot.get('factor_definitions')
+        self.scoring_maps = snapshot.get('scoring_maps')
+        self.questions = snapshot.get('questions')
+
+        # Optimize question lookup
+        self.question_map = {q['id']: q for q in self.questions}
+
+        # Compiled scoring plan (weight matrix + scale lookup tables)
+        self.engine = ScoringEngine(self.questions, self.factors, self.scoring_maps)
+        self.validator = AnswerValidator(self.questions)
+
 
 class DiagnosisService:
-    def __init__(self):
+    # Key of the compiled ScoringState in DataSnapshot.compiled
+    COMPILED_KEY = 'diagnosis'
+
+    def __init__(self, cache_size=RESULT_CACHE_SIZE, cache_ttl=RESULT_CACHE_TTL):
         self.loader = DataLoader.get_instance()
-        self.factors = self.loader.get_factor_definitions()
-        self.scoring_maps = self.loader.get_scoring_maps()
-        self.questions = self.loader.get_questions()
-        
-        # Optimize question lookup
-        self._question_map = {q['id']: q for q in self.questions}
+        self.loader.register_compiler(self.COMPILED_KEY, ScoringState)
+        # Keyed by the packed answer vector + gender; cleared when the data version changes
+        self.result_cache = ResultCache(cache_size, cache_ttl)
 
-    def calculate(self, answers, gender):
+    def get_state(self):
+        """
+        Current compiled scoring state. Fetch it once per computation so a concurrent
+        data reload cannot mix versions; no lock is taken.
+        """
+        return self.loader.snapshot.compiled[self.COMPILED_KEY]
+
+    @property
+    def data_version(self):
+        return self.get_state().version
+
+    @property
+    def factors(self):
+        return self.get_state().factors
+
+    @property
+    def scoring_maps(self):
+        return self.get_state().scoring_maps
+
+    @property
+    def questions(self):
+        return self.get_state().questions
+
+    @property
+    def engine(self):
+        return self.get_state().engine
+
+    @property
+    def _question_map(self):
+        return self.get_state().question_map
+
+    def validate_answers(self, answers, allow_unknown=False):
+        """
+        Checks answers against questions.json (see AnswerValidator.validate).
+        :return: None if valid, otherwise a dict of field -> error message
+        """
+        return self.get_state().validator.validate(answers, allow_unknown)
+
+    def calculate(self, answers, gender, timer=None):
         """
         Calculates stress scores and determines high stress status.
         :param answers: Dict of question ID (e.g., "A1") to score (1-4)
@@ -20,8 +99,59 @@ class DiagnosisService:
                         We allow passing the score directly IF it matches the index context,
                         but to be safe, we should map index -> score from questions.json.
         :param gender: "male" or "female"
-        :return: Dict containing results
+        :param timer: Optional utils.metrics.StageTimer; records validation, factor_scoring
+                      and high_stress_summation stages
+        :return: Dict containing results, including the scoring data version used.
+                 A new dict on every call, also for cached results, so callers may modify it.
         """
+        state = self.get_state()
+        engine = state.engine
+        cache = self.result_cache
+
+        if engine.supports_gender(gender):
+            encoded = engine.encode(answers)
+            if encoded is not None:
+                key = engine.cache_key(encoded, gender) if cache.enabled else None
+                if key is not None:
+                    cached = cache.get(key, state.version)
+                    if cached is not None:
+                        if timer:
+                            timer.mark("validation")
+                        return engine.copy_result(cached)
+                if timer:
+                    timer.mark("validation")
+                chart_points = engine.chart_points_one(encoded, gender)
+                if timer:
+                    timer.mark("factor_scoring")
+                sums, high_stress = engine.section_sums_one(encoded)
+                if timer:
+                    timer.mark("high_stress_summation")
+                result = engine.build_result(chart_points, sums, high_stress)
+                result["data_version"] = state.version
+                if key is not None:
+                    # The cache keeps its own copy: the caller may modify the returned dict
+                    cache.put(key, engine.copy_result(result), state.version)
+                return result
+
+        # Inputs outside the compiled domain (non-int or out-of-range values) keep the
+        # exact behaviour of the reference implementation.
+        if timer:
+            timer.mark("validation")
+        result = self._calculate_reference(answers, gender, state)
+        if timer:
+            # The reference path computes factors and sums together
+            timer.mark("factor_scoring")
+
+        result["data_version"] = state.version
+        return result
+
+    def _calculate_reference(self, answers, gender, state=None):
+        """
+        Reference (uncompiled) implementation of calculate().
+        Walks factor_definitions.json directly; kept as the fallback path and as the
+        parity baseline for the compiled ScoringEngine.
+        """
+        state = state or self.get_state()
         
         # 1. Calculate Factor Scores
         # Note: Factor scoring traditionally uses the *value* associated with the option index directly 
@@ -35,7 +165,7 @@ class DiagnosisService:
         factor_results = {}
 
         for section_key in ["A", "B", "C", "D"]:
-            section_factors = self.factors.get(section_key, {})
+            section_factors = state.factors.get(section_key, {})
             
             for factor_id, factor_def in section_factors.items():
                 raw_score = factor_def.get('base', 0)
@@ -54,7 +184,7 @@ class DiagnosisService:
                 
                 # Map to Scale (1-5)
                 scale_key = factor_def['scales'][gender]
-                scale_map = self.scoring_maps.get(scale_key, {})
+                scale_map = state.scoring_maps.get(scale_key, {})
                 
                 converted_scale = self._map_score_to_scale(raw_score, scale_map)
                 
@@ -77,9 +207,9 @@ class DiagnosisService:
         # Condition 2: (A+C) >= 76 AND B >= 63
         # These totals MUST be the SUM of the "score" value from options, NOT the raw index.
         
-        sum_a = self._sum_section_answers(answers, "A", 17)
-        sum_b = self._sum_section_answers(answers, "B", 29)
-        sum_c = self._sum_section_answers(answers, "C", 9)
+        sum_a = self._sum_section_answers(answers, "A", 17, state.question_map)
+        sum_b = self._sum_section_answers(answers, "B", 29, state.question_map)
+        sum_c = self._sum_section_answers(answers, "C", 9, state.question_map)
         
         is_high_stress = False
         if sum_b >= 77:
@@ -137,6 +267,95 @@ class DiagnosisService:
             ]
         }
 
+    def calculate_batch(self, records, timer=None):
+        """
+        Scores many individual diagnoses at once.
+        Valid records are stacked into one (N x questions) answer matrix and scored by the
+        compiled engine in a single pass; records the engine cannot encode go through calculate().
+        Cached results are reused (see calculate()).
+        :param records: List of {"gender": "male"|"female", "answers": {QID: index}}
+        :param timer: Optional utils.metrics.StageTimer (see calculate())
+        :return: List aligned with records. Each item is a calculate() result, or {"error": message}.
+        """
+        state = self.get_state()
+        engine = state.engine
+        results = [None] * len(records)
+
+        batch_positions = []
+        batch_rows = []
+        batch_genders = []
+        batch_keys = []
+        cache = self.result_cache
+        validator = state.validator
+
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                results[i] = {"error": "Record must be an object"}
+                continue
+
+            gender = record.get('gender')
+            answers = record.get('answers')
+
+            if not gender or not answers:
+                results[i] = {"error": "Missing 'gender' or 'answers'"}
+                continue
+            if gender not in ['male', 'female']:
+                results[i] = {"error": "Invalid gender. Must be 'male' or 'female'"}
+                continue
+            if not isinstance(answers, dict):
+                results[i] = {"error": "'answers' must be an object"}
+                continue
+            errors = validator.validate(answers)
+            if errors:
+                results[i] = {"error": "Invalid answers", "fields": errors}
+                continue
+
+            encoded = engine.encode(answers) if engine.supports_gender(gender) else None
+            if encoded is None:
+                try:
+                    results[i] = self._calculate_reference(answers, gender, state)
+                    results[i]["data_version"] = state.version
+                except Exception as e:
+                    results[i] = {"error": str(e)}
+                continue
+
+            key = engine.cache_key(encoded, gender) if cache.enabled else None
+            if key is not None:
+                cached = cache.get(key, state.version)
+                if cached is not None:
+                    results[i] = engine.copy_result(cached)
+                    continue
+
+            batch_positions.append(i)
+            batch_rows.append(encoded)
+            batch_genders.append(engine.gender_index[gender])
+            batch_keys.append(key)
+
+        if timer:
+            # Includes reference-path records, which are scored while validating
+            timer.mark("validation")
+
+        if batch_rows:
+            answer_matrix = np.stack(batch_rows)
+            _, _, chart_points = engine.score_factors_matrix(answer_matrix, np.asarray(batch_genders, dtype=np.int64))
+            chart_points = chart_points.tolist()
+            if timer:
+                timer.mark("factor_scoring")
+            sums, high_stress = engine.section_sums_matrix(answer_matrix)
+            sums = sums.tolist()
+            high_stress = high_stress.tolist()
+            if timer:
+                timer.mark("high_stress_summation")
+
+            for row, i in enumerate(batch_positions):
+                result = engine.build_result(chart_points[row], sums[row], high_stress[row])
+                result["data_version"] = state.version
+                results[i] = result
+                if batch_keys[row] is not None:
+                    cache.put(batch_keys[row], engine.copy_result(result), state.version)
+
+        return results
+
     def _map_score_to_scale(self, raw_score, scale_map):
         """
         Maps a raw score to a 1-5 scale based on the provided map.
@@ -154,23 +373,25 @@ class DiagnosisService:
         # Fallback
         return 3 
 
-    def _sum_section_answers(self, answers, prefix, count):
+    def _sum_section_answers(self, answers, prefix, count, question_map=None):
         total = 0
         for i in range(1, count + 1):
             key = f"{prefix}{i}"
             user_answer_idx = answers.get(key, 0)
-            score_val = self._get_score_for_answer(key, user_answer_idx)
+            score_val = self._get_score_for_answer(key, user_answer_idx, question_map)
             total += score_val
         return total
         
-    def _get_score_for_answer(self, q_id, answer_index):
+    def _get_score_for_answer(self, q_id, answer_index, question_map=None):
         """
         Retrieves the score for a given question ID and selected answer index (1-4).
         """
         if not answer_index or answer_index < 1 or answer_index > 4:
             return 0
             
-        question = self._question_map.get(q_id)
+        if question_map is None:
+            question_map = self._question_map
+        question = question_map.get(q_id)
         if not question:
             return 0
             
@@ -185,114 +406,209 @@ class DiagnosisService:
         """
         Calculates organizational health risk based on a list of employee answers.
         Uses coefficients derived from standard stress diagnosis graphs (Brief Job Stress Questionnaire).
+        :param answers_list: Any iterable of answer dicts (list, generator over a streamed body, ...).
+                             Respondents are folded into running sums one at a time.
         """
-        
-        # Coefficients (Solved based on regression from standard graph points)
-        # Graph 1 (Job Demand-Control: Burden vs Control)
-        # Risk = 100 * exp((Burden - A)*alpha + (Control - B)*beta)
-        COEFF_A = 8.2500
-        COEFF_B = 7.4688
-        COEFF_ALPHA = 0.07668
-        COEFF_BETA = -0.08896
-
-        # Graph 2 (Social Support: Supervisor vs Coworker)
-        # Risk = 100 * exp((Sup - C)*gamma + (Cow - D)*delta)
-        COEFF_C = 7.3000
-        COEFF_D = 8.2668
-        COEFF_GAMMA = -0.09711
-        COEFF_DELTA = -0.09711 
-        
-        # Accumulators
-        total_quantitative_burden = 0
-        total_control = 0
-        total_supervisor_support = 0
-        total_coworker_support = 0
-        
-        valid_count = 0
-        
+        return self.aggregate_organization(answers_list).result()
+
+    def aggregate_organization(self, answers_list):
+        """
+        Folds answers into a mergeable OrganizationAggregate (partial result for map-reduce).
+        Respondents with invalid answers (see validate_answers) are skipped; keys that are
+        not question IDs (e.g. extra CSV columns) are ignored.
+        """
+        validate = self.get_state().validator.validate
+        aggregate = OrganizationAggregate()
         for answers in answers_list:
-            # 1. Reverse Scoring & Item Selection
-            # Items: A1-A3, A8-A10, C1, C2, C4, C5, C7, C8
-            # Reverse: 1->4, 2->3, 3->2, 4->1 => (5 - val)
-            
-            def get_rev(qid):
-                val = answers.get(qid)
-                if val is None or val < 1 or val > 4:
-                    return None # Invalid or missing
-                return 5 - val
-
-            try:
-                # Axis 1: Quantitative Burden (A1+A2+A3)
-                v_a1 = get_rev("A1")
-                v_a2 = get_rev("A2")
-                v_a3 = get_rev("A3")
-                
-                # Axis 2: Control (A8+A9+A10)
-                v_a8 = get_rev("A8")
-                v_a9 = get_rev("A9")
-                v_a10 = get_rev("A10")
-                
-                # Axis 3: Supervisor Support (C1+C4+C7)
-                v_c1 = get_rev("C1")
-                v_c4 = get_rev("C4")
-                v_c7 = get_rev("C7")
-                
-                # Axis 4: Coworker Support (C2+C5+C8)
-                v_c2 = get_rev("C2")
-                v_c5 = get_rev("C5")
-                v_c8 = get_rev("C8")
-                
-                # Check for None (missing data)
-                if None in [v_a1, v_a2, v_a3, v_a8, v_a9, v_a10, v_c1, v_c4, v_c7, v_c2, v_c5, v_c8]:
-                    continue
+            if validate(answers, allow_unknown=True) is None:
+                aggregate.add(answers)
+        return aggregate
 
-                q_burden = v_a1 + v_a2 + v_a3
-                control = v_a8 + v_a9 + v_a10
-                sup_support = v_c1 + v_c4 + v_c7
-                cow_support = v_c2 + v_c5 + v_c8
-                
-                total_quantitative_burden += q_burden
-                total_control += control
-                total_supervisor_support += sup_support
-                total_coworker_support += cow_support
-                
-                valid_count += 1
-                
-            except TypeError:
+    def calculate_organization_distribution(self, answers_list, chunk_size=DISTRIBUTION_CHUNK_SIZE):
+        """
+        calculate_organization_diagnosis() plus "distributions" (see DistributionAggregate):
+        standard deviations, percentiles and histograms of the four axes and every factor's
+        raw score, and the high-stress rate. Computed in the same single pass over answers_list.
+        """
+        state = self.get_state()
+        validate = state.validator.validate
+        engine = state.engine
+        aggregate = OrganizationAggregate()
+        distribution = DistributionAggregate(engine)
+
+        question_ids = engine.question_ids
+
+        def fold(rows):
+            matrix = np.array(rows, dtype=np.int64)
+            # Validated answers are option indices; drop any the compiled engine cannot score
+            matrix = matrix[(matrix <= MAX_ANSWER).all(axis=1)]
+            scores, valid = axis_score_matrix(matrix, question_ids)
+            aggregate.add_score_matrix(scores[valid])
+            distribution.add_matrix(matrix)
+
+        rows = []
+        for answers in answers_list:
+            if validate(answers, allow_unknown=True) is not None:
                 continue
+            # Same row as ScoringEngine.encode(); the validator already checked the values
+            rows.append(list(map(answers.get, question_ids, repeat(0))))
+            if len(rows) == chunk_size:
+                fold(rows)
+                rows = []
+        if rows:
+            fold(rows)
 
-        if valid_count == 0:
-            return {"error": "No valid data provided for organizational diagnosis"}
-            
-        # 2. Averages
-        avg_burden = total_quantitative_burden / valid_count
-        avg_control = total_control / valid_count
-        avg_sup_support = total_supervisor_support / valid_count
-        avg_cow_support = total_coworker_support / valid_count
-        
-        # 3. Health Risk Calculation
-        # Risk A = 100 * exp((Mean_Burden - A) * alpha + (Mean_Control - B) * beta)
-        term_a = (avg_burden - COEFF_A) * COEFF_ALPHA + (avg_control - COEFF_B) * COEFF_BETA
-        risk_a = 100 * math.exp(term_a)
-        
-        # Risk B = 100 * exp((Mean_Sup - C) * gamma + (Mean_Cow - D) * delta)
-        term_b = (avg_sup_support - COEFF_C) * COEFF_GAMMA + (avg_cow_support - COEFF_D) * COEFF_DELTA
-        risk_b = 100 * math.exp(term_b)
-        
-        # Total Risk
-        total_risk = (risk_a * risk_b) / 100
-        
-        return {
-            "count": valid_count,
-            "averages": {
-                "quantitative_burden": round(avg_burden, 2),
-                "control": round(avg_control, 2),
-                "supervisor_support": round(avg_sup_support, 2),
-                "coworker_support": round(avg_cow_support, 2)
-            },
-            "health_risk": {
-                "work_burden_risk": round(risk_a, 1),
-                "support_risk": round(risk_b, 1),
-                "comprehensive_risk": round(total_risk, 1)
+        result = aggregate.result()
+        if "error" not in result:
+            result["distributions"] = distribution.result()
+        return result
+
+    def aggregate_organization_store(self, store, org_prefix=None, chunk_size=STORE_CHUNK_SIZE):
+        """
+        OrganizationAggregate over a ResponseStore, computed chunk by chunk straight
+        from the memory-mapped columns (no per-respondent dicts).
+        :param org_prefix: Only respondents whose org path starts with this path (list or "/"-string)
+        """
+        org_ids = store.org_ids_under(org_prefix) if org_prefix is not None else None
+        aggregate = OrganizationAggregate()
+        for _, answers, _, orgs in store.iter_chunks(chunk_size):
+            scores, valid = axis_score_matrix(answers, store.question_ids)
+            if org_ids is not None:
+                valid &= np.isin(orgs, org_ids)
+            aggregate.add_score_matrix(scores[valid])
+        return aggregate
+
+    def score_store(self, store, chunk_size=STORE_CHUNK_SIZE):
+        """
+        Scores every respondent of a ResponseStore with the compiled engine, chunk by chunk.
+        Respondents without a stored gender are skipped.
+        :return: Generator of (row indices, ScoringEngine.score_matrix() arrays) per chunk
+        """
+        state = self.get_state()
+        engine = state.engine
+
+        missing = [q_id for q_id in engine.question_ids if q_id not in store.question_index]
+        if missing:
+            raise ValueError(f"Response store is missing questions: {', '.join(missing)}")
+        columns = np.array([store.question_index[q_id] for q_id in engine.question_ids])
+        same_order = np.array_equal(columns, np.arange(len(store.question_ids)))
+
+        # Stored gender code -> engine gender index (-1 = not scorable)
+        gender_lut = np.full(256, -1, dtype=np.int64)
+        for code, gender in enumerate(store.GENDERS):
+            if engine.supports_gender(gender):
+                gender_lut[code] = engine.gender_index[gender]
+
+        for offset, answers, genders, _ in store.iter_chunks(chunk_size):
+            gender_indices = gender_lut[genders]
+            rows = np.flatnonzero(gender_indices >= 0)
+            matrix = answers if same_order else answers[:, columns]
+            if len(rows) < len(answers):
+                matrix, gender_indices = matrix[rows], gender_indices[rows]
+            yield offset + rows, engine.score_matrix(matrix, gender_indices)
+
+    def store_submissions(self, store, records):
+        """
+        Scores individual submissions in one vectorized pass and records them in a
+        SubmissionStore (single batched transaction).
+        :param records: List of {"org": path, "period": str, "respondent_id"?: str,
+                        "gender": "male"|"female", "answers": {QID: index}}
+        :return: (number stored, list of {"index", "error"[, "fields"]} for rejected records)
+        """
+        state = self.get_state()
+        engine = state.engine
+        validator = state.validator
+        errors = []
+        accepted = []
+        rows = []
+
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                errors.append({"index": i, "error": "Record must be an object"})
+                continue
+            org_path = normalize_org_path(record.get('org'))
+            period = record.get('period')
+            gender = record.get('gender')
+            answers = record.get('answers')
+            if org_path is None:
+                errors.append({"index": i, "error": "Missing or invalid 'org'"})
+                continue
+            if not isinstance(period, str) or not period.strip():
+                errors.append({"index": i, "error": "Missing or invalid 'period'"})
+                continue
+            if not engine.supports_gender(gender):
+                errors.append({"index": i, "error": "Invalid gender. Must be 'male' or 'female'"})
+                continue
+            if not isinstance(answers, dict) or not answers:
+                errors.append({"index": i, "error": "Missing or invalid 'answers'"})
+                continue
+            fields = validator.validate(answers)
+            encoded = engine.encode(answers) if fields is None else None
+            if encoded is None:
+                errors.append({"index": i, "error": "Invalid answers", "fields": fields or {}})
+                continue
+            respondent = record.get('respondent_id')
+            accepted.append((ORG_PATH_SEPARATOR.join(org_path), period.strip(), gender,
+                             None if respondent is None else str(respondent)))
+            rows.append(encoded)
+
+        if not rows:
+            return 0, errors
+
+        matrix = np.stack(rows)
+        gender_indices = np.array([engine.gender_index[gender] for _, _, gender, _ in accepted], dtype=np.int64)
+        scored = engine.score_matrix(matrix, gender_indices)
+        axes, axes_valid = axis_score_matrix(matrix, engine.question_ids)
+        scales = scored["scale"].tolist()
+        sums = scored["sums"].tolist()
+        high_stress = scored["high_stress"].tolist()
+        axes = axes.tolist()
+        answers = matrix.astype(np.uint8)
+
+        submissions = (
+            {
+                "org": org, "period": period, "respondent": respondent, "gender": gender,
+                "high_stress": high_stress[row], "sums": sums[row],
+                "axes": axes[row] if axes_valid[row] else None,
+                "answers": answers[row].tobytes(), "data_version": state.version,
+                "scales": scales[row],
             }
+            for row, (org, period, gender, respondent) in enumerate(accepted)
+        )
+        return store.insert_many(submissions, engine.factor_ids), errors
+
+    def merge_organization_partials(self, partials):
+        """
+        Combines serialized partial aggregates (OrganizationAggregate.to_dict()) into one.
+        :raises ValueError: if any partial is malformed
+        """
+        merged = OrganizationAggregate()
+        for partial in partials:
+            merged.merge(OrganizationAggregate.from_dict(partial))
+        return merged
+
+    def calculate_organization_rollup(self, respondents, min_group_size=DEFAULT_MIN_GROUP_SIZE):
+        """
+        Organization diagnosis for every unit of the org hierarchy in a single pass.
+        :param respondents: Iterable of {"org_path": ["Company", "Division", "Team"], "answers": {...}}
+                            (org_path may also be a "/"-separated string)
+        :param min_group_size: Units with fewer valid respondents are suppressed
+        :return: Dict with the org nodes (parents first) and the number of skipped respondents
+        """
+        validate = self.get_state().validator.validate
+        rollup = OrganizationRollup()
+        for respondent in respondents:
+            if not isinstance(respondent, dict):
+                rollup.skipped += 1
+                continue
+            answers = respondent.get('answers')
+            if validate(answers, allow_unknown=True) is not None:
+                rollup.skipped += 1
+                continue
+            rollup.add(respondent.get('org_path'), answers)
+
+        return {
+            "min_group_size": min_group_size,
+            "skipped": rollup.skipped,
+            "nodes": rollup.nodes(min_group_size)
         }
@@ -0,0 +1,135 @@
+import math
+
+import numpy as np
+
+from services.organization_aggregate import AXES, AXIS_KEYS, AXIS_MAX, AXIS_MIN, axis_score_matrix
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def histogram_stats(values, counts):
+    """
+    Summary statistics of an exact histogram (counts[i] observations of values[i], values ascending).
+    Percentiles use linear interpolation between order statistics (same as numpy.percentile).
+    :return: Dict with count, mean, std (population), min, max and percentiles, or {"count": 0}
+    """
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.int64)
+    n = int(counts.sum())
+    if n == 0:
+        return {"count": 0}
+
+    mean = float((values * counts).sum() / n)
+    variance = float(((values - mean) ** 2 * counts).sum() / n)
+    present = np.flatnonzero(counts)
+    # cumulative[i] = number of observations <= values[i]; order statistic k lives at searchsorted(k, 'right')
+    cumulative = np.cumsum(counts)
+
+    def order_statistic(k):
+        return float(values[np.searchsorted(cumulative, k, side='right')])
+
+    percentiles = {}
+    for p in PERCENTILES:
+        position = (n - 1) * p / 100
+        lower = math.floor(position)
+        low_value = order_statistic(lower)
+        high_value = order_statistic(min(lower + 1, n - 1))
+        percentiles[f"p{p}"] = round(low_value + (high_value - low_value) * (position - lower), 2)
+
+    return {
+        "count": n,
+        "mean": round(mean, 2),
+        "std": round(math.sqrt(variance), 2),
+        "min": int(values[present[0]]),
+        "max": int(values[present[-1]]),
+        "percentiles": percentiles,
+    }
+
+
+class DistributionAggregate:
+    """
+    One-pass distribution statistics for an organization: exact histograms of the four axis
+    sums (3..12) and of every factor's raw score, plus the high-stress count.
+
+    All tracked values are small integers, so a histogram is a sufficient statistic: means,
+    standard deviations and percentiles come out exact (no sorting, no second pass), and
+    histograms add up, so partial aggregates merge exactly.
+
+    Respondents enter per factor only when every item of that factor is answered, and into
+    the high-stress rate only when the whole questionnaire is answered.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.axis_counts = np.zeros((len(AXES), AXIS_MAX - AXIS_MIN + 1), dtype=np.int64)
+        self.factor_offsets = engine.raw_min
+        width = int((engine.raw_max - engine.raw_min).max()) + 1
+        self.factor_counts = np.zeros((len(engine.factor_ids), width), dtype=np.int64)
+        # Question x factor mask: which answers each factor needs
+        self._factor_items = (engine.weights != 0).T.astype(np.int64)
+        self.complete = 0
+        self.high_stress = 0
+
+    def add_matrix(self, answer_matrix):
+        """
+        Folds an (N x questions) matrix of encoded answers (ScoringEngine.encode rows) in.
+        """
+        answer_matrix = np.asarray(answer_matrix, dtype=np.int64)
+        if not len(answer_matrix):
+            return
+        engine = self.engine
+
+        scores, valid = axis_score_matrix(answer_matrix, engine.question_ids)
+        scores = scores[valid] - AXIS_MIN
+        width = self.axis_counts.shape[1]
+        axis_cells = scores + np.arange(len(AXES)) * width
+        self.axis_counts += np.bincount(axis_cells.ravel(), minlength=self.axis_counts.size).reshape(self.axis_counts.shape)
+
+        raw = answer_matrix @ engine.weights.T + engine.bases
+        answered = ((answer_matrix == 0).astype(np.int64) @ self._factor_items) == 0
+        width = self.factor_counts.shape[1]
+        factor_cells = raw - self.factor_offsets + np.arange(len(engine.factor_ids)) * width
+        self.factor_counts += np.bincount(factor_cells[answered], minlength=self.factor_counts.size).reshape(self.factor_counts.shape)
+
+        complete = answer_matrix.all(axis=1)
+        if complete.any():
+            _, high_stress = engine.section_sums_matrix(answer_matrix[complete])
+            self.complete += int(complete.sum())
+            self.high_stress += int(high_stress.sum())
+
+    def merge(self, other):
+        """
+        Merges another aggregate built from the same engine (in place).
+        :return: self
+        """
+        self.axis_counts += other.axis_counts
+        self.factor_counts += other.factor_counts
+        self.complete += other.complete
+        self.high_stress += other.high_stress
+        return self
+
+    def result(self):
+        axes = {}
+        axis_values = np.arange(AXIS_MIN, AXIS_MAX + 1)
+        for key, counts in zip(AXIS_KEYS, self.axis_counts):
+            stats = histogram_stats(axis_values, counts)
+            stats["histogram"] = {str(v): int(c) for v, c in zip(axis_values.tolist(), counts.tolist())}
+            axes[key] = stats
+
+        factors = {}
+        width = self.factor_counts.shape[1]
+        for f, factor_id in enumerate(self.engine.factor_ids):
+            values = np.arange(width) + int(self.factor_offsets[f])
+            stats = histogram_stats(values, self.factor_counts[f])
+            stats["label"] = self.engine.factor_labels[f]
+            factors[factor_id] = stats
+
+        return {
+            "axes": axes,
+            "factors": factors,
+            "high_stress": {
+                "respondents": self.complete,
+                "count": self.high_stress,
+                "rate": round(self.high_stress / self.complete, 4) if self.complete else None,
+            },
+        }
@@ -0,0 +1,433 @@
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so every process runs a pool (a chunk's first result wins)
+    fcntl = None
+
+from services.answer_validator import AnswerValidator
+from services.organization_aggregate import OrganizationAggregate
+from utils.data_loader import DataLoader
+from utils.sqlite_files import ensure_private_file
+from utils.stream_readers import STREAM_READERS, iter_csv
+
+logger = logging.getLogger(__name__)
+
+# Pool size and backpressure, overridable via environment variables
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', min(2, os.cpu_count() or 1)))
+JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', 8))
+# Respondents per chunk (JSON bodies) / bytes per chunk (NDJSON, CSV bodies)
+JOB_CHUNK_RESPONDENTS = 10000
+JOB_CHUNK_BYTES = 4 * 1024 * 1024
+# Seconds finished jobs stay available for polling
+JOB_RESULT_TTL = 600
+# SQLite file shared by all workers on a host: job records, queued chunks and partial results (mode 0600)
+JOB_DB = os.environ.get('JOB_DB') or os.path.join(tempfile.gettempdir(), "jp-stress-jobs.sqlite3")
+# Seconds between database checks (dispatcher, long polls) and between runner lock attempts
+JOB_POLL_INTERVAL = 0.1
+JOB_LOCK_RETRY = 1.0
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total_chunks INTEGER NOT NULL,
+    completed_chunks INTEGER NOT NULL DEFAULT 0,
+    respondents INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_chunks (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    mimetype TEXT NOT NULL,
+    -- Chunk body until it is aggregated, then the partial (OrganizationAggregate.to_dict() JSON)
+    data BLOB,
+    partial TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+ACTIVE = f"('{STATUS_QUEUED}', '{STATUS_RUNNING}')"
+
+
+class QueueFullError(Exception):
+    """Raised when too many jobs are queued or running."""
+
+
+# Per-process answer validator for pool tasks: (data version, AnswerValidator). Pool processes do not
+# reload the data files themselves, so each task carries the questions the dispatching process serves
+_worker_validator = (None, None)
+
+
+def _validator(data_version, questions):
+    global _worker_validator
+    if _worker_validator[0] != data_version:
+        _worker_validator = (data_version, AnswerValidator(questions))
+    return _worker_validator[1]
+
+
+def _aggregate(answers_iter, data_version, questions):
+    # Same filtering as DiagnosisService.aggregate_organization()
+    validate = _validator(data_version, questions).validate
+    aggregate = OrganizationAggregate()
+    count = 0
+    for answers in answers_iter:
+        if validate(answers, allow_unknown=True) is None:
+            aggregate.add(answers)
+        count += 1
+    return aggregate.to_dict(), count
+
+
+def aggregate_stream_chunk(mimetype, data, data_version, questions):
+    """
+    Pool task: parses an NDJSON/CSV chunk (CSV chunks start with the header row) and aggregates it.
+    Parsing happens in the worker process, not in the web worker.
+    :param data_version: Version of the scoring data `questions` belong to (the validator is rebuilt when it changes)
+    :return: (OrganizationAggregate.to_dict(), respondents read)
+    """
+    return _aggregate(STREAM_READERS[mimetype](io.BytesIO(data)), data_version, questions)
+
+
+def split_lines(data, chunk_bytes, header=b""):
+    """
+    Splits a line-oriented body into chunks of about chunk_bytes, on line boundaries.
+    Each chunk is prefixed with `header` (the CSV header row).
+    """
+    chunks = []
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start + chunk_bytes)
+        end = len(data) if end == -1 else end + 1
+        chunks.append(header + data[start:end])
+        start = end
+    return chunks
+
+
+class Job:
+    """
+    Status of a job, as read from the jobs table.
+    """
+
+    def __init__(self, row):
+        (self.id, self.status, self.total_chunks, self.completed_chunks, self.respondents,
+         result, self.error) = row
+        self.result = json.loads(result) if result is not None else None
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self):
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "total_chunks": self.total_chunks,
+            "completed_chunks": self.completed_chunks,
+            "progress": round(self.completed_chunks / self.total_chunks, 4) if self.total_chunks else 1.0,
+            "respondents": self.respondents,
+        }
+        if self.result is not None:
+            data["result"] = self.result
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class OrganizationJobQueue:
+    """
+    Runs large organization diagnoses in a background process pool.
+
+    A submitted body is split into chunks; each chunk becomes a pool task returning a
+    partial OrganizationAggregate, and the partials are merged when the last one completes,
+    so the result equals calculate_organization_diagnosis() over the whole body.
+
+    Jobs, their chunks and the partial results live in a SQLite file (JOB_DB), so every web
+    worker of the host can submit and poll any job, and max_pending applies to all of them:
+    submit raises QueueFullError once max_pending jobs are queued or running.
+    Only one process runs the pool: the first to take a flock on "<path>.lock" (tried by
+    every process that uses the queue). If it dies, another takes over and re-runs the
+    chunks that have no partial result yet. Likewise, if a pool process dies (OOM kill,
+    segfault), the broken pool is replaced and its in-flight chunks are run again.
+    """
+
+    def __init__(self, path=JOB_DB, max_workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING,
+                 chunk_respondents=JOB_CHUNK_RESPONDENTS, chunk_bytes=JOB_CHUNK_BYTES,
+                 result_ttl=JOB_RESULT_TTL, poll_interval=JOB_POLL_INTERVAL):
+        self.path = path
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self.chunk_respondents = chunk_respondents
+        self.chunk_bytes = chunk_bytes
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._runner = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._executor = None
+        # (job ID, chunk index) -> future, only in the process running the pool
+        self._in_flight = {}
+
+    def _connection(self):
+        # Caller holds self._lock. Opened lazily per process (the queue is created before forking)
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(ensure_private_file(self.path), timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+            self._runner, self._executor, self._in_flight = None, None, {}
+        return self._conn
+
+    def submit_answers(self, answers_list):
+        """
+        Queues a diagnosis over a list of answer dicts.
+        :raises QueueFullError: if max_pending jobs are already queued or running
+        """
+        size = self.chunk_respondents
+        chunks = [
+            b"\n".join(json.dumps(answers).encode('utf-8') for answers in answers_list[i:i + size])
+            for i in range(0, len(answers_list), size)
+        ]
+        return self._submit("application/x-ndjson", chunks)
+
+    def submit_stream(self, mimetype, data):
+        """
+        Queues a diagnosis over a raw NDJSON/CSV body (see STREAM_READERS).
+        :raises QueueFullError: if max_pending jobs are already queued or running
+        """
+        header = b""
+        if STREAM_READERS[mimetype] is iter_csv:
+            end = data.find(b"\n")
+            end = len(data) if end == -1 else end + 1
+            header, data = data[:end], data[end:]
+        return self._submit(mimetype, split_lines(data, self.chunk_bytes, header))
+
+    def _submit(self, mimetype, chunks):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(f"DELETE FROM jobs WHERE status NOT IN {ACTIVE} AND finished_at < ?",
+                             (now - self.result_ttl,))
+                active, = conn.execute(f"SELECT COUNT(*) FROM jobs WHERE status IN {ACTIVE}").fetchone()
+                if active >= self.max_pending:
+                    raise QueueFullError(f"Too many pending jobs (maximum {self.max_pending})")
+                conn.execute("INSERT INTO jobs (id, status, total_chunks, created_at) VALUES (?, ?, ?, ?)",
+                             (job_id, STATUS_QUEUED, len(chunks), now))
+                conn.executemany("INSERT INTO job_chunks (job_id, idx, mimetype, data) VALUES (?, ?, ?, ?)",
+                                 [(job_id, i, mimetype, chunk) for i, chunk in enumerate(chunks)])
+                if not chunks:
+                    self._finish(conn, job_id)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            job = self._read(conn, job_id)
+        self._ensure_runner()
+        self._wakeup.set()
+        return job
+
+    @staticmethod
+    def _read(conn, job_id):
+        row = conn.execute(
+            "SELECT id, status, total_chunks, completed_chunks, respondents, result, error FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        return Job(row) if row is not None else None
+
+    def get(self, job_id, wait=0):
+        """
+        Job status; with wait > 0, blocks up to `wait` seconds for the job to finish (long poll).
+        :return: Job.to_dict(), or None for unknown (or expired) jobs
+        """
+        self._ensure_runner()
+        deadline = time.monotonic() + wait
+        while True:
+            with self._lock:
+                job = self._read(self._connection(), job_id)
+            if job is None or job.finished or time.monotonic() >= deadline:
+                return job.to_dict() if job is not None else None
+            time.sleep(min(self.poll_interval, max(0.0, deadline - time.monotonic())))
+
+    def pending_count(self):
+        with self._lock:
+            return self._connection().execute(f"SELECT COUNT(*) FROM jobs WHERE status IN {ACTIVE}").fetchone()[0]
+
+    def _ensure_runner(self):
+        # Every process using the queue competes for the runner lock in a background thread
+        with self._lock:
+            self._connection()
+            if self._runner is None and not self._stop.is_set():
+                self._runner = threading.Thread(target=self._run, name="job-runner", daemon=True)
+                self._runner.start()
+
+    def _run(self):
+        with open(self.path + ".lock", "a+b") as lock_file:
+            while not self._stop.is_set():
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        self._stop.wait(JOB_LOCK_RETRY)
+                        continue
+                try:
+                    self._dispatch()
+                except Exception:
+                    logger.exception("Organization job runner failed; restarting")
+                    self._stop.wait(JOB_LOCK_RETRY)
+
+    def _dispatch(self):
+        # Holds the runner lock: feeds unfinished chunks of active jobs to the pool, oldest job first
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                executor = self._executor
+                free = self.max_workers * 2 - len(self._in_flight)
+                rows = []
+                if free > 0:
+                    conn = self._connection()
+                    keys = conn.execute(
+                        f"SELECT c.job_id, c.idx FROM job_chunks c JOIN jobs j ON j.id = c.job_id "
+                        f"WHERE c.partial IS NULL AND j.status IN {ACTIVE} ORDER BY j.created_at, c.idx LIMIT ?",
+                        (free + len(self._in_flight),)
+                    ).fetchall()
+                    keys = [key for key in keys if key not in self._in_flight][:free]
+                    for job_id, idx in keys:
+                        mimetype, data = conn.execute(
+                            "SELECT mimetype, data FROM job_chunks WHERE job_id = ? AND idx = ?", (job_id, idx)
+                        ).fetchone()
+                        rows.append((job_id, idx, mimetype, data))
+                    for job_id in {job_id for job_id, _ in keys}:
+                        conn.execute("UPDATE jobs SET status = ? WHERE id = ? AND status = ?",
+                                     (STATUS_RUNNING, job_id, STATUS_QUEUED))
+                submitted = []
+                # Chunks are validated against the data version served when they are dispatched
+                snapshot = DataLoader.get_instance().snapshot
+                try:
+                    for job_id, idx, mimetype, data in rows:
+                        future = executor.submit(aggregate_stream_chunk, mimetype, data,
+                                                 snapshot.version, snapshot.get('questions'))
+                        self._in_flight[(job_id, idx)] = future
+                        submitted.append(((job_id, idx), future))
+                except BrokenProcessPool:
+                    logger.warning("Organization job pool is broken; starting a new one")
+                    self._discard_executor(executor)
+            # Outside the lock: a callback runs right away if its chunk is already done
+            for key, future in submitted:
+                future.add_done_callback(lambda f, key=key, executor=executor: self._on_chunk_done(key, f, executor))
+            self._wakeup.wait(self.poll_interval)
+
+    def _discard_executor(self, executor):
+        # Caller holds self._lock. A broken pool has already terminated its processes (no shutdown
+        # needed); its chunks have no partial, so the next dispatch runs them on a new pool
+        if self._executor is executor:
+            self._executor = None
+            self._in_flight = {}
+            self._wakeup.set()
+
+    def _on_chunk_done(self, key, future, executor):
+        job_id, idx = key
+        cancel = []
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            if future.cancelled():
+                return
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                # A pool process died: not the chunk's fault, so the job is not failed
+                if self._executor is executor:
+                    logger.warning("Organization job pool process died; re-running its chunks")
+                self._discard_executor(executor)
+                return
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if error is not None:
+                    failed = conn.execute(
+                        f"UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status IN {ACTIVE}",
+                        (STATUS_FAILED, str(error) or type(error).__name__, time.time(), job_id)
+                    ).rowcount
+                    if failed:
+                        conn.execute("DELETE FROM job_chunks WHERE job_id = ?", (job_id,))
+                        cancel = [other for (other_id, _), other in self._in_flight.items() if other_id == job_id]
+                else:
+                    partial, count = future.result()
+                    stored = conn.execute(
+                        "UPDATE job_chunks SET partial = ?, data = NULL WHERE job_id = ? AND idx = ? AND partial IS NULL",
+                        (json.dumps(partial), job_id, idx)
+                    ).rowcount
+                    if stored:
+                        conn.execute(
+                            f"UPDATE jobs SET completed_chunks = completed_chunks + 1, respondents = respondents + ? "
+                            f"WHERE id = ? AND status IN {ACTIVE}", (count, job_id)
+                        )
+                        completed, total = conn.execute(
+                            "SELECT completed_chunks, total_chunks FROM jobs WHERE id = ?", (job_id,)
+                        ).fetchone()
+                        if completed == total:
+                            self._finish(conn, job_id)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        # Cancelling runs the futures' callbacks in this thread, so not under the lock
+        for other in cancel:
+            other.cancel()
+        self._wakeup.set()
+
+    @staticmethod
+    def _finish(conn, job_id):
+        # Caller holds an open transaction: merges the partials into the job result
+        aggregate = OrganizationAggregate()
+        for partial, in conn.execute("SELECT partial FROM job_chunks WHERE job_id = ? ORDER BY idx", (job_id,)):
+            aggregate.merge(OrganizationAggregate.from_dict(json.loads(partial)))
+        result = aggregate.result()
+        if "error" in result:
+            values = (STATUS_FAILED, None, result["error"])
+        else:
+            values = (STATUS_COMPLETED, json.dumps(result), None)
+        conn.execute("UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                     (*values, time.time(), job_id))
+        conn.execute("DELETE FROM job_chunks WHERE job_id = ?", (job_id,))
+
+    def shutdown(self):
+        self._stop.set()
+        self._wakeup.set()
+        runner = self._runner
+        if runner is not None and runner is not threading.current_thread():
+            runner.join(timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,278 @@
+import math
+
+import numpy as np
+
+# Coefficients (Solved based on regression from standard graph points)
+# Graph 1 (Job Demand-Control: Burden vs Control)
+# Risk = 100 * exp((Burden - A)*alpha + (Control - B)*beta)
+COEFF_A = 8.2500
+COEFF_B = 7.4688
+COEFF_ALPHA = 0.07668
+COEFF_BETA = -0.08896
+
+# Graph 2 (Social Support: Supervisor vs Coworker)
+# Risk = 100 * exp((Sup - C)*gamma + (Cow - D)*delta)
+COEFF_C = 7.3000
+COEFF_D = 8.2668
+COEFF_GAMMA = -0.09711
+COEFF_DELTA = -0.09711
+
+# Four axes of the organization diagnosis: (averages key, reverse-scored items)
+# Items: A1-A3, A8-A10, C1, C2, C4, C5, C7, C8
+AXES = (
+    ("quantitative_burden", ("A1", "A2", "A3")),
+    ("control", ("A8", "A9", "A10")),
+    ("supervisor_support", ("C1", "C4", "C7")),
+    ("coworker_support", ("C2", "C5", "C8")),
+)
+
+AXIS_KEYS = tuple(key for key, _ in AXES)
+
+# Range of one respondent's axis score: 3 items x 1..4 points
+AXIS_MIN = len(AXES[0][1])
+AXIS_MAX = len(AXES[0][1]) * 4
+
+
+def axis_scores(answers):
+    """
+    Computes the four axis sums (burden, control, supervisor, coworker) for one respondent.
+    Reverse scoring: 1->4, 2->3, 3->2, 4->1 => (5 - val)
+    :return: Tuple of four sums, or None when any item is missing or invalid.
+    """
+    if not isinstance(answers, dict):
+        return None
+
+    scores = []
+    try:
+        for _, items in AXES:
+            total = 0
+            for qid in items:
+                val = answers.get(qid)
+                if val is None or val < 1 or val > 4:
+                    return None  # Invalid or missing
+                total += 5 - val
+            scores.append(total)
+    except TypeError:
+        return None
+
+    return tuple(scores)
+
+
+def axis_score_matrix(answer_matrix, question_ids):
+    """
+    Vectorized axis_scores() over an (N x questions) matrix of answer indices (0 = missing).
+    :param question_ids: Question ID of each matrix column
+    :return: (scores, valid) - N x 4 int64 axis sums and a boolean mask of respondents
+             whose items are all answered (rows where valid is False must be ignored)
+    """
+    column_of = {q_id: i for i, q_id in enumerate(question_ids)}
+    columns = [column_of[qid] for _, items in AXES for qid in items]
+    items = np.asarray(answer_matrix[:, columns], dtype=np.int64)
+    valid = ((items >= 1) & (items <= 4)).all(axis=1)
+    scores = (5 - items).reshape(len(items), len(AXES), -1).sum(axis=2)
+    return scores, valid
+
+
+def calculate_health_risk(avg_burden, avg_control, avg_sup_support, avg_cow_support):
+    """
+    Health risk from the four axis averages (Brief Job Stress Questionnaire graphs).
+    :return: Tuple (risk_a, risk_b, total_risk), unrounded
+    """
+    # Risk A = 100 * exp((Mean_Burden - A) * alpha + (Mean_Control - B) * beta)
+    term_a = (avg_burden - COEFF_A) * COEFF_ALPHA + (avg_control - COEFF_B) * COEFF_BETA
+    risk_a = 100 * math.exp(term_a)
+
+    # Risk B = 100 * exp((Mean_Sup - C) * gamma + (Mean_Cow - D) * delta)
+    term_b = (avg_sup_support - COEFF_C) * COEFF_GAMMA + (avg_cow_support - COEFF_D) * COEFF_DELTA
+    risk_b = 100 * math.exp(term_b)
+
+    # Total Risk
+    total_risk = (risk_a * risk_b) / 100
+
+    return risk_a, risk_b, total_risk
+
+
+class OrganizationAggregate:
+    """
+    Running state of an organization diagnosis: the four axis sums plus the valid respondent count.
+    Respondents are folded in one at a time, so memory stays constant regardless of group size.
+
+    The state is mergeable and serializable: partial aggregates computed per department,
+    worker process or node can be combined with merge() and yield exactly the same result
+    as a single pass over all respondents.
+    """
+
+    # Serialization format version for to_dict()/from_dict()
+    FORMAT_VERSION = 1
+
+    def __init__(self, track_squares=True):
+        self.sums = [0, 0, 0, 0]
+        # Sums of squared axis scores (for variance); None when unknown
+        self.sum_squares = [0, 0, 0, 0] if track_squares else None
+        self.count = 0
+
+    def add(self, answers):
+        """
+        Folds one respondent's answers in.
+        :return: True if the respondent was counted, False if skipped (missing/invalid items)
+        """
+        scores = axis_scores(answers)
+        if scores is None:
+            return False
+        self.add_scores(scores)
+        return True
+
+    def add_scores(self, scores):
+        sums = self.sums
+        for i, score in enumerate(scores):
+            sums[i] += score
+        if self.sum_squares is not None:
+            sum_squares = self.sum_squares
+            for i, score in enumerate(scores):
+                sum_squares[i] += score * score
+        self.count += 1
+
+    def remove_scores(self, scores):
+        """
+        Reverses add_scores() for a respondent that was folded in earlier (withdrawal/amendment).
+        Axis scores are integers, so the sums stay exact.
+        """
+        if self.count <= 0:
+            raise ValueError("Cannot remove a respondent from an empty aggregate")
+        sums = self.sums
+        for i, score in enumerate(scores):
+            sums[i] -= score
+        if self.sum_squares is not None:
+            sum_squares = self.sum_squares
+            for i, score in enumerate(scores):
+                sum_squares[i] -= score * score
+        self.count -= 1
+
+    def add_score_matrix(self, scores):
+        """
+        Folds an N x 4 matrix of axis scores (valid respondents only) in at once.
+        """
+        if not len(scores):
+            return
+        for i, total in enumerate(scores.sum(axis=0).tolist()):
+            self.sums[i] += total
+        if self.sum_squares is not None:
+            for i, total in enumerate((scores * scores).sum(axis=0).tolist()):
+                self.sum_squares[i] += total
+        self.count += len(scores)
+
+    def merge(self, other):
+        """
+        Merges another aggregate into this one (in place).
+        Sums of squares are kept only if both sides track them.
+        :return: self
+        """
+        for i in range(len(self.sums)):
+            self.sums[i] += other.sums[i]
+        if self.sum_squares is not None and other.sum_squares is not None:
+            for i in range(len(self.sum_squares)):
+                self.sum_squares[i] += other.sum_squares[i]
+        else:
+            self.sum_squares = None
+        self.count += other.count
+        return self
+
+    def to_dict(self):
+        data = {
+            "version": self.FORMAT_VERSION,
+            "count": self.count,
+            "sums": dict(zip(AXIS_KEYS, self.sums)),
+        }
+        if self.sum_squares is not None:
+            data["sum_squares"] = dict(zip(AXIS_KEYS, self.sum_squares))
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Restores an aggregate serialized with to_dict().
+        :raises ValueError: if the payload is malformed
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Partial aggregate must be an object")
+        if data.get("version", cls.FORMAT_VERSION) != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported partial aggregate version: {data.get('version')}")
+
+        count = data.get("count")
+        if type(count) is not int or count < 0:
+            raise ValueError("Partial aggregate 'count' must be a non-negative integer")
+
+        aggregate = cls(track_squares="sum_squares" in data)
+        aggregate.count = count
+        aggregate.sums = cls._read_axes(data.get("sums"), "sums")
+        for key, total in zip(AXIS_KEYS, aggregate.sums):
+            if not AXIS_MIN * count <= total <= AXIS_MAX * count:
+                raise ValueError(f"Partial aggregate 'sums.{key}' must be between {AXIS_MIN} and {AXIS_MAX} "
+                                 f"times 'count'")
+        if aggregate.sum_squares is not None:
+            aggregate.sum_squares = cls._read_axes(data.get("sum_squares"), "sum_squares")
+            for key, total, total_squares in zip(AXIS_KEYS, aggregate.sums, aggregate.sum_squares):
+                # For scores x in [AXIS_MIN, AXIS_MAX]: sum(x)^2 / count <= sum(x^2) (Cauchy-Schwarz) and
+                # x^2 <= (AXIS_MIN + AXIS_MAX) * x - AXIS_MIN * AXIS_MAX, summed over the respondents
+                if not (total * total <= total_squares * count and
+                        total_squares <= (AXIS_MIN + AXIS_MAX) * total - AXIS_MIN * AXIS_MAX * count):
+                    raise ValueError(f"Partial aggregate 'sum_squares.{key}' is inconsistent with "
+                                     f"'sums.{key}' and 'count'")
+        return aggregate
+
+    @staticmethod
+    def _read_axes(values, name):
+        if not isinstance(values, dict):
+            raise ValueError(f"Partial aggregate '{name}' must be an object")
+        result = []
+        for key in AXIS_KEYS:
+            value = values.get(key)
+            if type(value) is not int:
+                raise ValueError(f"Partial aggregate '{name}.{key}' must be an integer")
+            result.append(value)
+        return result
+
+    def standard_deviations(self):
+        """
+        Population standard deviation per axis, or None if sums of squares are not tracked.
+        """
+        if self.sum_squares is None or self.count == 0:
+            return None
+        deviations = {}
+        for key, total, total_squares in zip(AXIS_KEYS, self.sums, self.sum_squares):
+            mean = total / self.count
+            variance = max(total_squares / self.count - mean * mean, 0.0)
+            deviations[key] = round(math.sqrt(variance), 2)
+        return deviations
+
+    def result(self):
+        """
+        Builds the organization diagnosis response (averages + health risk).
+        """
+        valid_count = self.count
+        if valid_count == 0:
+            return {"error": "No valid data provided for organizational diagnosis"}
+
+        # Averages
+        avg_burden, avg_control, avg_sup_support, avg_cow_support = (
+            total / valid_count for total in self.sums
+        )
+
+        risk_a, risk_b, total_risk = calculate_health_risk(
+            avg_burden, avg_control, avg_sup_support, avg_cow_support
+        )
+
+        return {
+            "count": valid_count,
+            "averages": {
+                "quantitative_burden": round(avg_burden, 2),
+                "control": round(avg_control, 2),
+                "supervisor_support": round(avg_sup_support, 2),
+                "coworker_support": round(avg_cow_support, 2)
+            },
+            "health_risk": {
+                "work_burden_risk": round(risk_a, 1),
+                "support_risk": round(risk_b, 1),
+                "comprehensive_risk": round(total_risk, 1)
+            }
+        }
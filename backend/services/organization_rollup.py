@@ -0,0 +1,130 @@
+import os
+
+from services.organization_aggregate import OrganizationAggregate, axis_scores
+
+# Minimum group size for reporting group analysis results.
+# The stress check guidelines recommend not reporting units smaller than 10 people,
+# since individual answers could be inferred from the group averages.
+DEFAULT_MIN_GROUP_SIZE = 10
+# Server-wide floor: requests may ask for a larger minimum, never a smaller one
+MIN_GROUP_SIZE = max(1, int(os.environ.get('MIN_GROUP_SIZE', DEFAULT_MIN_GROUP_SIZE)))
+
+# Separator for org paths given as a single string (e.g. CSV cells): "Company/Sales/Team 1"
+ORG_PATH_SEPARATOR = "/"
+
+
+def effective_min_group_size(requested=None):
+    """
+    :param requested: Minimum group size asked for by a client (None: server default)
+    :return: The requested size, raised to the MIN_GROUP_SIZE floor
+    :raises ValueError: if requested is not a positive integer
+    """
+    if requested is None:
+        return MIN_GROUP_SIZE
+    try:
+        requested = int(requested)
+    except (TypeError, ValueError):
+        requested = 0
+    if requested < 1:
+        raise ValueError("'min_group_size' must be a positive integer")
+    return max(requested, MIN_GROUP_SIZE)
+
+
+def normalize_org_path(org_path):
+    """
+    Normalizes an org path to a tuple of unit names.
+    Accepts a list of names or a "/"-separated string.
+    :return: Tuple of names, or None if the path is missing or invalid
+    """
+    if isinstance(org_path, str):
+        org_path = org_path.split(ORG_PATH_SEPARATOR)
+    if not isinstance(org_path, list) or not org_path:
+        return None
+
+    names = []
+    for name in org_path:
+        if not isinstance(name, str) or not name.strip():
+            return None
+        names.append(name.strip())
+    return tuple(names)
+
+
+class OrganizationRollup:
+    """
+    Organization diagnosis for every node of an org tree, computed in one pass.
+    Each respondent's axis scores are computed once and folded into the aggregate of
+    every prefix of its org path (team -> department -> division -> company).
+    """
+
+    def __init__(self):
+        self.aggregates = {}
+        self.skipped = 0
+
+    def add(self, org_path, answers):
+        """
+        :return: True if the respondent was counted, False if skipped (invalid path or answers)
+        """
+        path = normalize_org_path(org_path)
+        scores = axis_scores(answers) if path else None
+        if scores is None:
+            self.skipped += 1
+            return False
+
+        aggregates = self.aggregates
+        for depth in range(1, len(path) + 1):
+            prefix = path[:depth]
+            aggregate = aggregates.get(prefix)
+            if aggregate is None:
+                aggregate = aggregates[prefix] = OrganizationAggregate(track_squares=False)
+            aggregate.add_scores(scores)
+        return True
+
+    def nodes(self, min_group_size=DEFAULT_MIN_GROUP_SIZE):
+        """
+        Results for every org node, parents before children.
+        Nodes with fewer than min_group_size respondents only report their count, and so do
+        the nodes hidden by suppressed_paths() to protect them.
+        """
+        suppressed = self.suppressed_paths(min_group_size)
+        nodes = []
+        for path in sorted(self.aggregates):
+            aggregate = self.aggregates[path]
+            node = {
+                "path": list(path),
+                "level": len(path),
+                "count": aggregate.count,
+            }
+            if path in suppressed:
+                node["suppressed"] = True
+            else:
+                result = aggregate.result()
+                node["suppressed"] = False
+                node["averages"] = result["averages"]
+                node["health_risk"] = result["health_risk"]
+            nodes.append(node)
+        return nodes
+
+    def suppressed_paths(self, min_group_size):
+        """
+        Paths whose results must not be reported.
+        Besides units below min_group_size, this applies complementary suppression: a reported
+        parent minus its reported children gives the aggregate of everyone else in the parent
+        (suppressed children and members of the parent itself). When that remainder has fewer
+        than min_group_size respondents, the smallest reported child is suppressed as well,
+        together with its whole subtree, so it cannot be rebuilt from its own children.
+        """
+        children = {}
+        for path in self.aggregates:
+            if len(path) > 1:
+                children.setdefault(path[:-1], []).append(path)
+
+        suppressed = {path for path, aggregate in self.aggregates.items() if aggregate.count < min_group_size}
+        for path in sorted(self.aggregates):  # Parents before children
+            if path in suppressed:
+                continue
+            shown = [child for child in children.get(path, ()) if child not in suppressed]
+            remainder = self.aggregates[path].count - sum(self.aggregates[child].count for child in shown)
+            if 0 < remainder < min_group_size and shown:
+                smallest = min(shown, key=lambda child: (self.aggregates[child].count, child))
+                suppressed.update(p for p in self.aggregates if p[:len(smallest)] == smallest)
+        return suppressed
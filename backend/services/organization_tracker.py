@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+from services.organization_aggregate import AXIS_KEYS, OrganizationAggregate, axis_scores
+from services.organization_rollup import effective_min_group_size
+from utils.sqlite_files import ensure_private_file
+
+logger = logging.getLogger(__name__)
+
+# SQLite file shared by all workers on a host (per-respondent scores: created with mode 0600). Unset,
+# each worker keeps its own organizations in memory; set it to a path on persistent, private storage
+ORG_TRACKER_DB = os.environ.get('ORG_TRACKER_DB') or ":memory:"
+
+SUM_COLUMNS = tuple(f"sum_{key}" for key in AXIS_KEYS)
+SQUARE_COLUMNS = tuple(f"sq_{key}" for key in AXIS_KEYS)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS org_respondents (
+    org TEXT NOT NULL,
+    respondent TEXT NOT NULL,
+    {", ".join(f"{key} INTEGER NOT NULL" for key in AXIS_KEYS)},
+    PRIMARY KEY (org, respondent)
+) WITHOUT ROWID;
+-- Running sums per organization, updated in the same transaction as org_respondents
+CREATE TABLE IF NOT EXISTS org_aggregates (
+    org TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    {", ".join(f"{column} INTEGER NOT NULL" for column in SUM_COLUMNS + SQUARE_COLUMNS)}
+);
+"""
+
+AGGREGATE_COLUMNS = ("count",) + SUM_COLUMNS + SQUARE_COLUMNS
+
+
+class OrganizationTracker:
+    """
+    Live organization diagnoses that update in O(1) per respondent submission,
+    amendment or withdrawal, instead of recomputing over every respondent.
+
+    Each organization keeps running axis sums (an OrganizationAggregate) next to the axis
+    scores of every current respondent, so an amendment or withdrawal subtracts exactly what
+    was added. Sums are integers, so results always equal a full recompute over the current
+    respondents.
+
+    State lives in SQLite (WAL), one transaction per change, so every worker process on the
+    host sees the same organizations. The connection is opened lazily per process, so the
+    tracker can be created before a fork (gunicorn preload_app).
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # Caller holds self._lock
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(ensure_private_file(self.path), timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _write(self, apply):
+        """
+        Runs apply(conn) in one write transaction.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = apply(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    @staticmethod
+    def _scores(conn, org_id, respondent_id):
+        return conn.execute(f"SELECT {', '.join(AXIS_KEYS)} FROM org_respondents WHERE org = ? AND respondent = ?",
+                            (org_id, respondent_id)).fetchone()
+
+    @staticmethod
+    def _add_to_aggregate(conn, org_id, scores, sign):
+        deltas = (sign, *(sign * score for score in scores), *(sign * score * score for score in scores))
+        updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in AGGREGATE_COLUMNS)
+        conn.execute(f"INSERT INTO org_aggregates (org, {', '.join(AGGREGATE_COLUMNS)}) "
+                     f"VALUES (?{', ?' * len(AGGREGATE_COLUMNS)}) ON CONFLICT (org) DO UPDATE SET {updates}",
+                     (org_id, *deltas))
+
+    def _apply_submit(self, conn, org_id, respondent_id, scores):
+        previous = self._scores(conn, org_id, respondent_id)
+        if previous is not None:
+            self._add_to_aggregate(conn, org_id, previous, -1)
+        self._add_to_aggregate(conn, org_id, scores, 1)
+        conn.execute(f"INSERT OR REPLACE INTO org_respondents (org, respondent, {', '.join(AXIS_KEYS)}) "
+                     f"VALUES (?, ?{', ?' * len(AXIS_KEYS)})", (org_id, respondent_id, *scores))
+        return previous is not None
+
+    def _apply_withdraw(self, conn, org_id, respondent_id):
+        previous = self._scores(conn, org_id, respondent_id)
+        if previous is None:
+            return False
+        self._add_to_aggregate(conn, org_id, previous, -1)
+        conn.execute("DELETE FROM org_respondents WHERE org = ? AND respondent = ?", (org_id, respondent_id))
+        conn.execute("DELETE FROM org_aggregates WHERE org = ? AND count = 0", (org_id,))
+        return True
+
+    def submit(self, org_id, respondent_id, answers):
+        """
+        Adds a respondent, or replaces their previous answers (amendment).
+        :return: "created" or "updated"
+        :raises ValueError: if the organization-diagnosis items are missing or invalid
+        """
+        scores = axis_scores(answers)
+        if scores is None:
+            raise ValueError("Answers must include valid values (1-4) for every organization diagnosis item")
+        updated = self._write(lambda conn: self._apply_submit(conn, org_id, respondent_id, scores))
+        return "updated" if updated else "created"
+
+    def withdraw(self, org_id, respondent_id):
+        """
+        Removes a respondent's answers.
+        :return: True if the respondent existed
+        """
+        return self._write(lambda conn: self._apply_withdraw(conn, org_id, respondent_id))
+
+    def aggregate(self, org_id):
+        """
+        The organization's current aggregate, or None if it has no respondents.
+        """
+        with self._lock:
+            row = self._connection().execute(
+                f"SELECT {', '.join(AGGREGATE_COLUMNS)} FROM org_aggregates WHERE org = ?", (org_id,)).fetchone()
+        if row is None:
+            return None
+        size = len(AXIS_KEYS)
+        aggregate = OrganizationAggregate()
+        aggregate.count = row[0]
+        aggregate.sums = list(row[1:1 + size])
+        aggregate.sum_squares = list(row[1 + size:])
+        return aggregate
+
+    def result(self, org_id, min_group_size=None):
+        """
+        Current organization diagnosis (same shape as calculate_organization_diagnosis).
+        Organizations below min_group_size (never below the MIN_GROUP_SIZE floor) only report
+        their count, flagged with "suppressed": true.
+        :raises ValueError: if min_group_size is not a positive integer
+        """
+        min_group_size = effective_min_group_size(min_group_size)
+        aggregate = self.aggregate(org_id)
+        if aggregate is None:
+            return OrganizationAggregate().result()
+        if aggregate.count < min_group_size:
+            return {"count": aggregate.count, "suppressed": True, "min_group_size": min_group_size}
+        return aggregate.result()
+
+    def organizations(self):
+        with self._lock:
+            return dict(self._connection().execute("SELECT org, count FROM org_aggregates"))
+
+    def import_journal(self, journal_path):
+        """
+        One-time migration of an NDJSON journal written by earlier versions
+        ({"op": "submit"|"withdraw", "org", "respondent", "scores"} per line). Imported only
+        into an empty tracker; the journal is then renamed to <journal_path>.imported.
+        A torn last line (a crash during an append) is logged and skipped; an unreadable line
+        anywhere else raises ValueError.
+        :return: Number of events applied
+        """
+        if not os.path.exists(journal_path):
+            return 0
+
+        def apply(conn):
+            if not os.path.exists(journal_path) or conn.execute("SELECT 1 FROM org_respondents LIMIT 1").fetchone():
+                return 0
+            applied = 0
+            for event in _read_journal(journal_path):
+                if event["op"] == "submit":
+                    self._apply_submit(conn, event["org"], event["respondent"], tuple(event["scores"]))
+                else:
+                    self._apply_withdraw(conn, event["org"], event["respondent"])
+                applied += 1
+            return applied
+
+        applied = self._write(apply)
+        try:
+            os.replace(journal_path, journal_path + ".imported")
+        except FileNotFoundError:
+            pass  # Another worker imported it first
+        if applied:
+            logger.info("Imported %d events from organization journal %s", applied, journal_path)
+        return applied
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _read_journal(journal_path):
+    with open(journal_path, 'rb') as f:
+        lines = f.readlines()
+    events = []
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            event = json.loads(line)
+            if not line.endswith(b"\n"):
+                raise ValueError("Missing line end")
+        except ValueError:
+            if any(rest.strip() for rest in lines[line_no:]):
+                raise ValueError(f"Corrupt organization journal {journal_path} at line {line_no}")
+            logger.warning("Skipping torn last line %d of organization journal %s", line_no, journal_path)
+            break
+        events.append(event)
+    return events
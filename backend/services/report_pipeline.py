@@ -0,0 +1,223 @@
+import csv
+import io
+import math
+import re
+import zipfile
+from html import escape
+from itertools import islice
+
+import numpy as np
+
+# Records scored and drawn per vectorized step
+REPORT_CHUNK_SIZE = 1000
+
+# Page layout (SVG user units)
+PAGE_WIDTH = 600
+HEADER_HEIGHT = 170
+CHART_HEIGHT = 380
+RADAR_RADIUS = 120
+RADAR_MAX = 5  # Chart points are 1..5 (same domain as Result.jsx)
+
+VERDICTS = {
+    True: ("고스트레스 주의", "#f8d7da", "#721c24"),
+    False: ("정상 스트레스 수준", "#d4edda", "#155724"),
+}
+
+_SAFE_NAME = re.compile(r'[^0-9A-Za-z가-힣._-]+')
+
+# Leading characters that make spreadsheet applications evaluate a cell as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_text(value):
+    """
+    Client-supplied text for summary.csv; formula-like values are prefixed with ' so they stay text.
+    """
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _brace_escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+class ReportTemplate:
+    """
+    Per-respondent SVG report built from a template compiled once per ScoringEngine:
+    the page frame, radar grids, axes and labels are static text, and only the verdict,
+    summary scores and the data polygons are filled in per respondent.
+    Polygon coordinates for a whole chunk are computed with numpy in one step.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.charts = []  # (member factor indices, x unit vectors, y unit vectors, cx, cy)
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{PAGE_WIDTH}" '
+            f'height="{HEADER_HEIGHT + CHART_HEIGHT * len(engine.charts)}" font-family="sans-serif">',
+            f'<rect width="100%" height="100%" fill="#ffffff"/>',
+            f'<text x="{PAGE_WIDTH / 2}" y="40" font-size="24" text-anchor="middle" fill="#333">진단 결과</text>',
+            f'<text x="{PAGE_WIDTH / 2}" y="62" font-size="12" text-anchor="middle" fill="#999">{{respondent}}</text>',
+            f'<rect x="40" y="76" width="{PAGE_WIDTH - 80}" height="40" rx="8" fill="{{verdict_fill}}"/>',
+            f'<text x="{PAGE_WIDTH / 2}" y="102" font-size="18" text-anchor="middle" fill="{{verdict_color}}">'
+            f'{{verdict}}</text>',
+        ]
+        section_labels = ("스트레스 요인 (A)", "스트레스 반응 (B)", "사회적 지지 (C)")
+        for i, (label, key) in enumerate(zip(section_labels, engine.section_keys)):
+            x = PAGE_WIDTH * (i + 1) / 4
+            parts.append(f'<text x="{x}" y="140" font-size="11" text-anchor="middle" fill="#666">{label}</text>')
+            parts.append(f'<text x="{x}" y="160" font-size="16" text-anchor="middle" fill="#333">{{{key}}}</text>')
+
+        for c, (label, members) in enumerate(engine.charts):
+            cx = PAGE_WIDTH / 2
+            top = HEADER_HEIGHT + CHART_HEIGHT * c
+            cy = top + CHART_HEIGHT / 2 + 10
+            count = len(members)
+            angles = [-math.pi / 2 + 2 * math.pi * k / count for k in range(count)]
+            ux = np.array([RADAR_RADIUS / RADAR_MAX * math.cos(a) for a in angles])
+            uy = np.array([RADAR_RADIUS / RADAR_MAX * math.sin(a) for a in angles])
+            self.charts.append((np.array(members), ux, uy, cx, cy))
+
+            parts.append(f'<text x="{cx}" y="{top + 24}" font-size="16" text-anchor="middle" fill="#555">'
+                         f'{_brace_escape(escape(label))}</text>')
+            for level in range(1, RADAR_MAX + 1):
+                ring = " ".join(f"{cx + level * x:.1f},{cy + level * y:.1f}" for x, y in zip(ux, uy))
+                parts.append(f'<polygon points="{ring}" fill="none" stroke="#ccc" stroke-width="1"/>')
+            for f, x, y in zip(members, ux, uy):
+                parts.append(f'<line x1="{cx}" y1="{cy}" x2="{cx + RADAR_MAX * x:.1f}" y2="{cy + RADAR_MAX * y:.1f}" '
+                             f'stroke="#ccc" stroke-width="1"/>')
+                lx, ly = cx + (RADAR_MAX + 1.2) * x, cy + (RADAR_MAX + 1.2) * y
+                anchor = "middle" if abs(x) < 1e-6 else ("start" if x > 0 else "end")
+                parts.append(f'<text x="{lx:.1f}" y="{ly + 4:.1f}" font-size="11" text-anchor="{anchor}" fill="#333">'
+                             f'{_brace_escape(escape(engine.factor_labels[f]))}</text>')
+            parts.append(f'<polygon points="{{polygon{c}}}" fill="#8884d8" fill-opacity="0.6" '
+                         f'stroke="#8884d8" stroke-width="2"/>')
+
+        parts.append('</svg>')
+        self.template = "\n".join(parts)
+
+    def polygons(self, chart_points):
+        """
+        :param chart_points: N x factors array
+        :return: For each chart, a list of N "x,y x,y ..." strings
+        """
+        polygons = []
+        for members, ux, uy, cx, cy in self.charts:
+            points = chart_points[:, members]
+            xs = np.round(cx + points * ux, 1).tolist()
+            ys = np.round(cy + points * uy, 1).tolist()
+            polygons.append([" ".join(f"{x},{y}" for x, y in zip(row_x, row_y)) for row_x, row_y in zip(xs, ys)])
+        return polygons
+
+    def render(self, respondent, sums, high_stress, polygons):
+        verdict, verdict_fill, verdict_color = VERDICTS[bool(high_stress)]
+        fields = dict(zip(self.engine.section_keys, sums))
+        fields.update({f"polygon{c}": polygon for c, polygon in enumerate(polygons)})
+        return self.template.format(
+            respondent=escape(str(respondent)), verdict=verdict,
+            verdict_fill=verdict_fill, verdict_color=verdict_color, **fields
+        )
+
+
+class _ZipStream:
+    """
+    Write-only file object collecting zip output so it can be yielded in pieces.
+    Has no tell()/seek(), so zipfile writes entries with data descriptors (streaming mode).
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def report_file_name(respondent, index):
+    name = _SAFE_NAME.sub("_", str(respondent)).strip("._") if respondent is not None else ""
+    return f"reports/{index + 1:06d}{'-' + name if name else ''}.svg"
+
+
+def generate_report_zip(service, records, chunk_size=REPORT_CHUNK_SIZE):
+    """
+    Scores records ({"id"?, "gender", "answers"}) in chunks and yields a zip archive
+    piece by piece: one SVG report per valid record plus summary.csv (all records, with
+    errors for invalid ones). Only one chunk of reports is held in memory at a time.
+    """
+    state = service.get_state()
+    engine = state.engine
+    template = ReportTemplate(engine)
+    validator = state.validator
+
+    sink = _ZipStream()
+    archive = zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED)
+    summary = io.StringIO()
+    summary_writer = csv.writer(summary)
+    summary_writer.writerow(["index", "id", "file", "high_stress", *engine.section_keys, "error"])
+
+    records = iter(records)
+    index = 0
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+
+        rows, genders, positions = [], [], []
+        summary_rows = [None] * len(chunk)
+        for offset, record in enumerate(chunk):
+            error = None
+            encoded = None
+            if not isinstance(record, dict):
+                error = "Record must be an object"
+            elif not record.get('gender') or not record.get('answers'):
+                error = "Missing 'gender' or 'answers'"
+            elif not engine.supports_gender(record['gender']):
+                error = "Invalid gender. Must be 'male' or 'female'"
+            elif not isinstance(record['answers'], dict):
+                error = "'answers' must be an object"
+            elif validator.validate(record['answers']):
+                error = "Invalid answers"
+            else:
+                encoded = engine.encode(record['answers'])
+                if encoded is None:
+                    error = "Invalid answers"
+            if error:
+                respondent = record.get('id') if isinstance(record, dict) else None
+                summary_rows[offset] = [index + offset, _csv_text(respondent), "", "", "", "", "", error]
+                continue
+            rows.append(encoded)
+            genders.append(engine.gender_index[record['gender']])
+            positions.append(offset)
+
+        if rows:
+            matrix = np.stack(rows)
+            _, _, chart_points = engine.score_factors_matrix(matrix, np.asarray(genders, dtype=np.int64))
+            sums, high_stress = engine.section_sums_matrix(matrix)
+            polygons = template.polygons(chart_points)
+            sums, high_stress = sums.tolist(), high_stress.tolist()
+
+            for row, offset in enumerate(positions):
+                respondent = chunk[offset].get('id', index + offset + 1)
+                name = report_file_name(chunk[offset].get('id'), index + offset)
+                svg = template.render(respondent, sums[row], high_stress[row], [p[row] for p in polygons])
+                archive.writestr(name, svg)
+                summary_rows[offset] = [index + offset, _csv_text(chunk[offset].get('id')), name, high_stress[row],
+                                        *sums[row], ""]
+            yield sink.drain()
+
+        summary_writer.writerows(summary_rows)
+
+        index += len(chunk)
+
+    archive.writestr("summary.csv", "﻿" + summary.getvalue())
+    archive.close()
+    yield sink.drain()
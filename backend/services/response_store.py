@@ -0,0 +1,247 @@
+import json
+import os
+
+import numpy as np
+
+from services.organization_rollup import normalize_org_path
+
+
+class ResponseStore:
+    """
+    Columnar, memory-mapped store of survey responses.
+
+    One uint8 cell per answer (1-based option index, 0 = not answered) instead of a
+    JSON dict per respondent, so millions of respondents fit on one box and can be
+    scored straight from the mapped files without building dicts.
+
+    Directory layout:
+        meta.json   question IDs (column order), row count, capacity, org path table
+        answers.u8  capacity x questions uint8
+        gender.u8   capacity uint8, index into GENDERS (UNKNOWN_GENDER if not given)
+        org.u32     capacity uint32, index into the org path table (NO_ORG if not given)
+    """
+
+    GENDERS = ("male", "female")
+    UNKNOWN_GENDER = 255
+    NO_ORG = 0xFFFFFFFF
+    MAX_ANSWER = 4
+
+    META_FILE = "meta.json"
+    ANSWERS_FILE = "answers.u8"
+    GENDER_FILE = "gender.u8"
+    ORG_FILE = "org.u32"
+
+    def __init__(self, path, meta, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self.question_ids = list(meta["question_ids"])
+        self.question_index = {q_id: i for i, q_id in enumerate(self.question_ids)}
+        self.count = meta["count"]
+        self.capacity = meta["capacity"]
+        self.org_paths = [tuple(org_path) for org_path in meta["org_paths"]]
+        self._org_ids = {org_path: i for i, org_path in enumerate(self.org_paths)}
+        self._gender_codes = {gender: i for i, gender in enumerate(self.GENDERS)}
+        self._map_files()
+
+    @classmethod
+    def create(cls, path, question_ids, capacity=1024):
+        """
+        Creates an empty store in directory `path` (created if needed).
+        :param question_ids: Column order, e.g. the IDs from questions.json
+        """
+        os.makedirs(path, exist_ok=True)
+        meta = {"question_ids": list(question_ids), "count": 0, "capacity": max(int(capacity), 1), "org_paths": []}
+        cls._allocate(path, len(meta["question_ids"]), meta["capacity"])
+        cls._write_meta(path, meta)
+        return cls(path, meta)
+
+    @classmethod
+    def open(cls, path, readonly=False):
+        with open(os.path.join(path, cls.META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(path, meta, readonly=readonly)
+
+    @classmethod
+    def _allocate(cls, path, num_questions, capacity):
+        # Grows (or creates) the column files; new space reads as zeros
+        for name, row_bytes in ((cls.ANSWERS_FILE, num_questions), (cls.GENDER_FILE, 1), (cls.ORG_FILE, 4)):
+            with open(os.path.join(path, name), 'ab') as f:
+                f.truncate(capacity * row_bytes)
+
+    @classmethod
+    def _write_meta(cls, path, meta):
+        tmp_path = os.path.join(path, cls.META_FILE + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(path, cls.META_FILE))
+
+    def _map_files(self):
+        mode = 'r' if self.readonly else 'r+'
+        shape = (self.capacity, len(self.question_ids))
+        self._answers = np.memmap(os.path.join(self.path, self.ANSWERS_FILE), dtype=np.uint8, mode=mode, shape=shape)
+        self._genders = np.memmap(os.path.join(self.path, self.GENDER_FILE), dtype=np.uint8, mode=mode,
+                                  shape=(self.capacity,))
+        self._orgs = np.memmap(os.path.join(self.path, self.ORG_FILE), dtype=np.uint32, mode=mode,
+                               shape=(self.capacity,))
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        self.flush()
+        self._answers = self._genders = self._orgs = None
+        self._allocate(self.path, len(self.question_ids), capacity)
+        self.capacity = capacity
+        self._map_files()
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def answers(self):
+        """
+        (count x questions) uint8 view of the mapped answers (no copy).
+        """
+        return self._answers[:self.count]
+
+    @property
+    def genders(self):
+        return self._genders[:self.count]
+
+    @property
+    def orgs(self):
+        return self._orgs[:self.count]
+
+    def encode(self, answers):
+        """
+        Encodes an answers dict into one row.
+        :raises ValueError: on unknown question IDs or answers outside 1..4
+        """
+        row = np.zeros(len(self.question_ids), dtype=np.uint8)
+        for q_id, value in answers.items():
+            column = self.question_index.get(q_id)
+            if column is None:
+                raise ValueError(f"Unknown question ID: {q_id}")
+            if type(value) is not int or not 1 <= value <= self.MAX_ANSWER:
+                raise ValueError(f"Invalid answer for {q_id}: {value!r}")
+            row[column] = value
+        return row
+
+    def org_id(self, org_path, create=False):
+        """
+        Index of an org path in the org table (None if unknown and not created).
+        :raises ValueError: if the path is invalid
+        """
+        path = normalize_org_path(org_path)
+        if path is None:
+            raise ValueError(f"Invalid org_path: {org_path!r}")
+        org_id = self._org_ids.get(path)
+        if org_id is None and create:
+            org_id = self._org_ids[path] = len(self.org_paths)
+            self.org_paths.append(path)
+        return org_id
+
+    def append(self, answers, gender=None, org_path=None):
+        """
+        Appends one respondent.
+        :return: Row index
+        :raises ValueError: on invalid answers, gender or org path (nothing is written)
+        """
+        return self.extend([{"answers": answers, "gender": gender, "org_path": org_path}])
+
+    def extend(self, records):
+        """
+        Appends many {"answers", "gender", "org_path"} records (gender/org_path optional).
+        Records are validated before anything is written.
+        :return: Row index of the first appended record
+        """
+        if self.readonly:
+            raise ValueError("Response store is opened read-only")
+
+        rows, genders, orgs = [], [], []
+        new_orgs = []
+        for record in records:
+            answers = record.get("answers")
+            if not isinstance(answers, dict):
+                raise ValueError("'answers' must be an object")
+            rows.append(self.encode(answers))
+
+            gender = record.get("gender")
+            if gender is None:
+                genders.append(self.UNKNOWN_GENDER)
+            elif gender in self._gender_codes:
+                genders.append(self._gender_codes[gender])
+            else:
+                raise ValueError("Invalid gender. Must be 'male' or 'female'")
+
+            org_path = record.get("org_path")
+            if org_path is None:
+                orgs.append(self.NO_ORG)
+            else:
+                path = normalize_org_path(org_path)
+                if path is None:
+                    raise ValueError(f"Invalid org_path: {org_path!r}")
+                if path not in self._org_ids and path not in new_orgs:
+                    new_orgs.append(path)
+                orgs.append(path)
+
+        for path in new_orgs:
+            self._org_ids[path] = len(self.org_paths)
+            self.org_paths.append(path)
+
+        start = self.count
+        if not rows:
+            return start
+        end = start + len(rows)
+        if end > self.capacity:
+            self._grow(end)
+
+        self._answers[start:end] = np.stack(rows)
+        self._genders[start:end] = genders
+        self._orgs[start:end] = [org if org == self.NO_ORG else self._org_ids[org] for org in orgs]
+        self.count = end
+        return start
+
+    def flush(self):
+        """
+        Writes the mapped columns and the metadata (row count, org table) to disk.
+        """
+        if self.readonly:
+            return
+        for column in (self._answers, self._genders, self._orgs):
+            column.flush()
+        self._write_meta(self.path, {
+            "question_ids": self.question_ids,
+            "count": self.count,
+            "capacity": self.capacity,
+            "org_paths": [list(org_path) for org_path in self.org_paths],
+        })
+
+    def org_ids_under(self, org_prefix):
+        """
+        Org table indices of every path starting with org_prefix (the unit and its sub-units).
+        """
+        prefix = normalize_org_path(org_prefix)
+        if prefix is None:
+            raise ValueError(f"Invalid org_path: {org_prefix!r}")
+        return np.array([i for i, path in enumerate(self.org_paths) if path[:len(prefix)] == prefix],
+                        dtype=np.uint32)
+
+    def iter_chunks(self, chunk_size=65536, start=0, stop=None):
+        """
+        Yields (row offset, answers, genders, orgs) views of at most chunk_size rows.
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        for offset in range(start, stop, chunk_size):
+            end = min(offset + chunk_size, stop)
+            yield offset, self._answers[offset:end], self._genders[offset:end], self._orgs[offset:end]
+
+    def iter_answers(self):
+        """
+        Respondents as answers dicts (the shape answers_list expects), for compatibility.
+        Unanswered questions are omitted.
+        """
+        question_ids = self.question_ids
+        for _, answers, _, _ in self.iter_chunks():
+            for row in answers.tolist():
+                yield {q_id: value for q_id, value in zip(question_ids, row) if value}
@@ -0,0 +1,311 @@
+from itertools import repeat
+
+import numpy as np
+
+# Answers are 1-based option indices; 0 stands for "not answered".
+MAX_ANSWER = 4
+ANSWER_DOMAIN = frozenset(range(MAX_ANSWER + 1))
+
+# Section sums used by the high stress rule: (result key, question prefix, item count)
+SECTION_SUMS = (
+    ("sum_a", "A", 17),
+    ("sum_b", "B", 29),
+    ("sum_c", "C", 9),
+)
+
+# Spider chart layout: (chart label, factor ID prefixes)
+CHART_GROUPS = (
+    ("스트레스 요인 (A)", ("F-A",)),
+    ("스트레스 반응 (B)", ("F-B",)),
+    ("지원 요인 (C & D)", ("F-C", "F-D")),
+)
+
+FACTOR_SECTIONS = ("A", "B", "C", "D")
+
+# Cache keys pack each answer (1..4) into 2 bits; up to 31 answers fit one int64 lane.
+PACK_LANE_SIZE = 31
+
+
+def map_score_to_scale(raw_score, scale_map):
+    """
+    Resolves a raw score against a scoring map ({ "1": {"min": x, "max": y}, ... }).
+    Missing (null) ranges are skipped and unmatched scores fall back to 3.
+    """
+    for scale, range_info in scale_map.items():
+        if range_info is None:
+            continue
+        if range_info['min'] <= raw_score <= range_info['max']:
+            return int(scale)
+    return 3
+
+
+class ScoringEngine:
+    """
+    Scoring plan compiled once from questions.json, factor_definitions.json and scoring_maps.json.
+
+    - Factor raw scores are a dense (factors x questions) weight matrix plus a base vector.
+    - Raw score -> scale conversion is a direct lookup table per gender and factor,
+      covering every raw score reachable with answers in 0..4.
+    - Section sums (A/B/C) use an (questions x answer) option score table and a
+      (questions x sections) membership matrix.
+
+    Scoring N respondents is therefore a few array operations over an (N x questions) matrix.
+    """
+
+    def __init__(self, questions, factors, scoring_maps):
+        self.question_ids = [q['id'] for q in questions]
+
+        # Factors in the same order the charts use (sorted by factor ID)
+        factor_items = []
+        for section_key in FACTOR_SECTIONS:
+            factor_items.extend(factors.get(section_key, {}).items())
+        factor_items.sort(key=lambda item: item[0])
+
+        # Questions referenced by factors but missing from questions.json still count
+        # towards raw scores (but never towards section sums).
+        for _, factor_def in factor_items:
+            for q_id in factor_def.get('weights', {}):
+                if q_id not in self.question_ids:
+                    self.question_ids.append(q_id)
+
+        self.question_index = {q_id: i for i, q_id in enumerate(self.question_ids)}
+        self.factor_ids = [factor_id for factor_id, _ in factor_items]
+        self.factor_labels = [factor_def['label'] for _, factor_def in factor_items]
+
+        self._compile_factors(factor_items)
+        self._compile_scales(factor_items, scoring_maps)
+        self._compile_section_sums(questions)
+        self._compile_charts()
+        self._compile_reverse_index()
+
+    def _compile_factors(self, factor_items):
+        num_questions = len(self.question_ids)
+        self.weights = np.zeros((len(factor_items), num_questions), dtype=np.int64)
+        self.bases = np.zeros(len(factor_items), dtype=np.int64)
+
+        for f, (factor_id, factor_def) in enumerate(factor_items):
+            base = factor_def.get('base', 0)
+            if int(base) != base:
+                raise ValueError(f"Factor {factor_id} has a non-integer base: {base}")
+            self.bases[f] = base
+            for q_id, weight in factor_def.get('weights', {}).items():
+                if int(weight) != weight:
+                    raise ValueError(f"Factor {factor_id} has a non-integer weight for {q_id}: {weight}")
+                self.weights[f, self.question_index[q_id]] = weight
+
+        # Reachable raw score range per factor for answers in 0..MAX_ANSWER
+        low = np.minimum(self.weights, 0).sum(axis=1) * MAX_ANSWER
+        high = np.maximum(self.weights, 0).sum(axis=1) * MAX_ANSWER
+        self.raw_min = self.bases + low
+        self.raw_max = self.bases + high
+
+    def _compile_scales(self, factor_items, scoring_maps):
+        # Only genders every factor has a scoring map for can be compiled
+        scale_genders = [set(factor_def['scales']) for _, factor_def in factor_items]
+        self.genders = sorted(set.intersection(*scale_genders)) if scale_genders else []
+        self.gender_index = {gender: i for i, gender in enumerate(self.genders)}
+
+        width = int((self.raw_max - self.raw_min).max()) + 1
+        shape = (len(self.genders), len(factor_items), width)
+        self.scale_table = np.full(shape, 3, dtype=np.int8)
+        self.chart_table = np.full(shape, 3, dtype=np.int8)
+
+        for f, (_, factor_def) in enumerate(factor_items):
+            group = factor_def.get('group', 1)
+            for gender, g in self.gender_index.items():
+                scale_map = scoring_maps.get(factor_def['scales'][gender], {})
+                for raw in range(int(self.raw_min[f]), int(self.raw_max[f]) + 1):
+                    scale = map_score_to_scale(raw, scale_map)
+                    offset = raw - int(self.raw_min[f])
+                    self.scale_table[g, f, offset] = scale
+                    self.chart_table[g, f, offset] = 6 - scale if group == 1 else scale
+
+        # Flat views for single-row scoring: table[g, f, raw - raw_min[f]] == flat[table_base[g, f] + raw]
+        self._flat_chart_table = self.chart_table.ravel()
+        cells = np.arange(len(self.genders) * len(factor_items)).reshape(len(self.genders), len(factor_items))
+        self._table_base = cells * width - self.raw_min
+
+    def _compile_section_sums(self, questions):
+        num_questions = len(self.question_ids)
+        self.option_scores = np.zeros((num_questions, MAX_ANSWER + 1), dtype=np.int64)
+        for q in questions:
+            q_index = self.question_index[q['id']]
+            for answer_idx, option in enumerate(q['options'][:MAX_ANSWER], 1):
+                self.option_scores[q_index, answer_idx] = option['score']
+
+        self.section_keys = [key for key, _, _ in SECTION_SUMS]
+        self.section_matrix = np.zeros((num_questions, len(SECTION_SUMS)), dtype=np.int64)
+        known_ids = {q['id'] for q in questions}
+        for s, (_, prefix, count) in enumerate(SECTION_SUMS):
+            for i in range(1, count + 1):
+                q_id = f"{prefix}{i}"
+                if q_id in known_ids:
+                    self.section_matrix[self.question_index[q_id], s] = 1
+        self._question_columns = np.arange(num_questions)
+
+        # Flat view for single-row scoring: option_scores[q, a] == flat[option_base[q] + a]
+        self._flat_option_scores = self.option_scores.ravel()
+        self._option_base = self._question_columns * (MAX_ANSWER + 1)
+        self._section_matrix_t = np.ascontiguousarray(self.section_matrix.T)
+
+        # cache_key(): lane l holds answers [l*31, (l+1)*31) as base-4 digits (answer - 1)
+        lanes = -(-num_questions // PACK_LANE_SIZE)
+        self._pack_weights = np.zeros((lanes, num_questions), dtype=np.int64)
+        for q in range(num_questions):
+            self._pack_weights[q // PACK_LANE_SIZE, q] = 4 ** (q % PACK_LANE_SIZE)
+
+    def _compile_charts(self):
+        self.charts = []
+        for label, prefixes in CHART_GROUPS:
+            members = [f for f, factor_id in enumerate(self.factor_ids) if factor_id.startswith(prefixes)]
+            self.charts.append((label, members))
+
+    def _compile_reverse_index(self):
+        # Delta rescoring (see services/scoring_session.py) touches only what one answer feeds:
+        # question -> [(factor, weight)] with non-zero weights, question -> section (or None).
+        # Plain lists: per-answer updates are a handful of scalar steps, where numpy is slower.
+        self.question_factors = [
+            [(int(f), int(self.weights[f, q])) for f in np.flatnonzero(self.weights[:, q])]
+            for q in range(len(self.question_ids))
+        ]
+        self.question_sections = [int(row.argmax()) if row.any() else None for row in self.section_matrix]
+        self.option_score_lists = self.option_scores.tolist()
+        self.chart_table_list = self._flat_chart_table.tolist()
+        self.table_base_lists = self._table_base.tolist()
+
+    def encode(self, answers):
+        """
+        Encodes an answers dict into a row of the answer matrix.
+        Returns None when any answer is outside the compiled domain (ints 0..4),
+        in which case callers must use the reference implementation.
+        """
+        row = list(map(answers.get, self.question_ids, repeat(0)))
+        # bool/float values compare equal to ints, so check the types separately
+        try:
+            if not ANSWER_DOMAIN.issuperset(row) or set(map(type, row)) != {int}:
+                return None
+        except TypeError:
+            # Unhashable values (lists, dicts)
+            return None
+        return np.array(row, dtype=np.int64)
+
+    def cache_key(self, encoded_row, gender):
+        """
+        Compact key for an encoded row: gender index byte + answers packed at 2 bits each.
+        Only complete answer vectors (every answer 1..4) are packable; returns None otherwise.
+        """
+        if not encoded_row.all():
+            return None
+        return bytes((self.gender_index[gender],)) + (self._pack_weights @ (encoded_row - 1)).tobytes()
+
+    def supports_gender(self, gender):
+        return gender in self.gender_index
+
+    def score_matrix(self, answer_matrix, gender_indices):
+        """
+        Scores an (N x questions) answer matrix.
+        :param answer_matrix: int array of 1-based answer indices (0 = missing)
+        :param gender_indices: int array of length N with indices into self.genders
+        :return: Dict of arrays: raw, scale, chart_point (N x factors), sums (N x sections), high_stress (N)
+        """
+        answer_matrix = np.asarray(answer_matrix, dtype=np.int64)
+        gender_indices = np.asarray(gender_indices, dtype=np.int64)
+
+        raw, scale, chart_point = self.score_factors_matrix(answer_matrix, gender_indices)
+        sums, high_stress = self.section_sums_matrix(answer_matrix)
+
+        return {
+            "raw": raw,
+            "scale": scale,
+            "chart_point": chart_point,
+            "sums": sums,
+            "high_stress": high_stress,
+        }
+
+    def score_factors_matrix(self, answer_matrix, gender_indices):
+        """
+        Factor part of score_matrix(): (raw, scale, chart_point), each N x factors.
+        """
+        raw = answer_matrix @ self.weights.T + self.bases
+        offsets = raw - self.raw_min
+        factor_columns = np.arange(len(self.factor_ids))
+        scale = self.scale_table[gender_indices[:, None], factor_columns, offsets]
+        chart_point = self.chart_table[gender_indices[:, None], factor_columns, offsets]
+        return raw, scale, chart_point
+
+    def section_sums_matrix(self, answer_matrix):
+        """
+        High-stress part of score_matrix(): (sums N x sections, high_stress N).
+        """
+        sums = self.option_scores[self._question_columns, answer_matrix] @ self.section_matrix
+        sum_a, sum_b, sum_c = sums[:, 0], sums[:, 1], sums[:, 2]
+        high_stress = (sum_b >= 77) | (((sum_a + sum_c) >= 76) & (sum_b >= 63))
+        return sums, high_stress
+
+    def build_result(self, chart_points, sums, high_stress):
+        """
+        Formats one scored row into the /api/diagnosis response shape.
+        :param chart_points: Sequence of chart points in self.factor_ids order
+        :param sums: Sequence of section sums in SECTION_SUMS order
+        """
+        chart_points = list(chart_points)
+        return {
+            "result": {
+                "high_stress": bool(high_stress),
+                "summary_scores": dict(zip(self.section_keys, (int(s) for s in sums)))
+            },
+            "charts": [
+                {
+                    "label": label,
+                    "axes": [
+                        {
+                            "id": self.factor_ids[f],
+                            "label": self.factor_labels[f],
+                            "score": int(chart_points[f])
+                        }
+                        for f in members
+                    ]
+                }
+                for label, members in self.charts
+            ]
+        }
+
+    @staticmethod
+    def copy_result(result):
+        """
+        Deep copy of a build_result() dict (extra top-level keys such as data_version included),
+        about 10x faster than copy.deepcopy. Used to hand out cached results.
+        """
+        summary = result["result"]
+        return {
+            **result,
+            "result": {**summary, "summary_scores": dict(summary["summary_scores"])},
+            "charts": [{**chart, "axes": [dict(axis) for axis in chart["axes"]]} for chart in result["charts"]],
+        }
+
+    def score_one(self, encoded_row, gender):
+        """
+        Scores a single encoded row (see encode()).
+        Same math as score_matrix() on 1-D arrays, which avoids the 2-D fancy indexing overhead.
+        """
+        chart_points = self.chart_points_one(encoded_row, gender)
+        sums, high_stress = self.section_sums_one(encoded_row)
+        return self.build_result(chart_points, sums, high_stress)
+
+    def chart_points_one(self, encoded_row, gender):
+        """
+        Factor part of score_one(): chart points in self.factor_ids order.
+        """
+        raw = self.weights @ encoded_row + self.bases
+        return self._flat_chart_table[self._table_base[self.gender_index[gender]] + raw].tolist()
+
+    def section_sums_one(self, encoded_row):
+        """
+        High-stress part of score_one(): ((sum_a, sum_b, sum_c), high_stress).
+        """
+        sum_a, sum_b, sum_c = (self._section_matrix_t @ self._flat_option_scores[self._option_base + encoded_row]).tolist()
+        return (sum_a, sum_b, sum_c), self.high_stress_one(sum_a, sum_b, sum_c)
+
+    @staticmethod
+    def high_stress_one(sum_a, sum_b, sum_c):
+        return sum_b >= 77 or ((sum_a + sum_c) >= 76 and sum_b >= 63)
@@ -0,0 +1,199 @@
+"""
+Equivalence harness for the compiled ScoringEngine against the reference scoring rules.
+
+- check_scale_tables(): exhaustive. Every raw score each factor can reach (answers 0..4,
+  0 = unanswered) is mapped for every compiled gender, both through the reference
+  _map_score_to_scale() and through the engine's lookup tables, including the scores
+  that hit the `return 3` fallback (gaps and null ranges in scoring_maps.json).
+- fuzz(): random answer vectors scored by the engine and by ReferenceScorer, an
+  independent vectorized transcription of DiagnosisService._calculate_reference built
+  straight from the JSON definitions, so millions of vectors take seconds.
+"""
+import time
+
+import numpy as np
+
+from services.scoring_engine import FACTOR_SECTIONS, MAX_ANSWER, SECTION_SUMS
+
+# Vectors scored per step in fuzz() (bounds temporary memory)
+FUZZ_CHUNK_SIZE = 100_000
+
+
+def reachable_raw_scores(base, weights):
+    """
+    Every raw score base + sum(weight * answer) reachable with answers in 0..MAX_ANSWER.
+    :param weights: Non-zero integer weights of the factor's questions
+    :return: Sorted list of ints
+    """
+    reachable = {int(base)}
+    for weight in weights:
+        reachable = {score + int(weight) * answer for score in reachable for answer in range(MAX_ANSWER + 1)}
+    return sorted(reachable)
+
+
+def check_scale_tables(service, state=None):
+    """
+    Compares the engine's scale and chart-point tables with the reference conversion for
+    every reachable raw score of every factor and compiled gender.
+    :return: Report dict with "checked", "fallbacks" (raw scores resolved by the fallback,
+             per factor and gender) and "mismatches" (empty when the engine is equivalent)
+    """
+    state = state or service.get_state()
+    engine = state.engine
+    checked = 0
+    fallbacks = {}
+    mismatches = []
+
+    for f, factor_id in enumerate(engine.factor_ids):
+        factor_def = _factor_definitions(state.factors)[factor_id]
+        weights = [w for w in factor_def.get('weights', {}).values() if w]
+        raws = reachable_raw_scores(factor_def.get('base', 0), weights)
+        group = factor_def.get('group', 1)
+
+        for gender, g in engine.gender_index.items():
+            scale_map = state.scoring_maps.get(factor_def['scales'][gender], {})
+            covered = [r for r in scale_map.values() if r is not None]
+            for raw in raws:
+                expected_scale = service._map_score_to_scale(raw, scale_map)
+                expected_chart = 6 - expected_scale if group == 1 else expected_scale
+                offset = raw - int(engine.raw_min[f])
+                actual_scale = int(engine.scale_table[g, f, offset])
+                actual_chart = int(engine.chart_table[g, f, offset])
+                checked += 1
+                if not any(r['min'] <= raw <= r['max'] for r in covered):
+                    fallbacks.setdefault(f"{factor_id}/{gender}", []).append(raw)
+                if (actual_scale, actual_chart) != (expected_scale, expected_chart):
+                    mismatches.append({
+                        "factor": factor_id, "gender": gender, "raw": raw,
+                        "expected": [expected_scale, expected_chart], "actual": [actual_scale, actual_chart],
+                    })
+
+    return {"checked": checked, "fallbacks": fallbacks, "mismatches": mismatches}
+
+
+def _factor_definitions(factors):
+    return {factor_id: factor_def
+            for section in FACTOR_SECTIONS for factor_id, factor_def in factors.get(section, {}).items()}
+
+
+class ReferenceScorer:
+    """
+    Vectorized transcription of DiagnosisService._calculate_reference.
+    Deliberately shares no code or tables with ScoringEngine. Scale conversion calls the
+    reference map_score_to_scale once per distinct raw score in a chunk (raw scores are
+    small integers) and indexes the answers into that.
+    """
+
+    def __init__(self, state, question_ids, map_score_to_scale):
+        self.map_score_to_scale = map_score_to_scale
+        column = {q_id: i for i, q_id in enumerate(question_ids)}
+        self.factors = []  # (factor_id, base, [(column, weight)], {gender: scale_map}, group)
+        for factor_id, factor_def in _factor_definitions(state.factors).items():
+            weights = [(column[q_id], weight) for q_id, weight in factor_def.get('weights', {}).items()]
+            scale_maps = {gender: state.scoring_maps.get(name, {}) for gender, name in factor_def['scales'].items()}
+            self.factors.append((factor_id, factor_def.get('base', 0), weights, scale_maps, factor_def.get('group', 1)))
+
+        # Per section: [(column, option scores indexed by answer 0..4)]
+        self.sections = []
+        for _, prefix, count in SECTION_SUMS:
+            items = []
+            for i in range(1, count + 1):
+                question = state.question_map.get(f"{prefix}{i}")
+                if question is None:
+                    continue
+                scores = [0] * (MAX_ANSWER + 1)
+                for answer, option in enumerate(question['options'][:MAX_ANSWER], 1):
+                    scores[answer] = option['score']
+                items.append((column[question['id']], np.array(scores)))
+            self.sections.append(items)
+
+    def score(self, answer_matrix, genders):
+        """
+        :param answer_matrix: (N x questions) answers 0..4 in question_ids column order
+        :param genders: Array of N gender names
+        :return: Dict of factor_id -> (raw, scale, chart_point) arrays, sums (N x 3), high_stress (N)
+        """
+        factors = {}
+        for factor_id, base, weights, scale_maps, group in self.factors:
+            raw = np.full(len(answer_matrix), base, dtype=np.int64)
+            for column, weight in weights:
+                raw += answer_matrix[:, column] * weight
+            low, high = int(raw.min()), int(raw.max())
+            scale = np.full(len(answer_matrix), 3, dtype=np.int64)
+            for gender, scale_map in scale_maps.items():
+                rows = genders == gender
+                converted = np.array([self.map_score_to_scale(value, scale_map) for value in range(low, high + 1)])
+                scale[rows] = converted[raw[rows] - low]
+            chart_point = 6 - scale if group == 1 else scale
+            factors[factor_id] = (raw, scale, chart_point)
+
+        sums = np.stack([
+            sum((scores[answer_matrix[:, column]] for column, scores in items), np.zeros(len(answer_matrix), dtype=np.int64))
+            for items in self.sections
+        ], axis=1)
+        sum_a, sum_b, sum_c = sums[:, 0], sums[:, 1], sums[:, 2]
+        high_stress = (sum_b >= 77) | (((sum_a + sum_c) >= 76) & (sum_b >= 63))
+        return {"factors": factors, "sums": sums, "high_stress": high_stress}
+
+
+def random_answer_matrix(rng, count, num_questions, missing_rates=(0.0,)):
+    """
+    Random answers 1..4. Each row draws a missing rate from missing_rates and leaves that
+    fraction of its answers at 0 (unanswered).
+    """
+    matrix = rng.integers(1, MAX_ANSWER + 1, size=(count, num_questions), dtype=np.int64)
+    rates = rng.choice(np.asarray(missing_rates, dtype=np.float64), size=count)
+    matrix[rng.random((count, num_questions)) < rates[:, None]] = 0
+    return matrix
+
+
+def fuzz(service, count, seed=0, missing_rates=(0.0, 0.1, 0.5), chunk_size=FUZZ_CHUNK_SIZE, single_rows=1000):
+    """
+    Scores `count` random answer vectors (random genders and missing rates) with the engine's
+    matrix path and with ReferenceScorer, plus a sample of `single_rows` vectors per chunk
+    through the engine's single-row path used by calculate().
+    :return: Report dict with vectors, mismatches (first few), seconds and vectors_per_second
+    """
+    state = service.get_state()
+    engine = state.engine
+    reference = ReferenceScorer(state, engine.question_ids, service._map_score_to_scale)
+    rng = np.random.default_rng(seed)
+    genders = np.array(engine.genders)
+
+    mismatches = []
+    mismatch_count = 0
+    scored = 0
+    started = time.perf_counter()
+    while scored < count:
+        size = min(chunk_size, count - scored)
+        matrix = random_answer_matrix(rng, size, len(engine.question_ids), missing_rates)
+        gender_indices = rng.integers(0, len(genders), size=size)
+
+        actual = engine.score_matrix(matrix, gender_indices)
+        expected = reference.score(matrix, genders[gender_indices])
+
+        bad = (actual["sums"] != expected["sums"]).any(axis=1) | (actual["high_stress"] != expected["high_stress"])
+        for f, factor_id in enumerate(engine.factor_ids):
+            raw, scale, chart_point = expected["factors"][factor_id]
+            bad |= ((actual["raw"][:, f] != raw) | (actual["scale"][:, f] != scale)
+                    | (actual["chart_point"][:, f] != chart_point))
+
+        for row in rng.choice(size, size=min(single_rows, size), replace=False):
+            gender = genders[gender_indices[row]]
+            if (list(engine.chart_points_one(matrix[row], gender)) != actual["chart_point"][row].tolist()
+                    or engine.section_sums_one(matrix[row])[0] != tuple(actual["sums"][row].tolist())):
+                bad[row] = True
+
+        for row in np.flatnonzero(bad)[:max(0, 10 - len(mismatches))]:
+            mismatches.append({"gender": str(genders[gender_indices[row]]), "answers": matrix[row].tolist()})
+        mismatch_count += int(bad.sum())
+        scored += size
+
+    seconds = time.perf_counter() - started
+    return {
+        "vectors": scored,
+        "mismatch_count": mismatch_count,
+        "mismatches": mismatches,
+        "seconds": round(seconds, 3),
+        "vectors_per_second": round(scored / seconds) if seconds else None,
+    }
@@ -0,0 +1,299 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from services.scoring_engine import MAX_ANSWER
+from utils.sqlite_files import ensure_private_file
+
+# Live preview sessions kept on the host (least recently used are dropped first)
+MAX_SCORING_SESSIONS = int(os.environ.get('MAX_SCORING_SESSIONS', 10000))
+# Seconds a session survives without updates
+SCORING_SESSION_TTL = float(os.environ.get('SCORING_SESSION_TTL', 1800))
+# SQLite file shared by all workers on a host, so any worker can serve any session request (holds
+# answers: created with mode 0600). Unset, each worker keeps its own sessions in memory
+SCORING_SESSION_DB = os.environ.get('SCORING_SESSION_DB') or ":memory:"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scoring_sessions (
+    id TEXT PRIMARY KEY,
+    gender TEXT NOT NULL,
+    answers TEXT NOT NULL,  -- JSON {question ID: answer}
+    version TEXT NOT NULL,  -- Scoring data version of the last response
+    revision INTEGER NOT NULL,  -- Bumped on every answer change
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scoring_sessions_last_used ON scoring_sessions (last_used);
+"""
+
+
+class ScoringSession:
+    """
+    Partial result of one respondent, updated one answer at a time.
+
+    Keeps the raw score of every factor and the three section sums. Changing an answer only
+    revisits the factors whose weights reference that question (ScoringEngine.question_factors)
+    and the question's section, then looks the new chart points up in the compiled tables.
+    Unanswered questions count as 0, so result() always equals
+    DiagnosisService.calculate(session.answers, session.gender).
+    """
+
+    def __init__(self, state, gender):
+        engine = state.engine
+        self.version = state.version
+        self.engine = engine
+        self.gender = gender
+        self.answers = {}  # question ID -> answer; used to rebuild after a data reload
+        self._row = [0] * len(engine.question_ids)
+        self._raw = engine.bases.tolist()
+        self._table_base = engine.table_base_lists[engine.gender_index[gender]]
+        chart_table = engine.chart_table_list
+        self.chart_points = [chart_table[base + raw] for base, raw in zip(self._table_base, self._raw)]
+        self.sums = [0] * len(engine.section_keys)  # unanswered questions score 0
+
+    def set_answer(self, q_id, answer):
+        """
+        :param answer: 1-based option index (1..4), or 0 to clear the answer
+        :return: Indices of the factors whose chart point changed
+        """
+        engine = self.engine
+        q = engine.question_index[q_id]
+        previous = self._row[q]
+        if answer == previous:
+            return []
+        self._row[q] = answer
+        if answer:
+            self.answers[q_id] = answer
+        else:
+            self.answers.pop(q_id, None)
+
+        delta = answer - previous
+        raw_scores = self._raw
+        table_base = self._table_base
+        chart_table = engine.chart_table_list
+        chart_points = self.chart_points
+        changed = []
+        for f, weight in engine.question_factors[q]:
+            raw = raw_scores[f] + weight * delta
+            raw_scores[f] = raw
+            point = chart_table[table_base[f] + raw]
+            if point != chart_points[f]:
+                chart_points[f] = point
+                changed.append(f)
+
+        s = engine.question_sections[q]
+        if s is not None:
+            scores = engine.option_score_lists[q]
+            self.sums[s] += scores[answer] - scores[previous]
+        return changed
+
+    @property
+    def high_stress(self):
+        return self.engine.high_stress_one(*self.sums)
+
+    def summary(self):
+        return {
+            "high_stress": bool(self.high_stress),
+            "summary_scores": dict(zip(self.engine.section_keys, self.sums)),
+        }
+
+    def result(self):
+        """
+        Current partial result in the /api/diagnosis response shape.
+        """
+        result = self.engine.build_result(self.chart_points, self.sums, self.high_stress)
+        result["data_version"] = self.version
+        return result
+
+
+class ScoringSessionStore:
+    """
+    Live preview sessions keyed by random session IDs, shared by every worker on the host.
+
+    The answers of each session are stored in SQLite (WAL), so consecutive requests of one
+    respondent may reach different workers. Each process keeps the ScoringSession objects it
+    used last together with the revision they reflect: while nobody else changed a session,
+    updates stay incremental; otherwise the session is rebuilt from the stored answers first.
+    Sessions created before a data reload are rebuilt the same way, so they never mix scoring
+    data versions. Expired sessions, and the least recently used beyond max_sessions, are
+    deleted whenever a session is created.
+    """
+
+    def __init__(self, service, path=":memory:", max_sessions=MAX_SCORING_SESSIONS, ttl=SCORING_SESSION_TTL):
+        self.service = service
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._local = OrderedDict()  # session_id -> (ScoringSession, revision), this process only
+
+    def __len__(self):
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM scoring_sessions").fetchone()[0]
+
+    def _connection(self):
+        # Caller holds self._lock. Opened lazily per process (the store is created before forking)
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(ensure_private_file(self.path), timeout=30, isolation_level=None,
+                                   check_same_thread=False)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+            self._local = OrderedDict()
+        return self._conn
+
+    def _write(self, apply):
+        """
+        Runs apply(conn, now) in one write transaction.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = apply(conn, time.time())
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def create(self, gender, answers=None):
+        """
+        :param answers: Optional initial answers ({QID: index})
+        :return: (session_id, ScoringSession)
+        :raises ValueError: on an unsupported gender, unknown question IDs or answers outside 0..4
+        """
+        state = self.service.get_state()
+        if not state.engine.supports_gender(gender):
+            raise ValueError("Invalid gender. Must be 'male' or 'female'")
+        session = ScoringSession(state, gender)
+        answers = answers or {}
+        self._check(session, answers)
+        self._apply(session, answers)
+        session_id = secrets.token_urlsafe(16)
+
+        def insert(conn, now):
+            if self.ttl is not None:
+                conn.execute("DELETE FROM scoring_sessions WHERE last_used <= ?", (now - self.ttl,))
+            conn.execute("INSERT INTO scoring_sessions (id, gender, answers, version, revision, last_used) "
+                         "VALUES (?, ?, ?, ?, 0, ?)",
+                         (session_id, gender, json.dumps(session.answers), session.version, now))
+            conn.execute("DELETE FROM scoring_sessions WHERE id IN "
+                         "(SELECT id FROM scoring_sessions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                         (self.max_sessions,))
+            self._remember(session_id, session, 0)
+
+        self._write(insert)
+        return session_id, session
+
+    def get(self, session_id):
+        """
+        :return: The session (rebuilt on the current scoring data if needed), or None
+        """
+        def touch(conn, now):
+            session, revision, _ = self._load(conn, session_id, now)
+            if session is not None:
+                self._save(conn, session_id, session, revision, now)
+            return session
+
+        return self._write(touch)
+
+    def update(self, session_id, changes):
+        """
+        Applies answer changes ({QID: index, or 0/None to clear}).
+        :return: (session, factor IDs whose chart point changed), or (None, None) for an unknown session.
+                 After a data reload every factor is reported as changed.
+        :raises ValueError: on unknown question IDs or answers outside 0..4 (nothing is applied then)
+        """
+        changes = {q_id: answer or 0 for q_id, answer in changes.items()}
+
+        def apply(conn, now):
+            session, revision, rebuilt = self._load(conn, session_id, now)
+            if session is None:
+                return None, None, False
+            self._check(session, changes)
+            try:
+                changed = set(self._apply(session, changes))
+                self._save(conn, session_id, session, revision + 1, now)
+            except BaseException:
+                self._local.pop(session_id, None)  # Applied but not stored: rebuild on next use
+                raise
+            return session, changed, rebuilt
+
+        session, changed, rebuilt = self._write(apply)
+        if session is None:
+            return None, None
+        factor_ids = session.engine.factor_ids
+        if rebuilt:
+            return session, list(factor_ids)
+        return session, [factor_ids[f] for f in sorted(changed)]
+
+    def delete(self, session_id):
+        def remove(conn, now):
+            self._local.pop(session_id, None)
+            return conn.execute("DELETE FROM scoring_sessions WHERE id = ?", (session_id,)).rowcount > 0
+
+        return self._write(remove)
+
+    @staticmethod
+    def _check(session, answers):
+        # All changes are checked before any is applied
+        question_index = session.engine.question_index
+        for q_id, answer in answers.items():
+            if q_id not in question_index:
+                raise ValueError(f"Unknown question ID: {q_id}")
+            if type(answer) is not int or not 0 <= answer <= MAX_ANSWER:
+                raise ValueError(f"Answers must be option indices (1-{MAX_ANSWER}) or null")
+
+    @staticmethod
+    def _apply(session, answers):
+        changed = []
+        for q_id, answer in answers.items():
+            changed.extend(session.set_answer(q_id, answer))
+        return changed
+
+    def _load(self, conn, session_id, now):
+        """
+        Caller holds the write transaction.
+        :return: (session or None, stored revision, rebuilt on new scoring data)
+        """
+        row = conn.execute("SELECT gender, answers, version, revision, last_used FROM scoring_sessions WHERE id = ?",
+                           (session_id,)).fetchone()
+        if row is None:
+            self._local.pop(session_id, None)
+            return None, None, False
+        gender, answers, version, revision, last_used = row
+        state = self.service.get_state()
+        if (self.ttl is not None and last_used + self.ttl <= now) or not state.engine.supports_gender(gender):
+            conn.execute("DELETE FROM scoring_sessions WHERE id = ?", (session_id,))
+            self._local.pop(session_id, None)
+            return None, None, False
+
+        session, cached_revision = self._local.get(session_id, (None, None))
+        if session is None or cached_revision != revision or session.version != state.version:
+            # Changed by another worker, dropped from this process, or scored on older data
+            session = ScoringSession(state, gender)
+            # Questions that no longer exist are dropped
+            self._apply(session, {q_id: answer for q_id, answer in json.loads(answers).items()
+                                  if q_id in state.engine.question_index})
+        return session, revision, version != state.version
+
+    def _save(self, conn, session_id, session, revision, now):
+        # Caller holds the write transaction
+        conn.execute("UPDATE scoring_sessions SET answers = ?, version = ?, revision = ?, last_used = ? WHERE id = ?",
+                     (json.dumps(session.answers), session.version, revision, now, session_id))
+        self._remember(session_id, session, revision)
+
+    def _remember(self, session_id, session, revision):
+        local = self._local
+        local[session_id] = (session, revision)
+        local.move_to_end(session_id)
+        while len(local) > self.max_sessions:
+            local.popitem(last=False)
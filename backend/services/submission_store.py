@@ -0,0 +1,284 @@
+import os
+import sqlite3
+import threading
+import time
+
+from services.organization_aggregate import AXIS_KEYS, OrganizationAggregate
+from services.organization_rollup import ORG_PATH_SEPARATOR, normalize_org_path
+from utils.sqlite_files import ensure_private_file
+
+# Rows per executemany() call inside one insert transaction
+INSERT_BATCH_SIZE = 1000
+
+# SQLite file shared by all workers on a host (health data: created with mode 0600). Unset, submissions
+# are kept in memory by each worker and lost on restart; set it to a path on persistent, private storage
+SUBMISSION_DB = os.environ.get('SUBMISSION_DB') or ":memory:"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    org TEXT NOT NULL,
+    period TEXT NOT NULL,
+    respondent TEXT,
+    gender TEXT NOT NULL,
+    high_stress INTEGER NOT NULL,
+    sum_a INTEGER NOT NULL,
+    sum_b INTEGER NOT NULL,
+    sum_c INTEGER NOT NULL,
+    -- Organization diagnosis axis sums; NULL when any of the 12 items is unanswered
+    quantitative_burden INTEGER,
+    control INTEGER,
+    supervisor_support INTEGER,
+    coworker_support INTEGER,
+    -- Answers in question order, one byte each (0 = unanswered), for later re-scoring
+    answers BLOB NOT NULL,
+    data_version TEXT NOT NULL,
+    submitted_at REAL NOT NULL
+    -- Plus one "scale:<factor ID>" column (1-5) per factor, added when the store is opened
+);
+CREATE INDEX IF NOT EXISTS idx_submissions_org_period ON submissions (org, period, high_stress);
+CREATE INDEX IF NOT EXISTS idx_submissions_period ON submissions (period, high_stress);
+CREATE INDEX IF NOT EXISTS idx_submissions_high_stress ON submissions (high_stress, period);
+"""
+
+BASE_COLUMNS = (
+    "org", "period", "respondent", "gender", "high_stress", "sum_a", "sum_b", "sum_c",
+    *AXIS_KEYS, "answers", "data_version", "submitted_at",
+)
+
+SCALE_COLUMN_PREFIX = "scale:"
+SCALES = range(1, 6)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def suppressed_groups(groups, group_by, min_group_size):
+    """
+    Indices of the groups whose counts must not be reported.
+    Besides groups below min_group_size, this applies complementary suppression: the groups
+    sharing all other group_by values add up to a total that can be queried on its own, so
+    when only one of them is suppressed, or the suppressed ones hold fewer than
+    min_group_size submissions together, the smallest reported group is suppressed as well.
+    """
+    suppressed = {i for i, group in enumerate(groups) if group["submissions"] < min_group_size}
+    changed = bool(suppressed)
+    while changed:  # Suppressing along one dimension can expose a group along another
+        changed = False
+        for dimension in group_by:
+            others = [key for key in group_by if key != dimension]
+            partitions = {}
+            for i, group in enumerate(groups):
+                partitions.setdefault(tuple(group[key] for key in others), []).append(i)
+            for members in partitions.values():
+                hidden = [i for i in members if i in suppressed]
+                shown = [i for i in members if i not in suppressed]
+                remainder = sum(groups[i]["submissions"] for i in hidden)
+                if hidden and (len(hidden) == 1 or remainder < min_group_size) and shown:
+                    suppressed.add(min(shown, key=lambda i: (groups[i]["submissions"], i)))
+                    changed = True
+    return suppressed
+
+
+class SubmissionStore:
+    """
+    Embedded SQLite store of scored individual submissions.
+
+    Each submission is one row with its high-stress flag, section sums, organization axis sums
+    and one column per factor scale, so organization diagnoses, high-stress counts and factor
+    distributions are single indexed aggregate queries instead of re-scoring raw answers.
+    Scoring happens before insertion, see DiagnosisService.store_submissions().
+
+    Organizations are "/"-separated paths; filtering by an organization includes its sub-units.
+    The connection is opened lazily per process, so the store can be created before a fork
+    (gunicorn preload_app) and used in every worker.
+
+    :param factor_ids: Factor IDs whose scale columns are created when the database is opened
+    """
+
+    def __init__(self, path=":memory:", factor_ids=()):
+        self.path = path
+        self.factor_ids = tuple(factor_ids)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._scale_ids = set()  # Factor IDs known to have a scale column
+
+    def _connection(self):
+        # Caller holds self._lock
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(ensure_private_file(self.path), check_same_thread=False)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+            self._scale_ids = set(self._scale_columns(conn))
+            self._add_scale_columns(conn, self.factor_ids)
+        return self._conn
+
+    def _add_scale_columns(self, conn, factor_ids):
+        """
+        Adds missing scale columns. The check and the ALTER TABLE run in one write transaction,
+        so processes opening the same database at once never add a column twice.
+        """
+        # Caller holds self._lock
+        if set(factor_ids) <= self._scale_ids:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = set(self._scale_columns(conn))
+            for factor_id in factor_ids:
+                if factor_id not in existing:
+                    conn.execute(f"ALTER TABLE submissions ADD COLUMN {_quote(SCALE_COLUMN_PREFIX + factor_id)} INTEGER")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        self._scale_ids = existing | set(factor_ids)
+
+    def _scale_columns(self, conn):
+        """
+        :return: Factor IDs that have a scale column
+        """
+        return [row[1][len(SCALE_COLUMN_PREFIX):] for row in conn.execute("PRAGMA table_info(submissions)")
+                if row[1].startswith(SCALE_COLUMN_PREFIX)]
+
+    def insert_many(self, submissions, factor_ids, batch_size=INSERT_BATCH_SIZE):
+        """
+        Inserts scored submissions in a single transaction, batch_size rows per executemany().
+        :param submissions: Iterable of dicts with org, period, respondent, gender, high_stress,
+                            sums (a, b, c), axes (4 sums or None), answers (bytes), data_version
+                            and scales (aligned with factor_ids)
+        :param factor_ids: Factor ID of each scale (columns for factors added by a data reload
+                           are created here)
+        :return: Number of submissions inserted
+        """
+        count = 0
+        submitted_at = time.time()
+        with self._lock:
+            conn = self._connection()
+            self._add_scale_columns(conn, factor_ids)
+            with conn:
+                columns = [*BASE_COLUMNS, *(SCALE_COLUMN_PREFIX + factor_id for factor_id in factor_ids)]
+                sql = (f"INSERT INTO submissions ({', '.join(map(_quote, columns))}) "
+                       f"VALUES ({', '.join('?' * len(columns))})")
+                rows = []
+                for submission in submissions:
+                    rows.append((submission["org"], submission["period"], submission.get("respondent"),
+                                 submission["gender"], int(submission["high_stress"]), *submission["sums"],
+                                 *(submission["axes"] or (None,) * len(AXIS_KEYS)), submission["answers"],
+                                 submission["data_version"], submitted_at, *submission["scales"]))
+                    if len(rows) >= batch_size:
+                        conn.executemany(sql, rows)
+                        count += len(rows)
+                        rows = []
+                if rows:
+                    conn.executemany(sql, rows)
+                    count += len(rows)
+        return count
+
+    @staticmethod
+    def _where(org=None, period=None, high_stress=None):
+        """
+        :return: (SQL condition, parameters) for the indexed filters
+        """
+        conditions, params = [], []
+        if org is not None:
+            org = ORG_PATH_SEPARATOR.join(normalize_org_path(org) or ())
+            if not org:
+                raise ValueError("Invalid organization path")
+            # The org itself or any sub-unit ("org/..."): a range scan on the (org, ...) index
+            conditions.append("(org = ? OR (org >= ? AND org < ?))")
+            params += [org, org + ORG_PATH_SEPARATOR, org + chr(ord(ORG_PATH_SEPARATOR) + 1)]
+        if period is not None:
+            conditions.append("period = ?")
+            params.append(period)
+        if high_stress is not None:
+            conditions.append("high_stress = ?")
+            params.append(int(bool(high_stress)))
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+    def _query(self, sql, params):
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def count(self, org=None, period=None, high_stress=None):
+        where, params = self._where(org, period, high_stress)
+        return self._query(f"SELECT COUNT(*) FROM submissions{where}", params)[0][0]
+
+    def organization_aggregate(self, org=None, period=None):
+        """
+        OrganizationAggregate (axis sums, sums of squares, count) over the matching submissions.
+        """
+        where, params = self._where(org, period)
+        where += (" AND " if where else " WHERE ") + "quantitative_burden IS NOT NULL"
+        columns = ", ".join(f"COALESCE(SUM({key}), 0)" for key in AXIS_KEYS)
+        squares = ", ".join(f"COALESCE(SUM({key} * {key}), 0)" for key in AXIS_KEYS)
+        row = self._query(f"SELECT COUNT(*), {columns}, {squares} FROM submissions{where}", params)[0]
+
+        aggregate = OrganizationAggregate()
+        aggregate.count = row[0]
+        aggregate.sums = list(row[1:1 + len(AXIS_KEYS)])
+        aggregate.sum_squares = list(row[1 + len(AXIS_KEYS):])
+        return aggregate
+
+    def high_stress_counts(self, org=None, period=None, group_by=("org", "period"), min_group_size=1):
+        """
+        Submission and high-stress counts per group.
+        Groups with fewer than min_group_size submissions only report their submission count,
+        and so do the groups hidden by suppressed_groups() to protect them.
+        :param group_by: Any of "org" and "period" (empty = one overall group)
+        :return: List of {"org"?, "period"?, "submissions", "suppressed", "high_stress"?, "rate"?}
+        """
+        group_by = tuple(group_by)
+        if not set(group_by) <= {"org", "period"}:
+            raise ValueError("group_by must be 'org' and/or 'period'")
+        where, params = self._where(org, period)
+        columns = "".join(f"{column}, " for column in group_by)
+        group = f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}" if group_by else ""
+        rows = self._query(f"SELECT {columns}COUNT(*), SUM(high_stress) FROM submissions{where}{group}", params)
+
+        groups = []
+        for row in rows:
+            total, flagged = row[-2], row[-1] or 0
+            if not total:
+                continue
+            group_values = dict(zip(group_by, row))
+            group_values.update({"submissions": total, "high_stress": flagged, "rate": round(flagged / total, 4)})
+            groups.append(group_values)
+
+        suppressed = suppressed_groups(groups, group_by, min_group_size)
+        for i, group in enumerate(groups):
+            group["suppressed"] = i in suppressed
+            if i in suppressed:
+                del group["high_stress"], group["rate"]
+        return groups
+
+    def factor_distributions(self, org=None, period=None):
+        """
+        Scale (1-5) counts per factor, in one scan of the matching submissions.
+        :return: {factor_id: {scale: count}}
+        """
+        where, params = self._where(org, period)
+        with self._lock:
+            conn = self._connection()
+            factor_ids = self._scale_columns(conn)
+            if not factor_ids:
+                return {}
+            counts = ", ".join(f"COALESCE(SUM({_quote(SCALE_COLUMN_PREFIX + factor_id)} = {scale}), 0)"
+                               for factor_id in factor_ids for scale in SCALES)
+            row = conn.execute(f"SELECT {counts} FROM submissions{where}", params).fetchone()
+
+        distributions = {}
+        for i, factor_id in enumerate(factor_ids):
+            factor_counts = row[i * len(SCALES):(i + 1) * len(SCALES)]
+            distributions[factor_id] = {scale: count for scale, count in zip(SCALES, factor_counts) if count}
+        return distributions
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
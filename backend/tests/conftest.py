@@ -0,0 +1,2 @@
+# Routers build their stores at import time: redirect them before any test module imports `app`
+import support  # noqa: F401
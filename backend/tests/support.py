@@ -0,0 +1,31 @@
+"""
+Shared test setup. Import it before `app`: the routers open their stores when first imported,
+so the store paths are pointed at a temporary directory of this test run here, and the
+directory is removed when the run ends. tests/conftest.py imports it first under pytest.
+Also holds test data shared by several modules.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+RUN_DIR = tempfile.mkdtemp(prefix="jp-stress-tests-")
+atexit.register(shutil.rmtree, RUN_DIR, ignore_errors=True)
+
+for variable, name in (
+    ('JOB_DB', "jobs.sqlite3"),
+    ('ORG_TRACKER_DB', "organizations.sqlite3"),
+    ('SUBMISSION_DB', "submissions.sqlite3"),
+    ('SCORING_SESSION_DB', "sessions.sqlite3"),
+    ('CHART_CACHE_DIR', "chart-cache"),
+):
+    os.environ[variable] = os.path.join(RUN_DIR, name)
+
+# Add backend directory to sys.path (conftest.py imports this module before any test module)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from services.organization_aggregate import AXES  # noqa: E402
+
+# The 12 items scored by the organization diagnosis, in AXES order
+AXIS_ITEMS = [item for _, items in AXES for item in items]
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from support import AXIS_ITEMS
+from app import app
+from services.answer_validator import AnswerValidator
+from utils.data_loader import DataLoader
+
+
+class TestAnswerValidator(unittest.TestCase):
+    def setUp(self):
+        questions = DataLoader.get_instance().get_questions()
+        self.validator = AnswerValidator(questions)
+        self.complete = {q['id']: 1 + i % 4 for i, q in enumerate(questions)}
+
+    def test_valid_answers(self):
+        self.assertIsNone(self.validator.validate(self.complete))
+        self.assertIsNone(self.validator.validate({"A1": 4}))  # Unanswered questions are allowed
+
+    def test_per_field_errors(self):
+        answers = dict(self.complete, A99=1, A1=0, A2=5, A3="3", A4=2.0, A5=True, A6=None, A7=[1])
+        self.assertEqual(self.validator.validate(answers), {
+            "A99": "Unknown question ID",
+            "A1": "Must be between 1 and 4",
+            "A2": "Must be between 1 and 4",
+            "A3": "Must be an integer option index (1-4)",
+            "A4": "Must be an integer option index (1-4)",
+            "A5": "Must be an integer option index (1-4)",
+            "A6": "Must be an integer option index (1-4)",
+            "A7": "Must be an integer option index (1-4)",
+        })
+        self.assertEqual(self.validator.validate(["A1"]), {"answers": "Must be an object"})
+
+    def test_allow_unknown_ignores_extra_columns(self):
+        self.assertIsNone(self.validator.validate({"A1": 2, "employee_no": "E-17"}, allow_unknown=True))
+        self.assertEqual(self.validator.validate({"A1": 7, "employee_no": "E-17"}, allow_unknown=True),
+                         {"A1": "Must be between 1 and 4"})
+
+
+class TestValidationRoutes(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_diagnosis_rejects_invalid_answers(self):
+        response = self.client.post('/api/diagnosis', json={"gender": "male", "answers": {"A1": 2, "A99": 1, "B2": "x"}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['fields'], {
+            "A99": "Unknown question ID",
+            "B2": "Must be an integer option index (1-4)",
+        })
+
+    def test_organization_skips_invalid_respondents(self):
+        valid = {q: 2 for q in AXIS_ITEMS}
+        response = self.client.post('/api/diagnosis/organization', json={
+            "answers_list": [valid, dict(valid, B1=9), dict(valid, employee_no="E-1")]
+        })
+        self.assertEqual(response.get_json()['count'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from app import create_app
+from asgi import ASGI_BLUEPRINTS
+from utils.asgi_bridge import AsyncWSGIBridge
+
+
+def call(bridge, method, path, body=b"", headers=(), query=b"", parts=1, delay=0):
+    """
+    Sends one request through the ASGI app, the body split into `parts` messages `delay` seconds apart.
+    :return: (status, headers dict, body)
+    """
+    size = -(-len(body) // parts) if body else 0
+    messages = [body[i * size:(i + 1) * size] for i in range(parts)]
+    sent = []
+
+    async def receive():
+        if not messages:
+            await asyncio.sleep(3600)  # No disconnect while the response is sent
+        if delay and len(messages) < parts:
+            await asyncio.sleep(delay)
+        chunk = messages.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(messages)}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "scheme": "http", "path": path,
+        "root_path": "", "query_string": query, "server": ("testserver", 80), "client": ("127.0.0.1", 5000),
+        "headers": [(b"content-length", str(len(body)).encode()), *headers],
+    }
+
+    async def run():
+        await bridge(scope, receive, send)
+        start = sent[0]
+        assert start["type"] == "http.response.start"
+        return (start["status"], {k.decode(): v.decode() for k, v in start["headers"]},
+                b"".join(m.get("body", b"") for m in sent[1:]))
+
+    return run
+
+
+class TestAsyncWSGIBridge(unittest.TestCase):
+    def setUp(self):
+        self.flask_app = create_app(swagger=False, blueprints=ASGI_BLUEPRINTS)
+        self.bridge = AsyncWSGIBridge(self.flask_app, max_workers=2, max_pending=8, max_body_bytes=64 * 1024)
+        self.client = self.flask_app.test_client()
+        question_ids = [q['id'] for q in self.client.get('/api/questions').get_json()]
+        self.record = {"gender": "female", "answers": {q_id: (i % 4) + 1 for i, q_id in enumerate(question_ids)}}
+
+    def tearDown(self):
+        self.bridge.executor.shutdown()
+
+    def _run(self, *requests):
+        async def run_all():
+            return await asyncio.gather(*(request() for request in requests))
+        return asyncio.run(run_all())
+
+    def test_matches_flask_test_client(self):
+        body = json.dumps(self.record).encode()
+        json_headers = [(b"content-type", b"application/json")]
+        [(status, headers, data)] = self._run(call(self.bridge, "POST", "/api/diagnosis", body, json_headers, parts=5))
+        expected = self.client.post('/api/diagnosis', json=self.record)
+        self.assertEqual((status, headers["content-type"]), (200, "application/json"))
+        self.assertEqual(json.loads(data), expected.get_json())
+
+        body = json.dumps({"answers_list": [self.record["answers"]] * 3}).encode()
+        [(status, _, data)] = self._run(call(self.bridge, "POST", "/api/diagnosis/organization", body,
+                                             json_headers, query=b"distributions=true"))
+        expected = self.client.post('/api/diagnosis/organization?distributions=true', data=body,
+                                    content_type='application/json')
+        self.assertIn("distributions", expected.get_json())
+        self.assertEqual(json.loads(data), expected.get_json())
+
+        [(status, headers, data)] = self._run(call(self.bridge, "GET", "/api/questions"))
+        etag = headers["etag"].encode()
+        [(status, _, data)] = self._run(call(self.bridge, "GET", "/api/questions", headers=[(b"if-none-match", etag)]))
+        self.assertEqual((status, data), (304, b""))
+
+    def test_only_mounted_blueprints_are_served(self):
+        [(status, _, _)] = self._run(call(self.bridge, "GET", "/api/submissions"))
+        self.assertEqual(status, 404)
+        [(status, _, _)] = self._run(call(self.bridge, "GET", "/health-check"))
+        self.assertEqual(status, 200)
+
+    def test_rejects_when_busy_and_oversized_bodies(self):
+        bridge = AsyncWSGIBridge(self.flask_app, max_workers=1, max_pending=0, max_body_bytes=16,
+                                 inline_paths=("/health-check",))
+        try:
+            (busy, _, _), (health, _, _) = self._run(call(bridge, "GET", "/api/questions"),
+                                                     call(bridge, "GET", "/health-check"))
+            self.assertEqual((busy, health), (503, 200))
+            self.assertEqual(bridge.rejected, 1)
+        finally:
+            bridge.executor.shutdown()
+
+        bridge = AsyncWSGIBridge(self.flask_app, max_workers=1, max_pending=1, max_body_bytes=16)
+        try:
+            [(status, _, data)] = self._run(call(bridge, "POST", "/api/diagnosis", b"x" * 17))
+            self.assertEqual(status, 413)
+            self.assertIn("error", json.loads(data))
+        finally:
+            bridge.executor.shutdown()
+
+    def test_uploads_count_against_the_limit_before_the_body_arrives(self):
+        bridge = AsyncWSGIBridge(self.flask_app, max_workers=1, max_pending=8, max_body_bytes=64 * 1024,
+                                 max_uploads=1)
+        body = json.dumps(self.record).encode()
+        json_headers = [(b"content-type", b"application/json")]
+        try:
+            # The second request arrives while the first is still uploading, and is turned away unread
+            (slow, _, _), (second, headers, _) = self._run(
+                call(bridge, "POST", "/api/diagnosis", body, json_headers, parts=4, delay=0.05),
+                call(bridge, "POST", "/api/diagnosis", body, json_headers))
+            self.assertEqual((slow, second, headers["retry-after"]), (200, 503, "1"))
+            self.assertEqual((bridge.uploading, bridge.rejected), (0, 1))
+            [(status, _, _)] = self._run(call(bridge, "POST", "/api/diagnosis", body, json_headers))
+            self.assertEqual(status, 200)
+        finally:
+            bridge.executor.shutdown()
+
+    def test_slow_uploads_do_not_hold_workers(self):
+        bridge = AsyncWSGIBridge(self.flask_app, max_workers=1, max_pending=16, max_body_bytes=64 * 1024)
+        body = json.dumps(self.record).encode()
+        json_headers = [(b"content-type", b"application/json")]
+        try:
+            started = time.perf_counter()
+            responses = self._run(*(call(bridge, "POST", "/api/diagnosis", body, json_headers, parts=5, delay=0.05)
+                                    for _ in range(8)))
+            elapsed = time.perf_counter() - started
+        finally:
+            bridge.executor.shutdown()
+        self.assertEqual({status for status, _, _ in responses}, {200})
+        # Uploads overlap on the event loop: about one upload time (0.2s) rather than eight
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(bridge.pending, 0)
+
+    def test_lifespan_calls_startup_hook(self):
+        calls = []
+        bridge = AsyncWSGIBridge(self.flask_app, max_workers=1, max_pending=1, max_body_bytes=1,
+                                 on_startup=lambda: calls.append("startup"))
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        asyncio.run(bridge({"type": "lifespan"}, receive, send))
+        self.assertEqual(calls, ["startup"])
+        self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+
+
+if __name__ == '__main__':
+    unittest.main()
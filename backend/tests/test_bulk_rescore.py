@@ -0,0 +1,45 @@
+import unittest
+import io
+import json
+import random
+import sys
+import os
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from services.bulk_rescore import rescore_stream
+from services.diagnosis_service import DiagnosisService
+
+
+class TestBulkRescore(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService()
+        question_ids = [q['id'] for q in self.service.questions]
+        rng = random.Random(9)
+        self.records = [
+            {"id": f"emp-{i}", "gender": rng.choice(["male", "female"]),
+             "answers": {q_id: rng.randint(1, 4) for q_id in question_ids}}
+            for i in range(250)
+        ]
+        lines = [json.dumps(record) for record in self.records]
+        lines.insert(100, "not json")
+        self.body = ("\n".join(lines) + "\n\n").encode('utf-8')
+
+    def _rescore(self, workers):
+        output = io.BytesIO()
+        count = rescore_stream(io.BytesIO(self.body), output, workers=workers, chunk_lines=40)
+        lines = output.getvalue().decode('utf-8').splitlines()
+        self.assertEqual(count, len(lines))
+        return [json.loads(line) for line in lines]
+
+    def test_output_is_ordered_and_matches_batch(self):
+        expected = [{"id": r["id"], **result} for r, result in zip(self.records, self.service.calculate_batch(self.records))]
+        expected.insert(100, {"error": "Invalid JSON"})
+
+        self.assertEqual(self._rescore(workers=1), expected)
+        self.assertEqual(self._rescore(workers=2), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from app import app
+from services import chart_backgrounds
+from services.chart_backgrounds import RenderCache, background_spec, spec_key
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_concurrent_misses_render_once(self):
+        cache = RenderCache(self.cache_dir)
+        calls = []
+
+        def slow_render():
+            calls.append(1)
+            time.sleep(0.1)
+            return b"png"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("k", slow_render))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [b"png"] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_disk_cache_survives_new_instance(self):
+        RenderCache(self.cache_dir).get("k", lambda: b"png")
+        fresh = RenderCache(self.cache_dir)
+        self.assertEqual(fresh.get("k", lambda: self.fail("should not render")), b"png")
+        self.assertEqual(fresh.renders, 0)
+
+    def test_spec_key_depends_on_coefficients(self):
+        default = spec_key(background_spec("job_stress"))
+        self.assertEqual(default, spec_key(background_spec("job_stress")))
+        self.assertNotEqual(default, spec_key(background_spec("support")))
+        with self.assertRaises(KeyError):
+            background_spec("job_stress", "unknown-set")
+
+
+@unittest.skipIf(not chart_backgrounds.renderer_available(), "matplotlib is not installed")
+class TestBackgroundRoutes(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_png_with_etag_and_304(self):
+        response = self.client.get('/api/charts/backgrounds/job_stress.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'image/png')
+        self.assertTrue(response.data.startswith(b'\x89PNG'))
+
+        etag = response.headers['ETag']
+        response = self.client.get('/api/charts/backgrounds/job_stress.png', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_chart_or_set(self):
+        self.assertEqual(self.client.get('/api/charts/backgrounds/nope.png').status_code, 404)
+        self.assertEqual(self.client.get('/api/charts/backgrounds/support.png?set=nope').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from services.diagnosis_service import DiagnosisService
+from utils.data_loader import DataLoader, DataSnapshot
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+
+class TestDataReload(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        for filename in DataLoader.FILES.values():
+            shutil.copy(os.path.join(BACKEND_DIR, filename), self.data_dir)
+
+        self._previous_instance = DataLoader._instance
+        DataLoader._instance = DataLoader(base_dir=self.data_dir)
+        self.loader = DataLoader._instance
+        self.service = DiagnosisService()
+        self.answers = {q['id']: 2 for q in self.service.questions}
+
+    def tearDown(self):
+        DataLoader._instance = self._previous_instance
+        shutil.rmtree(self.data_dir)
+
+    def _rewrite_scoring_maps(self, update):
+        path = os.path.join(self.data_dir, 'scoring_maps.json')
+        with open(path, encoding='utf-8') as f:
+            scoring_maps = json.load(f)
+        update(scoring_maps)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(scoring_maps, f)
+        # Make sure the mtime changes even on coarse-grained filesystems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_unchanged_files_do_not_reload(self):
+        version = self.service.data_version
+        self.assertFalse(self.loader.reload())
+        self.assertEqual(self.service.data_version, version)
+
+    def test_reload_swaps_in_new_version(self):
+        old_state = self.service.get_state()
+        before = self.service.calculate(self.answers, "male")
+
+        # F-D1 (male: S19) raw score with D1=D2=2 is 6 -> scale 3. Remap 6 to scale 5.
+        def update(scoring_maps):
+            scoring_maps['S19']['3'] = {"min": 5, "max": 5}
+            scoring_maps['S19']['5'] = {"min": 6, "max": 8}
+        self._rewrite_scoring_maps(update)
+
+        self.assertTrue(self.loader.reload())
+        after = self.service.calculate(self.answers, "male")
+
+        self.assertNotEqual(after['data_version'], before['data_version'])
+        support_before = {a['id']: a['score'] for a in before['charts'][2]['axes']}
+        support_after = {a['id']: a['score'] for a in after['charts'][2]['axes']}
+        self.assertEqual(support_before['F-D1'], 3)
+        self.assertEqual(support_after['F-D1'], 5)
+
+        # A computation holding the old state still scores with the old data
+        old_result = old_state.engine.score_one(old_state.engine.encode(self.answers), "male")
+        self.assertEqual(old_result['charts'], before['charts'])
+
+    def test_failed_reload_keeps_previous_version(self):
+        version = self.service.data_version
+        path = os.path.join(self.data_dir, 'factor_definitions.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{ broken')
+
+        with self.assertRaises(ValueError):
+            self.loader.reload(force=True)
+        self.assertEqual(self.service.data_version, version)
+        self.assertIn('result', self.service.calculate(self.answers, "female"))
+
+    def test_reload_reaches_every_worker(self):
+        # Two loaders on one reload directory stand in for two gunicorn workers
+        reload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, reload_dir)
+        receiver = DataLoader(base_dir=self.data_dir, reload_dir=reload_dir)
+        other = DataLoader(base_dir=self.data_dir, reload_dir=reload_dir)
+        other.start_watcher(0.02)
+        self.addCleanup(other.stop_watcher)
+        old_version = other.snapshot.version
+        self.assertEqual(receiver.wait_for_workers(old_version, 5), (1, 0))
+
+        self._rewrite_scoring_maps(lambda scoring_maps: scoring_maps['S19'].update({"3": {"min": 5, "max": 5}}))
+        reloaded, version = receiver.request_reload()
+        self.assertTrue(reloaded)
+        self.assertNotEqual(version, old_version)
+        self.assertEqual(receiver.wait_for_workers(version, 5), (2, 0))
+        self.assertEqual(other.snapshot.version, version)
+
+        # A worker that cannot switch keeps the reload incomplete
+        other.stop_watcher()
+        stuck = DataLoader(base_dir=self.data_dir, reload_dir=reload_dir)
+        stuck._snapshot = DataSnapshot({}, old_version, stuck.snapshot.mtimes)
+        stuck._report_version()
+        self.addCleanup(stuck.stop_watcher)
+        self.assertEqual(receiver.wait_for_workers(version, 0.1), (2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import random
+import sys
+
+import numpy as np
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from app import app
+from services.diagnosis_service import DiagnosisService
+from services.distribution_stats import PERCENTILES, DistributionAggregate, histogram_stats
+from services.organization_aggregate import AXIS_KEYS, axis_scores
+
+
+class TestDistributionStats(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService(cache_size=0)
+        self.engine = self.service.engine
+        self.rng = random.Random(18)
+
+    def _answers(self, complete=True):
+        question_ids = self.engine.question_ids
+        if not complete:
+            question_ids = self.rng.sample(question_ids, 40)
+        return {q: self.rng.randint(1, 4) for q in question_ids}
+
+    def _assert_stats(self, stats, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.assertEqual(stats["count"], len(values))
+        self.assertAlmostEqual(stats["mean"], round(values.mean(), 2))
+        self.assertAlmostEqual(stats["std"], round(values.std(), 2))
+        self.assertEqual(stats["min"], values.min())
+        self.assertEqual(stats["max"], values.max())
+        for p in PERCENTILES:
+            self.assertAlmostEqual(stats["percentiles"][f"p{p}"], round(float(np.percentile(values, p)), 2))
+
+    def test_histogram_stats_match_numpy(self):
+        for n in (1, 2, 7, 100):
+            values = [self.rng.randint(3, 12) for _ in range(n)]
+            counts = np.bincount(values, minlength=13)[3:]
+            self._assert_stats(histogram_stats(range(3, 13), counts), values)
+        self.assertEqual(histogram_stats(range(3, 13), np.zeros(10)), {"count": 0})
+
+    def test_distributions_match_naive_computation(self):
+        answers_list = [self._answers(complete=self.rng.random() < 0.7) for _ in range(500)]
+        answers_list.append({"A1": 9})  # invalid, skipped
+
+        result = self.service.calculate_organization_distribution(answers_list, chunk_size=64)
+        expected = self.service.calculate_organization_diagnosis(answers_list)
+        distributions = result.pop("distributions")
+        self.assertEqual(result, expected)
+
+        axes = [axis_scores(a) for a in answers_list]
+        axes = [scores for scores in axes if scores is not None]
+        for i, key in enumerate(AXIS_KEYS):
+            self._assert_stats(distributions["axes"][key], [scores[i] for scores in axes])
+
+        valid = answers_list[:-1]
+        matrix = np.stack([self.engine.encode(a) for a in valid])
+        raw = matrix @ self.engine.weights.T + self.engine.bases
+        for f, factor_id in enumerate(self.engine.factor_ids):
+            items = self.engine.weights[f] != 0
+            answered = (matrix[:, items] > 0).all(axis=1)
+            self._assert_stats(distributions["factors"][factor_id], raw[answered, f])
+
+        complete = [a for a in valid if len(a) == len(self.engine.question_ids)]
+        high_stress = [self.service.calculate(a, "male")["result"]["high_stress"] for a in complete]
+        self.assertEqual(distributions["high_stress"]["respondents"], len(complete))
+        self.assertEqual(distributions["high_stress"]["count"], sum(high_stress))
+
+    def test_merge_equals_single_pass(self):
+        matrix = np.stack([self.engine.encode(self._answers()) for _ in range(200)])
+        whole = DistributionAggregate(self.engine)
+        whole.add_matrix(matrix)
+        left, right = DistributionAggregate(self.engine), DistributionAggregate(self.engine)
+        left.add_matrix(matrix[:73])
+        right.add_matrix(matrix[73:])
+        self.assertEqual(left.merge(right).result(), whole.result())
+
+    def test_route_returns_distributions(self):
+        client = app.test_client()
+        answers_list = [self._answers() for _ in range(20)]
+        response = client.post('/api/diagnosis/organization?distributions=true', json={"answers_list": answers_list})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["distributions"]["axes"]["control"]["count"], 20)
+
+        response = client.post('/api/diagnosis/organization', json={"answers_list": answers_list})
+        self.assertNotIn("distributions", response.get_json())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import unittest
+import json
+import random
+import signal
+import sys
+import os
+import tempfile
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from support import AXIS_ITEMS
+from app import app
+from routers import jobs
+from services.diagnosis_service import DiagnosisService
+from services.job_queue import OrganizationJobQueue, QueueFullError, split_lines
+from utils.data_loader import DataLoader, DataSnapshot
+
+
+
+class TestOrganizationJobQueue(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "jobs.sqlite3")
+        cls.queue = OrganizationJobQueue(cls.path, max_workers=1, max_pending=4, chunk_respondents=70, chunk_bytes=1000)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.queue.shutdown()
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.answers_list = [{q: rng.randint(1, 4) for q in AXIS_ITEMS} for _ in range(500)]
+        self.expected = DiagnosisService().calculate_organization_diagnosis(self.answers_list)
+
+    def test_chunked_job_matches_direct_calculation(self):
+        job = self.queue.submit_answers(self.answers_list)
+        status = self.queue.get(job.id, wait=60)
+
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["total_chunks"], 8)
+        self.assertEqual(status["progress"], 1.0)
+        self.assertEqual(status["result"], self.expected)
+
+    def test_ndjson_and_csv_jobs(self):
+        ndjson = "\n".join(json.dumps(a) for a in self.answers_list).encode()
+        csv_body = (",".join(AXIS_ITEMS) + "\n" + "\n".join(
+            ",".join(str(a[q]) for q in AXIS_ITEMS) for a in self.answers_list)).encode()
+
+        for mimetype, body in (("application/x-ndjson", ndjson), ("text/csv", csv_body)):
+            job = self.queue.submit_stream(mimetype, body)
+            status = self.queue.get(job.id, wait=60)
+            self.assertGreater(status["total_chunks"], 1)
+            self.assertEqual(status["respondents"], len(self.answers_list))
+            self.assertEqual(status["result"], self.expected, mimetype)
+
+    def test_invalid_chunk_fails_job(self):
+        job = self.queue.submit_stream("application/x-ndjson", b'{"A1": 1}\nnot json\n')
+        status = self.queue.get(job.id, wait=60)
+        self.assertEqual(status["status"], "failed")
+        self.assertIn("Invalid JSON", status["error"])
+
+    def test_backpressure(self):
+        full = OrganizationJobQueue(os.path.join(self.tmp.name, "full.sqlite3"), max_workers=1, max_pending=0)
+        with self.assertRaises(QueueFullError):
+            full.submit_answers(self.answers_list)
+
+    def test_jobs_are_shared_between_workers(self):
+        # Another queue on the same file stands in for another web worker
+        other = OrganizationJobQueue(self.path, max_workers=1, max_pending=4)
+        try:
+            job = self.queue.submit_answers(self.answers_list)
+            self.assertEqual(other.get(job.id, wait=60)["result"], self.expected)
+            self.assertIsNone(other.get("unknown"))
+        finally:
+            other.shutdown()
+
+    def test_queued_jobs_survive_the_submitting_process(self):
+        path = os.path.join(self.tmp.name, "takeover.sqlite3")
+        stopped = OrganizationJobQueue(path, max_workers=1, chunk_respondents=200)
+        stopped.shutdown()  # Never runs the pool, like a worker that died after submitting
+        job = stopped.submit_answers(self.answers_list)
+        self.assertEqual(stopped.pending_count(), 1)
+
+        runner = OrganizationJobQueue(path, max_workers=1)
+        try:
+            status = runner.get(job.id, wait=60)
+        finally:
+            runner.shutdown()
+        self.assertEqual((status["status"], status["total_chunks"]), ("completed", 3))
+        self.assertEqual(status["result"], self.expected)
+
+    def test_jobs_run_after_a_pool_process_dies(self):
+        queue = OrganizationJobQueue(os.path.join(self.tmp.name, "killed.sqlite3"), max_workers=1)
+        try:
+            job = queue.submit_answers(self.answers_list)
+            self.assertEqual(queue.get(job.id, wait=60)["status"], "completed")
+            for pid in list(queue._executor._processes):
+                os.kill(pid, signal.SIGKILL)  # e.g. the OOM killer
+
+            jobs = [queue.submit_answers(self.answers_list) for _ in range(3)]
+            for job in jobs:
+                self.assertEqual(queue.get(job.id, wait=60)["result"], self.expected)
+            self.assertEqual(queue.pending_count(), 0)
+        finally:
+            queue.shutdown()
+
+    def test_chunks_follow_data_reloads(self):
+        job = self.queue.submit_answers(self.answers_list)
+        self.assertEqual(self.queue.get(job.id, wait=60)["result"], self.expected)
+
+        # A reloaded questions.json where A1 has 3 options: answers with A1 = 4 are no longer valid
+        loader = DataLoader.get_instance()
+        previous = loader.snapshot
+        questions = [dict(q, options=q["options"][:3]) if q["id"] == "A1" else q for q in previous.get("questions")]
+        loader._snapshot = DataSnapshot(dict(previous._data, questions=questions), "reloaded", previous.mtimes)
+        try:
+            job = self.queue.submit_answers(self.answers_list)
+            status = self.queue.get(job.id, wait=60)
+        finally:
+            loader._snapshot = previous
+        valid = [answers for answers in self.answers_list if answers["A1"] <= 3]
+        self.assertLess(len(valid), len(self.answers_list))
+        self.assertEqual(status["result"], DiagnosisService().calculate_organization_diagnosis(valid))
+
+    def test_split_lines_keeps_lines_whole(self):
+        data = b"".join(b"line%d\n" % i for i in range(100))
+        chunks = split_lines(data, 50, header=b"h\n")
+        self.assertTrue(all(chunk.startswith(b"h\n") and chunk.endswith(b"\n") for chunk in chunks))
+        self.assertEqual(b"".join(chunk[2:] for chunk in chunks), data)
+
+
+class TestJobRoutes(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_submit_and_long_poll(self):
+        answers_list = [{q: 2 for q in AXIS_ITEMS}] * 3
+        response = self.client.post('/api/diagnosis/organization/jobs', json={"answers_list": answers_list})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+
+        response = self.client.get(f'/api/diagnosis/organization/jobs/{job_id}?wait=30')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['result']['count'], 3)
+
+    def test_unknown_job_and_full_queue(self):
+        self.assertEqual(self.client.get('/api/diagnosis/organization/jobs/nope').status_code, 404)
+
+        max_pending = jobs.job_queue.max_pending
+        jobs.job_queue.max_pending = 0
+        try:
+            response = self.client.post('/api/diagnosis/organization/jobs', json={"answers_list": [{"A1": 1}]})
+        finally:
+            jobs.job_queue.max_pending = max_pending
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
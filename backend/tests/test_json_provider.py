@@ -0,0 +1,74 @@
+import unittest
+import datetime
+import json
+import os
+import sys
+from unittest import mock
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from app import create_app
+from utils.json_provider import fast_json_available
+
+
+@unittest.skipUnless(fast_json_available(), "orjson is not installed")
+class TestFastJSONProvider(unittest.TestCase):
+    def setUp(self):
+        self.stdlib_app = create_app(swagger=False, fast_json=False)
+        self.fast_app = create_app(swagger=False, fast_json=True)
+
+    def test_output_matches_stdlib_provider(self):
+        payloads = [
+            {"label": "스트레스 요인 (A)", "score": 3, "rate": 0.1234, "flag": True, "none": None},
+            {"F-A1": {1: 12, 5: 3}, "F-B2": {}},  # scale -> count maps have integer keys
+            {"when": datetime.date(2025, 1, 2), "big": 2 ** 70},  # Flask's default() / stdlib fallback
+            [1, "a", [2.5, {"z": 1, "a": 2}]],
+        ]
+        for payload in payloads:
+            with self.stdlib_app.app_context():
+                expected = self.stdlib_app.json.response(payload).get_data()
+            with self.fast_app.app_context():
+                actual = self.fast_app.json.response(payload).get_data()
+                self.assertEqual(json.loads(actual), json.loads(expected))
+                self.assertEqual(self.fast_app.json.loads(self.fast_app.json.dumps(payload)), json.loads(expected))
+
+        with self.fast_app.app_context():
+            body = self.fast_app.json.response({"b": np.int64(2), "a": np.arange(3)}).get_data()
+        self.assertEqual(body, b'{"a":[0,1,2],"b":2}\n')  # sorted keys like the stdlib provider
+
+    def test_debug_and_keyword_arguments(self):
+        provider = self.fast_app.json
+        with self.fast_app.app_context():
+            self.fast_app.debug = True
+            self.assertIn(b'\n  "a": 1', provider.response({"a": 1}).get_data())
+            self.fast_app.debug = False
+            self.assertEqual(provider.response({"a": 1}).get_data(), b'{"a":1}\n')
+            # json.dumps() keyword arguments go through the stdlib provider
+            self.assertEqual(provider.dumps({"a": "é"}, ensure_ascii=True), '{"a": "\\u00e9"}')
+
+    def test_requests_behave_like_stdlib_provider(self):
+        answers = {f"{section}{i}": 2 for section, count in (("A", 17), ("B", 29), ("C", 9), ("D", 2))
+                   for i in range(1, count + 1)}
+        bodies = [
+            ('/api/diagnosis', json.dumps({"gender": "female", "answers": answers})),
+            ('/api/diagnosis/organization?distributions=true', json.dumps({"answers_list": [answers] * 3})),
+            ('/api/diagnosis', '{"gender": "male", "answers": '),
+        ]
+        for route, body in bodies:
+            responses = [app.test_client().post(route, data=body, content_type='application/json')
+                         for app in (self.stdlib_app, self.fast_app)]
+            self.assertEqual(responses[0].status_code, responses[1].status_code)
+            self.assertEqual(responses[0].get_json(), responses[1].get_json())
+
+    def test_stdlib_fallback_without_orjson(self):
+        with mock.patch('utils.json_provider.orjson', None), self.fast_app.app_context():
+            self.assertEqual(self.fast_app.json.response({"a": "é"}).get_data(), b'{"a":"\\u00e9"}\n')
+            self.assertEqual(self.fast_app.json.loads('{"a": 1}'), {"a": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
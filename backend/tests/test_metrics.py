@@ -0,0 +1,92 @@
+import unittest
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.metrics import MetricsRegistry, remove_process_files
+
+
+def _registry(directory):
+    registry = MetricsRegistry(directory)
+    requests = registry.counter("requests_total", "Requests.", labelnames=("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0), labelnames=("route",))
+    registry.callback("entries", "Entries.", "gauge", lambda: {(): 5})
+    registry.callback("hits_total", "Hits.", "counter", lambda: {(): 2})
+    return registry, requests, latency
+
+
+def _worker(directory, ready, done):
+    # Stands in for another gunicorn worker: records, publishes, then waits until told to exit
+    registry, requests, latency = _registry(directory)
+    requests.inc(3, "/a")
+    latency.observe(0.5, "/a")
+    registry.write_process_file()
+    ready.set()
+    done.wait(30)
+
+
+class TestSharedMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.context = multiprocessing.get_context("fork")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_values_are_summed_over_processes(self):
+        registry, requests, latency = _registry(self.tmp.name)
+        requests.inc(1, "/a")
+        requests.inc(1, "/b")
+        latency.observe(0.05, "/a")
+
+        ready, done = self.context.Event(), self.context.Event()
+        worker = self.context.Process(target=_worker, args=(self.tmp.name, ready, done))
+        worker.start()
+        try:
+            self.assertTrue(ready.wait(30))
+            text = registry.render()
+            self.assertIn('requests_total{route="/a"} 4', text)
+            self.assertIn('requests_total{route="/b"} 1', text)
+            self.assertIn('latency_seconds_bucket{route="/a",le="0.1"} 1', text)
+            self.assertIn('latency_seconds_bucket{route="/a",le="1"} 2', text)
+            self.assertIn('latency_seconds_count{route="/a"} 2', text)
+            self.assertIn('latency_seconds_sum{route="/a"} 0.55', text)
+            self.assertIn('entries 10', text)
+            self.assertIn('hits_total 4', text)
+        finally:
+            done.set()
+            worker.join(30)
+
+        # Counts of an exited worker stay; its gauges do not
+        text = registry.render()
+        self.assertIn('requests_total{route="/a"} 4', text)
+        self.assertIn('hits_total 4', text)
+        self.assertIn('entries 5', text)
+
+        remove_process_files(self.tmp.name)
+        self.assertIn('requests_total{route="/a"} 1', registry.render())
+
+    def test_exporter_writes_on_stop(self):
+        registry, requests, _ = _registry(self.tmp.name)
+        registry.start_exporter(interval=60)
+        requests.inc(7, "/a")
+        registry.stop_exporter()
+
+        with open(os.path.join(self.tmp.name, f"metrics-{os.getpid()}.json"), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["requests_total"], [[["/a"], 7]])
+
+    def test_without_directory_only_this_process_is_reported(self):
+        registry, requests, _ = _registry(None)
+        requests.inc(2, "/a")
+        registry.start_exporter()
+        self.assertIn('requests_total{route="/a"} 2', registry.render())
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,13 @@ import os
 # Add backend directory to sys.path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+import io
+import json
+
+from support import AXIS_ITEMS
 from services.diagnosis_service import DiagnosisService
+from services.organization_aggregate import OrganizationAggregate
+from utils.stream_readers import iter_csv, iter_ndjson, StreamFormatError
 
 class TestOrganizationDiagnosis(unittest.TestCase):
     def setUp(self):
@@ -112,5 +118,181 @@ class TestOrganizationDiagnosis(unittest.TestCase):
         self.assertTrue(90 < result['health_risk']['support_risk'] < 110, f"Risk B {result['health_risk']['support_risk']} not near 100")
         self.assertTrue(90 < result['health_risk']['comprehensive_risk'] < 110)
 
+class TestOrganizationStreaming(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService()
+        self.answers_list = [
+            {qid: (i + j) % 4 + 1 for j, qid in enumerate(AXIS_ITEMS)}
+            for i in range(50)
+        ]
+        # Rows with missing or invalid items are skipped
+        self.answers_list.append({"A1": 1})
+        self.answers_list.append({qid: "x" for qid in AXIS_ITEMS})
+
+    def test_ndjson_stream_matches_list(self):
+        body = "\n".join(json.dumps(answers) for answers in self.answers_list).encode('utf-8')
+        expected = self.service.calculate_organization_diagnosis(self.answers_list)
+        result = self.service.calculate_organization_diagnosis(iter_ndjson(io.BytesIO(body)))
+        self.assertEqual(result, expected)
+        self.assertEqual(result['count'], 50)
+
+    def test_csv_stream_matches_list(self):
+        lines = [",".join(AXIS_ITEMS)]
+        for answers in self.answers_list:
+            lines.append(",".join(str(answers.get(qid, "")) for qid in AXIS_ITEMS))
+        body = ("\ufeff" + "\r\n".join(lines)).encode('utf-8')
+
+        expected = self.service.calculate_organization_diagnosis(self.answers_list)
+        result = self.service.calculate_organization_diagnosis(iter_csv(io.BytesIO(body)))
+        self.assertEqual(result, expected)
+
+    def test_invalid_ndjson_line_reports_line_number(self):
+        body = b'{"A1": 1}\n\n{not json}\n'
+        with self.assertRaisesRegex(StreamFormatError, "line 3"):
+            list(iter_ndjson(io.BytesIO(body)))
+
+
+class TestOrganizationPartialMerge(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService()
+        self.answers_list = [
+            {qid: (i * 7 + j * 3) % 4 + 1 for j, qid in enumerate(AXIS_ITEMS)}
+            for i in range(97)
+        ]
+
+    def test_merged_partials_match_single_pass(self):
+        expected = self.service.calculate_organization_diagnosis(self.answers_list)
+
+        # Uneven shards, serialized and restored as if sent between nodes
+        shards = [self.answers_list[:10], self.answers_list[10:11], self.answers_list[11:60], self.answers_list[60:]]
+        partials = [self.service.aggregate_organization(shard).to_dict() for shard in shards]
+        partials.append(OrganizationAggregate().to_dict())  # Empty department
+
+        merged = self.service.merge_organization_partials(json.loads(json.dumps(partials)))
+
+        self.assertEqual(merged.result(), expected)
+        single = self.service.aggregate_organization(self.answers_list)
+        self.assertEqual(merged.to_dict(), single.to_dict())
+        self.assertEqual(merged.standard_deviations(), single.standard_deviations())
+
+    def test_merge_without_squares_drops_squares(self):
+        with_squares = self.service.aggregate_organization(self.answers_list[:5]).to_dict()
+        without_squares = self.service.aggregate_organization(self.answers_list[5:]).to_dict()
+        del without_squares['sum_squares']
+
+        merged = self.service.merge_organization_partials([with_squares, without_squares])
+
+        self.assertIsNone(merged.sum_squares)
+        self.assertIsNone(merged.standard_deviations())
+        self.assertEqual(merged.result(), self.service.calculate_organization_diagnosis(self.answers_list))
+
+    def test_invalid_partial_is_rejected(self):
+        with self.assertRaises(ValueError):
+            OrganizationAggregate.from_dict({"count": -1, "sums": {}})
+        with self.assertRaises(ValueError):
+            OrganizationAggregate.from_dict({"count": 1, "sums": {"control": 3}})
+
+    def test_impossible_partials_are_rejected(self):
+        valid = self.service.aggregate_organization(self.answers_list[:5]).to_dict()
+        self.assertEqual(OrganizationAggregate.from_dict(valid).to_dict(), valid)
+
+        def changed(update):
+            partial = json.loads(json.dumps(valid))
+            update(partial)
+            return partial
+
+        impossible = [
+            changed(lambda p: p.update(count=1)),  # Sums far above 12 per respondent
+            changed(lambda p: p["sums"].update(control=-40)),
+            changed(lambda p: p["sums"].update(control=14)),  # Below 3 per respondent
+            changed(lambda p: p["sums"].update(control=float(p["sums"]["control"]))),
+            changed(lambda p: p["sum_squares"].update(control=p["sum_squares"]["control"] + 1000)),
+            changed(lambda p: p["sum_squares"].update(control=1)),
+            {"count": 0, "sums": dict.fromkeys(valid["sums"], 5)},
+        ]
+        for partial in impossible:
+            with self.assertRaises(ValueError, msg=partial):
+                OrganizationAggregate.from_dict(partial)
+
+
+
+class TestOrganizationRollup(unittest.TestCase):
+    TEAMS = [["Co", "Sales", "T1"], ["Co", "Sales", "T2"], ["Co", "Dev", "T1"], ["Co", "Dev"]]
+
+    def setUp(self):
+        self.service = DiagnosisService()
+        self.respondents = []
+        for i in range(120):
+            self.respondents.append({
+                "org_path": self.TEAMS[i % 4] if i < 117 else ["Co", "Dev", "Solo"],
+                "answers": {qid: (i * 5 + j) % 4 + 1 for j, qid in enumerate(AXIS_ITEMS)}
+            })
+
+    def test_every_node_matches_direct_calculation(self):
+        result = self.service.calculate_organization_rollup(self.respondents, min_group_size=5)
+        nodes = {tuple(node['path']): node for node in result['nodes']}
+
+        self.assertEqual(set(nodes), {
+            ("Co",), ("Co", "Sales"), ("Co", "Dev"),
+            ("Co", "Sales", "T1"), ("Co", "Sales", "T2"), ("Co", "Dev", "T1"), ("Co", "Dev", "Solo"),
+        })
+
+        for path, node in nodes.items():
+            members = [r['answers'] for r in self.respondents if tuple(r['org_path'][:len(path)]) == path]
+            self.assertEqual(node['count'], len(members))
+            if node['suppressed']:
+                continue
+            expected = self.service.calculate_organization_diagnosis(members)
+            self.assertEqual(node['averages'], expected['averages'])
+            self.assertEqual(node['health_risk'], expected['health_risk'])
+
+    def test_small_units_are_suppressed(self):
+        result = self.service.calculate_organization_rollup(self.respondents, min_group_size=5)
+        solo = next(node for node in result['nodes'] if node['path'] == ["Co", "Dev", "Solo"])
+        self.assertEqual(solo['count'], 3)
+        self.assertTrue(solo['suppressed'])
+        self.assertNotIn('health_risk', solo)
+
+    def test_complementary_suppression(self):
+        # Co = Sales + Dev: Sales (3) is too small, so Dev would reveal it as Co minus Dev
+        answers = self.respondents[0]['answers']
+        respondents = ([{"org_path": ["Co", "Dev", "T1"], "answers": answers}] * 10
+                       + [{"org_path": ["Co", "Dev", "T2"], "answers": answers}] * 10
+                       + [{"org_path": ["Co", "Sales"], "answers": answers}] * 3)
+        result = self.service.calculate_organization_rollup(respondents, min_group_size=5)
+        suppressed = {tuple(node['path']): node['suppressed'] for node in result['nodes']}
+        self.assertEqual(suppressed, {
+            ("Co",): False, ("Co", "Sales"): True,
+            # Dev and its whole subtree, so Dev cannot be rebuilt as T1 + T2 either
+            ("Co", "Dev"): True, ("Co", "Dev", "T1"): True, ("Co", "Dev", "T2"): True,
+        })
+
+        # A large enough remainder needs no extra suppression
+        respondents += [{"org_path": ["Co"], "answers": answers}] * 2
+        result = self.service.calculate_organization_rollup(respondents, min_group_size=5)
+        self.assertEqual([node['path'] for node in result['nodes'] if node['suppressed']], [["Co", "Sales"]])
+
+    def test_csv_org_path_stays_a_string(self):
+        answers = self.respondents[0]['answers']
+        body = (",".join(["org_path", *answers]) + "\n"
+                + ("100," + ",".join(str(v) for v in answers.values()) + "\n") * 3).encode()
+        rows = list(iter_csv(io.BytesIO(body)))
+        self.assertEqual(rows[0]['org_path'], "100")
+        self.assertEqual(rows[0]['A1'], answers['A1'])
+        result = self.service.calculate_organization_rollup(
+            {"org_path": row['org_path'], "answers": row} for row in rows)
+        self.assertEqual((result['skipped'], result['nodes'][0]['path']), (0, ["100"]))
+
+    def test_invalid_respondents_are_skipped(self):
+        respondents = self.respondents + [
+            {"org_path": [], "answers": self.respondents[0]['answers']},
+            {"org_path": "Co/Sales", "answers": {"A1": 1}},
+            "invalid",
+        ]
+        result = self.service.calculate_organization_rollup(respondents)
+        self.assertEqual(result['skipped'], 3)
+        self.assertEqual(result['nodes'][0]['count'], 120)
+
+
 if __name__ == '__main__':
     unittest.main()
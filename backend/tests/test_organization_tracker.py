@@ -0,0 +1,144 @@
+import unittest
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from support import AXIS_ITEMS
+from app import app
+from services.diagnosis_service import DiagnosisService
+from services.organization_tracker import OrganizationTracker
+
+
+
+class TestOrganizationTracker(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService(cache_size=0)
+        self.rng = random.Random(21)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _answers(self):
+        return {q: self.rng.randint(1, 4) for q in AXIS_ITEMS}
+
+    def test_random_updates_match_full_recompute(self):
+        tracker = OrganizationTracker()
+        current = {}
+        for _ in range(2000):
+            respondent = f"r{self.rng.randrange(150)}"
+            if current and self.rng.random() < 0.2:
+                respondent = self.rng.choice(sorted(current))
+                tracker.withdraw("org", respondent)
+                del current[respondent]
+            else:
+                answers = self._answers()
+                tracker.submit("org", respondent, answers)
+                current[respondent] = answers
+
+        expected = self.service.aggregate_organization(current.values())
+        self.assertEqual(tracker.aggregate("org").to_dict(), expected.to_dict())
+        self.assertEqual(tracker.result("org"), expected.result())
+
+    def test_workers_share_one_database(self):
+        # A second tracker on the same file stands in for another web worker
+        path = os.path.join(self.tmp_dir, "orgs.sqlite3")
+        tracker, other = OrganizationTracker(path), OrganizationTracker(path)
+        tracker.submit("sales", "a", self._answers())
+        self.assertEqual(other.submit("sales", "a", self._answers()), "updated")
+        other.submit("sales", "b", self._answers())
+        tracker.submit("rnd", "c", self._answers())
+        self.assertTrue(other.withdraw("rnd", "c"))
+
+        self.assertEqual(tracker.organizations(), {"sales": 2})
+        self.assertEqual(tracker.aggregate("sales").to_dict(), other.aggregate("sales").to_dict())
+        tracker.close()
+        other.close()
+        self.assertEqual(OrganizationTracker(path).organizations(), {"sales": 2})
+
+    def test_small_organizations_are_suppressed(self):
+        tracker = OrganizationTracker()
+        for i in range(9):
+            tracker.submit("org", f"r{i}", self._answers())
+        self.assertEqual(tracker.result("org"), {"count": 9, "suppressed": True, "min_group_size": 10})
+        tracker.submit("org", "r9", self._answers())
+        self.assertIn("averages", tracker.result("org"))
+        self.assertTrue(tracker.result("org", min_group_size=11)["suppressed"])
+        with self.assertRaises(ValueError):
+            tracker.result("org", min_group_size=0)
+
+    def test_journal_import_skips_a_torn_last_line(self):
+        path = os.path.join(self.tmp_dir, "orgs.ndjson")
+        events = [
+            {"op": "submit", "org": "sales", "respondent": "a", "scores": [6, 6, 6, 6]},
+            {"op": "submit", "org": "sales", "respondent": "a", "scores": [9, 9, 9, 9]},
+            {"op": "submit", "org": "rnd", "respondent": "c", "scores": [3, 3, 3, 3]},
+            {"op": "withdraw", "org": "rnd", "respondent": "c"},
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(event) + "\n" for event in events)
+            f.write('{"op": "submit", "org"')  # Crash in the middle of an append
+
+        tracker = OrganizationTracker()
+        self.assertEqual(tracker.import_journal(path), 4)
+        self.assertEqual(tracker.organizations(), {"sales": 1})
+        self.assertEqual(tracker.aggregate("sales").sums, [9, 9, 9, 9])
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(path + ".imported"))
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines([json.dumps(events[0]) + "\n", "not json\n", json.dumps(events[1]) + "\n"])
+        with self.assertRaises(ValueError):
+            OrganizationTracker().import_journal(path)
+
+    def test_invalid_answers_are_rejected(self):
+        tracker = OrganizationTracker()
+        with self.assertRaises(ValueError):
+            tracker.submit("org", "a", {"A1": 1})
+        self.assertFalse(tracker.withdraw("org", "a"))
+
+
+class TestOrganizationRoutes(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_submit_amend_withdraw(self):
+        base = '/api/organizations/route-test'
+        first = {q: 1 for q in AXIS_ITEMS}
+        second = {q: 4 for q in AXIS_ITEMS}
+
+        response = self.client.put(f'{base}/respondents/a', json={"answers": first})
+        self.assertEqual(response.get_json()['status'], "created")
+        for i in range(9):
+            response = self.client.put(f'{base}/respondents/r{i}', json={"answers": second})
+            self.assertEqual(response.get_json().get('suppressed'), True if i < 8 else None)
+        self.assertEqual(response.get_json()['count'], 10)
+        self.assertEqual(response.get_json()['averages']['control'], 3.9)
+        response = self.client.put(f'{base}/respondents/a', json={"answers": second})
+        self.assertEqual(response.get_json()['status'], "updated")
+        self.assertEqual(response.get_json()['averages']['control'], 3)
+
+        self.assertEqual(self.client.get(f'{base}/diagnosis?min_group_size=0').status_code, 400)
+        response = self.client.delete(f'{base}/respondents/r0')
+        self.assertEqual((response.get_json()['count'], response.get_json()['suppressed']), (9, True))
+        self.assertNotIn("averages", response.get_json())
+        self.assertEqual(self.client.delete(f'{base}/respondents/r0').status_code, 404)
+        for respondent in ["a", *(f"r{i}" for i in range(1, 9))]:
+            self.client.delete(f'{base}/respondents/{respondent}')
+        self.assertEqual(self.client.get(f'{base}/diagnosis').status_code, 404)
+
+    def test_invalid_answers(self):
+        response = self.client.put('/api/organizations/x/respondents/a', json={"answers": {"A1": 9}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['fields'], {"A1": "Must be between 1 and 4"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import io
+import json
+import os
+import random
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from app import app
+from services.diagnosis_service import DiagnosisService
+from services.report_pipeline import generate_report_zip
+
+
+class TestReportPipeline(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService(cache_size=0)
+        self.rng = random.Random(17)
+        self.question_ids = self.service.engine.question_ids
+
+    def _record(self, i):
+        return {
+            "id": f"emp-{i}",
+            "gender": self.rng.choice(["male", "female"]),
+            "answers": {q: self.rng.randint(1, 4) for q in self.question_ids},
+        }
+
+    def test_reports_match_individual_diagnoses(self):
+        records = [self._record(i) for i in range(25)]
+        records.insert(3, {"id": "bad", "gender": "other", "answers": {"A1": 1}})
+        data = b"".join(generate_report_zip(self.service, records, chunk_size=7))
+
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        names = archive.namelist()
+        self.assertEqual(len(names), 26)  # 25 reports + summary.csv
+        self.assertEqual(names[-1], "summary.csv")
+
+        summary = archive.read("summary.csv").decode("utf-8-sig").splitlines()
+        self.assertEqual(len(summary), 27)
+        self.assertIn("Invalid gender", summary[4])
+
+        for line in summary[1:]:
+            index, respondent, name, high_stress, sum_a, sum_b, sum_c, error = line.split(",", 7)
+            if error:
+                continue
+            record = records[int(index)]
+            expected = self.service.calculate(record["answers"], record["gender"])
+            self.assertEqual(high_stress, str(expected["result"]["high_stress"]))
+            self.assertEqual([int(sum_a), int(sum_b), int(sum_c)],
+                             list(expected["result"]["summary_scores"].values()))
+
+            svg = ET.fromstring(archive.read(name))
+            polygons = [p.get("points") for p in svg.iter("{http://www.w3.org/2000/svg}polygon")
+                        if p.get("fill") == "#8884d8"]
+            self.assertEqual(len(polygons), len(expected["charts"]))
+            for points, chart in zip(polygons, expected["charts"]):
+                self.assertEqual(len(points.split()), len(chart["axes"]))
+
+    def test_summary_ids_cannot_become_formulas(self):
+        records = [self._record(i) for i in range(4)]
+        for record, respondent in zip(records, ["=1+1", "+SUM(A1)", "-2", "@cmd"]):
+            record["id"] = respondent
+        records[3]["gender"] = "other"
+        data = b"".join(generate_report_zip(self.service, records))
+
+        summary = zipfile.ZipFile(io.BytesIO(data)).read("summary.csv").decode("utf-8-sig")
+        respondents = [line.split(",")[1] for line in summary.splitlines()[1:]]
+        self.assertEqual(respondents, ["'=1+1", "'+SUM(A1)", "'-2", "'@cmd"])
+
+    def test_report_route_streams_zip(self):
+        client = app.test_client()
+        records = [self._record(i) for i in range(3)]
+        response = client.post('/api/reports/batch', json={"records": records})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/zip')
+        self.assertEqual(len(zipfile.ZipFile(io.BytesIO(response.data)).namelist()), 4)
+
+        body = "\n".join(json.dumps(r) for r in records)
+        response = client.post('/api/reports/batch', data=body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+
+        response = client.post('/api/reports/batch', json={"records": []})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import random
+import shutil
+import sys
+import os
+import tempfile
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from services.diagnosis_service import DiagnosisService
+from services.response_store import ResponseStore
+
+
+class TestResponseStore(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService(cache_size=0)
+        self.question_ids = [q['id'] for q in self.service.questions]
+        self.rng = random.Random(3)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "responses")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _records(self, count):
+        records = []
+        for _ in range(count):
+            answers = {q_id: self.rng.randint(1, 4) for q_id in self.question_ids if self.rng.random() > 0.01}
+            records.append({
+                "answers": answers,
+                "gender": self.rng.choice(["male", "female"]),
+                "org_path": self.rng.choice([["ACME", "Sales"], ["ACME", "Sales", "Team 1"], ["ACME", "R&D"]]),
+            })
+        return records
+
+    def test_round_trip_and_growth(self):
+        records = self._records(50)
+        store = ResponseStore.create(self.path, self.question_ids, capacity=4)
+        store.extend(records[:30])
+        store.append(records[30]["answers"], records[30]["gender"], "ACME/Sales")
+        store.extend(records[31:])
+        store.flush()
+
+        reopened = ResponseStore.open(self.path, readonly=True)
+        self.assertEqual(len(reopened), 50)
+        self.assertGreaterEqual(reopened.capacity, 50)
+        self.assertEqual(list(reopened.iter_answers()), [r["answers"] for r in records])
+        self.assertEqual(reopened.org_paths[reopened.orgs[30]], ("ACME", "Sales"))
+
+    def test_invalid_records_are_rejected_atomically(self):
+        store = ResponseStore.create(self.path, self.question_ids)
+        with self.assertRaises(ValueError):
+            store.extend([{"answers": {"A1": 1}}, {"answers": {"A1": 5}}])
+        with self.assertRaises(ValueError):
+            store.append({"Z9": 1})
+        self.assertEqual(len(store), 0)
+
+    def test_organization_diagnosis_matches_dict_path(self):
+        records = self._records(300)
+        store = ResponseStore.create(self.path, self.question_ids)
+        store.extend(records)
+
+        expected = self.service.aggregate_organization([r["answers"] for r in records])
+        actual = self.service.aggregate_organization_store(store, chunk_size=64)
+        self.assertEqual(actual.to_dict(), expected.to_dict())
+
+        sales = [r["answers"] for r in records if r["org_path"][:2] == ["ACME", "Sales"]]
+        self.assertEqual(
+            self.service.aggregate_organization_store(store, org_prefix="ACME/Sales").result(),
+            self.service.calculate_organization_diagnosis(sales)
+        )
+
+    def test_score_store_matches_batch(self):
+        records = self._records(200)
+        store = ResponseStore.create(self.path, self.question_ids)
+        store.extend(records)
+        store.append({"A1": 2})  # No gender: skipped
+
+        expected = self.service.calculate_batch(records)
+        seen = 0
+        for rows, scored in self.service.score_store(store, chunk_size=64):
+            for row, chart_points, sums, high_stress in zip(
+                rows.tolist(), scored['chart_point'].tolist(), scored['sums'].tolist(), scored['high_stress'].tolist()
+            ):
+                result = self.service.engine.build_result(chart_points, sums, high_stress)
+                result["data_version"] = self.service.data_version
+                self.assertEqual(result, expected[row])
+                seen += 1
+        self.assertEqual(seen, len(records))
+
+
+if __name__ == '__main__':
+    unittest.main()
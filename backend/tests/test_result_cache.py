@@ -0,0 +1,126 @@
+import unittest
+import copy
+import random
+import sys
+import os
+from unittest import mock
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from services.diagnosis_service import DiagnosisService
+from utils.result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = ResultCache(max_size=2)
+        cache.put("a", 1, "v1")
+        cache.put("b", 2, "v1")
+        self.assertEqual(cache.get("a", "v1"), 1)  # "b" is now least recently used
+        cache.put("c", 3, "v1")
+
+        self.assertIsNone(cache.get("b", "v1"))
+        self.assertEqual(cache.get("a", "v1"), 1)
+        self.assertEqual(cache.get("c", "v1"), 3)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        cache = ResultCache(max_size=10, ttl=5)
+        with mock.patch('utils.result_cache.monotonic', return_value=100.0):
+            cache.put("a", 1, "v1")
+        with mock.patch('utils.result_cache.monotonic', return_value=104.0):
+            self.assertEqual(cache.get("a", "v1"), 1)
+        with mock.patch('utils.result_cache.monotonic', return_value=105.0):
+            self.assertIsNone(cache.get("a", "v1"))
+        self.assertEqual(cache.stats()["expirations"], 1)
+
+    def test_version_change_invalidates(self):
+        cache = ResultCache(max_size=10)
+        cache.put("a", 1, "v1")
+        self.assertIsNone(cache.get("a", "v2"))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_disabled(self):
+        cache = ResultCache(max_size=0)
+        cache.put("a", 1, "v1")
+        self.assertIsNone(cache.get("a", "v1"))
+
+
+class TestDiagnosisResultCache(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService(cache_size=100)
+        self.question_ids = [q['id'] for q in self.service.questions]
+        self.rng = random.Random(11)
+
+    def _answers(self):
+        return {q_id: self.rng.randint(1, 4) for q_id in self.question_ids}
+
+    def test_repeated_input_hits_cache(self):
+        answers = self._answers()
+        first = self.service.calculate(answers, "male")
+        second = self.service.calculate(dict(answers), "male")
+
+        self.assertEqual(second, first)
+        self.assertEqual(self.service.result_cache.stats()["hits"], 1)
+        # Gender is part of the key
+        self.assertNotEqual(self.service.calculate(answers, "female"), first)
+
+    def test_mutating_a_result_does_not_change_the_cache(self):
+        answers = self._answers()
+        first = self.service.calculate(answers, "male")
+        expected = copy.deepcopy(first)
+        first['result']['high_stress'] = not first['result']['high_stress']
+        first['charts'][0]['axes'][0]['score'] = 99
+        first['extra'] = True
+
+        second = self.service.calculate(answers, "male")
+        self.assertEqual(second, expected)
+        second['result']['summary_scores']['sum_a'] = -1
+        self.assertEqual(self.service.calculate(answers, "male"), expected)
+
+        results = self.service.calculate_batch([{"gender": "male", "answers": answers}] * 2)
+        self.assertIsNot(results[0], results[1])
+        results[0]['charts'][1]['axes'][0]['score'] = 99
+        self.assertEqual(results[1], expected)
+        self.assertEqual(self.service.calculate(answers, "male"), expected)
+
+    def test_cached_result_matches_reference(self):
+        answers = self._answers()
+        self.service.calculate(answers, "female")
+        cached = dict(self.service.calculate(answers, "female"))
+        cached.pop('data_version')
+        self.assertEqual(cached, self.service._calculate_reference(answers, "female"))
+
+    def test_incomplete_answers_are_not_cached(self):
+        answers = self._answers()
+        del answers["B7"]
+        self.service.calculate(answers, "male")
+        self.service.calculate(answers, "male")
+        self.assertEqual(len(self.service.result_cache), 0)
+
+    def test_packed_keys_distinguish_every_answer(self):
+        engine = self.service.engine
+        base = engine.encode({q_id: 1 for q_id in self.question_ids})
+        keys = {engine.cache_key(base, "male")}
+        for q in range(len(self.question_ids)):
+            for value in (2, 3, 4):
+                row = base.copy()
+                row[q] = value
+                keys.add(engine.cache_key(row, "male"))
+        self.assertEqual(len(keys), 1 + 3 * len(self.question_ids))
+
+    def test_batch_uses_and_fills_cache(self):
+        answers = self._answers()
+        single = self.service.calculate(answers, "male")
+        records = [{"gender": "male", "answers": answers}, {"gender": "female", "answers": answers}]
+
+        results = self.service.calculate_batch(records)
+        self.assertEqual(results[0], single)
+        self.assertEqual(self.service.calculate(answers, "female"), results[1])
+        self.assertEqual(self.service.result_cache.stats()["hits"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
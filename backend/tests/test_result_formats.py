@@ -0,0 +1,100 @@
+import unittest
+import os
+import random
+import sys
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from app import app
+from utils.result_formats import COMPACT_JSON_MIMETYPE, MSGPACK_MIMETYPE, msgpack
+
+
+def expand_row(schema, row):
+    """
+    Rebuilds the default JSON result from a compact row and the schema.
+    """
+    values = dict(zip(schema["row"], row))
+    return {
+        "result": {
+            "high_stress": bool(values["high_stress"]),
+            "summary_scores": {key: values[key] for key in ("sum_a", "sum_b", "sum_c")},
+        },
+        "charts": [
+            {
+                "label": label,
+                "axes": [{"id": f["id"], "label": f["label"], "score": values[f["id"]]}
+                         for f in schema["factors"] if f["chart"] == c],
+            }
+            for c, label in enumerate(schema["charts"])
+        ],
+    }
+
+
+class TestResultFormats(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.schema = self.client.get('/api/diagnosis/schema').get_json()
+        self.rng = random.Random(23)
+        question_ids = [q['id'] for q in self.client.get('/api/questions').get_json()]
+        self.records = [
+            {"gender": self.rng.choice(["male", "female"]),
+             "answers": {q_id: self.rng.randint(1, 4) for q_id in question_ids if self.rng.random() > 0.1}}
+            for _ in range(50)
+        ]
+
+    def _diagnose(self, record, accept):
+        return self.client.post('/api/diagnosis', json=record, headers={"Accept": accept})
+
+    def test_compact_rows_expand_to_json_results(self):
+        for record in self.records:
+            expected = self._diagnose(record, "application/json").get_json()
+            response = self._diagnose(record, COMPACT_JSON_MIMETYPE)
+            self.assertEqual(response.mimetype, COMPACT_JSON_MIMETYPE)
+            self.assertIn("Accept", response.headers["Vary"])
+            body = response.get_json(force=True)
+            self.assertEqual(body["data_version"], expected.pop("data_version"))
+            self.assertEqual(expand_row(self.schema, body["result"]), expected)
+
+    def test_batch_keeps_errors_inline(self):
+        records = self.records[:10] + [{"gender": "other", "answers": {"A1": 1}}]
+        expected = self.client.post('/api/diagnosis/batch', json={"records": records}).get_json()
+        body = self.client.post('/api/diagnosis/batch', json={"records": records},
+                                headers={"Accept": COMPACT_JSON_MIMETYPE}).get_json(force=True)
+        self.assertEqual((body["count"], body["error_count"]), (11, 1))
+        self.assertEqual(body["results"][-1], expected["results"][-1])
+        for row, result in zip(body["results"][:-1], expected["results"]):
+            self.assertEqual(result.pop("data_version"), body["data_version"])
+            self.assertEqual(expand_row(self.schema, row), result)
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack(self):
+        records = self.records[:5]
+        compact = self.client.post('/api/diagnosis/batch', json={"records": records},
+                                   headers={"Accept": COMPACT_JSON_MIMETYPE}).get_json(force=True)
+        response = self.client.post('/api/diagnosis/batch', json={"records": records},
+                                    headers={"Accept": "application/x-msgpack"})
+        self.assertEqual(response.mimetype, MSGPACK_MIMETYPE)
+        self.assertEqual(msgpack.unpackb(response.data), compact)
+
+    def test_negotiation_defaults_to_json(self):
+        record = self.records[0]
+        for accept in (None, "*/*", "text/html", f"application/json, {COMPACT_JSON_MIMETYPE};q=0.5"):
+            headers = {"Accept": accept} if accept else {}
+            response = self.client.post('/api/diagnosis', json=record, headers=headers)
+            self.assertEqual(response.mimetype, "application/json")
+            self.assertIn("charts", response.get_json())
+        response = self._diagnose(record, f"application/json;q=0.5, {COMPACT_JSON_MIMETYPE}")
+        self.assertEqual(response.mimetype, COMPACT_JSON_MIMETYPE)
+
+    def test_schema_is_cacheable(self):
+        response = self.client.get('/api/diagnosis/schema')
+        self.assertEqual(len(self.schema["row"]), 4 + len(self.schema["factors"]))
+        self.assertEqual([f["id"] for f in self.schema["factors"]], self.schema["row"][4:])
+        response = self.client.get('/api/diagnosis/schema', headers={"If-None-Match": response.headers["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
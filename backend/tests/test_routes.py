@@ -0,0 +1,164 @@
+import unittest
+import gzip
+import json
+import sys
+import os
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from app import app
+
+
+class TestRoutes(unittest.TestCase):
+    """
+    In-process HTTP tests using the Flask test client (no running server needed).
+    """
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_swagger_spec_builds(self):
+        # Every route docstring must be valid YAML for flasgger
+        response = self.client.get('/apispec_1.json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/api/diagnosis', response.get_json()['paths'])
+
+    def test_organization_partial_and_merge(self):
+        answers = {"A1": 3, "A2": 3, "A3": 3, "A8": 3, "A9": 3, "A10": 3,
+                   "C1": 1, "C4": 2, "C7": 2, "C2": 3, "C5": 3, "C8": 3}
+        answers_list = [answers] * 4
+
+        expected = self.client.post('/api/diagnosis/organization', json={"answers_list": answers_list}).get_json()
+
+        partials = []
+        for chunk in (answers_list[:1], answers_list[1:]):
+            response = self.client.post('/api/diagnosis/organization/partial', json={"answers_list": chunk})
+            self.assertEqual(response.status_code, 200)
+            partials.append(response.get_json()['partial'])
+
+        response = self.client.post('/api/diagnosis/organization/merge', json={"partials": partials})
+        self.assertEqual(response.status_code, 200)
+        merged = response.get_json()
+        self.assertEqual(merged['count'], 4)
+        self.assertEqual(merged['averages'], expected['averages'])
+        self.assertEqual(merged['health_risk'], expected['health_risk'])
+
+    def test_merge_rejects_invalid_partials(self):
+        response = self.client.post('/api/diagnosis/organization/merge', json={"partials": [{"count": "x"}]})
+        self.assertEqual(response.status_code, 400)
+        # Well-formed, but no respondents can produce averages of 1000
+        impossible = {"count": 1, "sums": dict.fromkeys(["quantitative_burden", "control", "supervisor_support",
+                                                          "coworker_support"], 1000)}
+        response = self.client.post('/api/diagnosis/organization/merge', json={"partials": [impossible]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("sums.quantitative_burden", response.get_json()['error'])
+
+    def test_rollup_min_group_size_cannot_go_below_the_floor(self):
+        answers = {"A1": 3, "A2": 3, "A3": 3, "A8": 3, "A9": 3, "A10": 3,
+                   "C1": 1, "C4": 2, "C7": 2, "C2": 3, "C5": 3, "C8": 3}
+        respondents = [{"org_path": ["Co", "Team"], "answers": answers}] * 3
+        for query, body in (("?min_group_size=1", {}), ("", {"min_group_size": 1})):
+            response = self.client.post('/api/diagnosis/organization/rollup' + query,
+                                        json={"respondents": respondents, **body})
+            self.assertEqual(response.status_code, 200)
+            result = response.get_json()
+            self.assertEqual(result['min_group_size'], 10)
+            self.assertTrue(all(node['suppressed'] for node in result['nodes']))
+
+        response = self.client.post('/api/diagnosis/organization/rollup',
+                                    json={"respondents": respondents, "min_group_size": 20})
+        self.assertEqual(response.get_json()['min_group_size'], 20)
+        response = self.client.post('/api/diagnosis/organization/rollup',
+                                    json={"respondents": respondents, "min_group_size": 0})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_metrics_exposes_route_and_stage_timings(self):
+        answers = {f"B{i}": 4 for i in range(1, 30)}
+        self.client.post('/api/diagnosis', json={"gender": "male", "answers": answers})
+        self.client.post('/api/diagnosis/batch', json={"records": [{"gender": "female", "answers": answers}] * 3})
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        text = response.get_data(as_text=True)
+
+        self.assertIn('http_request_duration_seconds_count{method="POST",route="/api/diagnosis",status="200"}', text)
+        for stage in ("json_parse", "validation", "factor_scoring", "high_stress_summation", "serialization"):
+            self.assertIn(f'diagnosis_stage_duration_seconds_count{{endpoint="diagnosis",stage="{stage}"}}', text)
+            self.assertIn(f'diagnosis_stage_duration_seconds_count{{endpoint="batch",stage="{stage}"}}', text)
+        self.assertIn('diagnosis_batch_size_bucket{endpoint="batch",le="10"}', text)
+        self.assertIn('http_request_size_bytes_count{route="/api/diagnosis/batch"}', text)
+        self.assertIn('diagnosis_result_cache_events_total{event="hits"}', text)
+
+    def test_unmatched_routes_share_one_label(self):
+        self.client.get('/no/such/path/12345')
+        text = self.client.get('/metrics').get_data(as_text=True)
+        self.assertNotIn('/no/such/path/12345', text)
+        self.assertIn('route="unmatched"', text)
+
+
+class TestQuestionsResponse(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_questions_payload_and_cache_headers(self):
+        response = self.client.get('/api/questions')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_json()), 57)
+        self.assertTrue(response.headers['ETag'].startswith('"'))
+        self.assertIn('max-age', response.headers['Cache-Control'])
+
+    def test_gzip_variant(self):
+        plain = self.client.get('/api/questions')
+        response = self.client.get('/api/questions', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers.get('Content-Encoding'), 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.data)), plain.get_json())
+        self.assertNotEqual(response.headers['ETag'], plain.headers['ETag'])
+
+    def test_conditional_get_returns_304(self):
+        etag = self.client.get('/api/questions').headers['ETag']
+        response = self.client.get('/api/questions', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+        response = self.client.get('/api/questions', headers={'If-None-Match': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+
+class TestAdminRoutes(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self._previous_token = os.environ.pop('ADMIN_TOKEN', None)
+
+    def tearDown(self):
+        os.environ.pop('ADMIN_TOKEN', None)
+        if self._previous_token is not None:
+            os.environ['ADMIN_TOKEN'] = self._previous_token
+
+    def test_reload_requires_token(self):
+        self.assertEqual(self.client.post('/api/admin/reload-data').status_code, 403)
+
+        os.environ['ADMIN_TOKEN'] = 'secret'
+        response = self.client.post('/api/admin/reload-data', headers={'X-Admin-Token': 'wrong'})
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post('/api/admin/reload-data', headers={'X-Admin-Token': 'secret'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.get_json()['reloaded'])
+        self.assertEqual(response.get_json()['pending_workers'], 0)
+
+    def test_diagnosis_reports_data_version(self):
+        answers = {"A1": 1, "B1": 2}
+        result = self.client.post('/api/diagnosis', json={"gender": "male", "answers": answers}).get_json()
+        self.assertEqual(len(result['data_version']), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import random
+import sys
+import os
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from services.diagnosis_service import DiagnosisService
+
+
+class TestScoringEngineParity(unittest.TestCase):
+    """
+    The compiled ScoringEngine must produce exactly the same output as the
+    reference implementation (DiagnosisService._calculate_reference).
+    """
+
+    NUM_SAMPLES = 5000
+
+    def setUp(self):
+        self.service = DiagnosisService()
+        self.question_ids = [q['id'] for q in self.service.questions]
+        self.rng = random.Random(20240601)
+
+    def _random_answers(self, missing_rate=0.0):
+        answers = {}
+        for q_id in self.question_ids:
+            if missing_rate and self.rng.random() < missing_rate:
+                continue
+            answers[q_id] = self.rng.randint(1, 4)
+        return answers
+
+    def _assert_parity(self, answers, gender):
+        expected = self.service._calculate_reference(answers, gender)
+        # Results may be shared with the result cache: do not mutate them
+        actual = dict(self.service.calculate(answers, gender))
+        self.assertEqual(actual.pop('data_version'), self.service.data_version)
+        self.assertEqual(actual, expected, f"Mismatch for gender={gender}, answers={answers}")
+
+    def test_random_complete_answers(self):
+        for gender in ("male", "female"):
+            for _ in range(self.NUM_SAMPLES):
+                self._assert_parity(self._random_answers(), gender)
+
+    def test_random_partial_answers(self):
+        # Missing answers count as 0 and push raw scores outside the scoring maps
+        for gender in ("male", "female"):
+            for _ in range(self.NUM_SAMPLES // 5):
+                self._assert_parity(self._random_answers(missing_rate=0.3), gender)
+
+    def test_extreme_answers(self):
+        for gender in ("male", "female"):
+            for value in (1, 2, 3, 4):
+                self._assert_parity({q_id: value for q_id in self.question_ids}, gender)
+            self._assert_parity({}, gender)
+
+    def test_out_of_domain_answers_use_reference(self):
+        answers = self._random_answers()
+        answers["A1"] = 7
+        answers["B3"] = -1
+        self.assertIsNone(self.service.engine.encode(answers))
+        self._assert_parity(answers, "male")
+
+    def test_score_matrix_matches_single_scoring(self):
+        engine = self.service.engine
+        rows = [self._random_answers() for _ in range(500)]
+        genders = [self.rng.choice(engine.genders) for _ in rows]
+
+        matrix = np.stack([engine.encode(answers) for answers in rows])
+        scored = engine.score_matrix(matrix, [engine.gender_index[g] for g in genders])
+
+        for i, (answers, gender) in enumerate(zip(rows, genders)):
+            expected = self.service._calculate_reference(answers, gender)
+            actual = engine.build_result(
+                scored['chart_point'][i].tolist(),
+                scored['sums'][i].tolist(),
+                scored['high_stress'][i]
+            )
+            self.assertEqual(actual, expected)
+
+
+class TestCalculateBatch(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService()
+        self.question_ids = [q['id'] for q in self.service.questions]
+        self.rng = random.Random(7)
+
+    def test_batch_matches_individual_calculation(self):
+        records = []
+        for _ in range(2000):
+            answers = {q_id: self.rng.randint(1, 4) for q_id in self.question_ids}
+            records.append({"gender": self.rng.choice(["male", "female"]), "answers": answers})
+
+        results = self.service.calculate_batch(records)
+
+        self.assertEqual(len(results), len(records))
+        for record, result in zip(records, results):
+            result = dict(result)
+            self.assertEqual(result.pop('data_version'), self.service.data_version)
+            self.assertEqual(result, self.service._calculate_reference(record['answers'], record['gender']))
+
+    def test_invalid_records_are_reported_inline(self):
+        valid = {"gender": "female", "answers": {q_id: 2 for q_id in self.question_ids}}
+        records = [
+            valid,
+            {"gender": "other", "answers": {"A1": 1}},
+            {"answers": {"A1": 1}},
+            "not a record",
+            {"gender": "male", "answers": {"A1": None}},
+            {"gender": "male", "answers": {"A1": 9}},
+        ]
+
+        results = self.service.calculate_batch(records)
+
+        self.assertEqual(results[0], self.service.calculate(valid['answers'], "female"))
+        self.assertIn("error", results[1])
+        self.assertIn("error", results[2])
+        self.assertIn("error", results[3])
+        self.assertEqual(results[4], {"error": "Invalid answers", "fields": {"A1": "Must be an integer option index (1-4)"}})
+        self.assertEqual(results[5], {"error": "Invalid answers", "fields": {"A1": "Must be between 1 and 4"}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from services.diagnosis_service import DiagnosisService
+from services.scoring_equivalence import (
+    ReferenceScorer, check_scale_tables, fuzz, random_answer_matrix, reachable_raw_scores
+)
+
+
+class TestScoringEquivalence(unittest.TestCase):
+    """
+    Exhaustive and fuzzed equivalence of the compiled ScoringEngine with the reference rules.
+    Runs with every test run; use benchmarks/bench_equivalence.py for millions of vectors.
+    """
+
+    FUZZ_VECTORS = 200_000
+
+    def setUp(self):
+        self.service = DiagnosisService(cache_size=0)
+        self.state = self.service.get_state()
+
+    def test_every_reachable_raw_score_maps_like_the_reference(self):
+        report = check_scale_tables(self.service)
+        self.assertEqual(report["mismatches"], [])
+        self.assertGreater(report["checked"], 0)
+        # Missing answers reach raw scores outside the maps, which must use the fallback
+        self.assertTrue(report["fallbacks"])
+
+    def test_reachable_raw_scores(self):
+        self.assertEqual(reachable_raw_scores(15, [-1, -1]), list(range(7, 16)))
+        self.assertEqual(reachable_raw_scores(0, [2]), [0, 2, 4, 6, 8])
+
+    def test_reference_scorer_matches_reference_implementation(self):
+        engine = self.state.engine
+        reference = ReferenceScorer(self.state, engine.question_ids, self.service._map_score_to_scale)
+        rng = np.random.default_rng(7)
+        matrix = random_answer_matrix(rng, 300, len(engine.question_ids), (0.0, 0.3))
+        genders = rng.choice(engine.genders, size=len(matrix))
+        scored = reference.score(matrix, genders)
+
+        for row, gender in enumerate(genders):
+            answers = {q_id: int(a) for q_id, a in zip(engine.question_ids, matrix[row]) if a}
+            expected = self.service._calculate_reference(answers, str(gender))
+            self.assertEqual(expected["result"]["high_stress"], bool(scored["high_stress"][row]))
+            self.assertEqual(list(expected["result"]["summary_scores"].values()), scored["sums"][row].tolist())
+            for chart in expected["charts"]:
+                for axis in chart["axes"]:
+                    self.assertEqual(axis["score"], scored["factors"][axis["id"]][2][row])
+
+    def test_fuzzed_vectors_match(self):
+        report = fuzz(self.service, self.FUZZ_VECTORS, seed=20)
+        self.assertEqual(report["vectors"], self.FUZZ_VECTORS)
+        self.assertEqual(report["mismatch_count"], 0, report["mismatches"])
+
+    def test_harness_detects_a_wrong_table_entry(self):
+        engine = self.state.engine
+        original = engine.scale_table.copy(), engine.chart_table.copy()
+        try:
+            f = engine.factor_ids.index("F-A1")
+            engine.scale_table[:, f, :] = 1
+            engine.chart_table[:, f, :] = 5
+            report = check_scale_tables(self.service)
+            self.assertTrue(report["mismatches"])
+            self.assertTrue(all(m["factor"] == "F-A1" for m in report["mismatches"]))
+            self.assertGreater(fuzz(self.service, 2000, seed=1)["mismatch_count"], 0)
+        finally:
+            engine.scale_table[...], engine.chart_table[...] = original
+
+
+if __name__ == '__main__':
+    unittest.main()
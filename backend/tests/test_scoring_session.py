@@ -0,0 +1,150 @@
+import unittest
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from app import app
+from services.diagnosis_service import DiagnosisService
+from services.scoring_session import ScoringSessionStore
+
+
+def _without_version(result):
+    return {k: v for k, v in result.items() if k != "data_version"}
+
+
+class TestScoringSession(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService(cache_size=0)
+        self.question_ids = [q['id'] for q in self.service.questions]
+        self.rng = random.Random(22)
+
+    def test_reverse_index_matches_weights(self):
+        engine = self.service.engine
+        for q, q_id in enumerate(engine.question_ids):
+            expected = [(f, int(engine.weights[f, q])) for f in range(len(engine.factor_ids)) if engine.weights[f, q]]
+            self.assertEqual(engine.question_factors[q], expected, q_id)
+            section = engine.question_sections[q]
+            if section is None:
+                self.assertFalse(engine.section_matrix[q].any())
+            else:
+                self.assertEqual(engine.section_matrix[q, section], 1)
+
+    def test_incremental_updates_match_full_scoring(self):
+        store = ScoringSessionStore(self.service)
+        for gender in ("male", "female"):
+            session_id, session = store.create(gender)
+            self.assertEqual(_without_version(session.result()),
+                             _without_version(self.service.calculate({}, gender)))
+            for _ in range(400):
+                q_id = self.rng.choice(self.question_ids)
+                answer = self.rng.choice([None, 1, 2, 3, 4])
+                before = dict(zip(session.engine.factor_ids, session.chart_points))
+                _, changed = store.update(session_id, {q_id: answer})
+
+                expected = self.service.calculate(dict(session.answers), gender)
+                self.assertEqual(_without_version(session.result()), _without_version(expected))
+                after = dict(zip(session.engine.factor_ids, session.chart_points))
+                self.assertEqual(changed, [f for f in session.engine.factor_ids if before[f] != after[f]])
+
+    def test_invalid_changes_are_not_applied(self):
+        store = ScoringSessionStore(self.service)
+        session_id, session = store.create("male", {"A1": 2})
+        for changes in ({"A2": 3, "A3": 5}, {"A2": 3, "Z99": 1}, {"A2": "3"}):
+            with self.assertRaises(ValueError):
+                store.update(session_id, changes)
+        self.assertEqual(session.answers, {"A1": 2})
+        with self.assertRaises(ValueError):
+            store.create("other")
+        self.assertEqual(store.update("missing", {"A1": 1}), (None, None))
+
+    def test_sessions_are_rebuilt_after_data_reload(self):
+        store = ScoringSessionStore(self.service)
+        answers = {q_id: self.rng.randint(1, 4) for q_id in self.question_ids[:30]}
+        session_id, session = store.create("female", answers)
+        session.version = "stale"
+        with store._lock:
+            store._connection().execute("UPDATE scoring_sessions SET version = 'stale'")
+
+        rebuilt, changed = store.update(session_id, {"B1": 4})
+        self.assertIsNot(rebuilt, session)
+        self.assertEqual(rebuilt.version, self.service.data_version)
+        self.assertEqual(changed, self.service.engine.factor_ids)
+        self.assertEqual(rebuilt.result(), self.service.calculate(dict(answers, B1=4), "female"))
+
+    def test_expiry_and_eviction(self):
+        store = ScoringSessionStore(self.service, max_sessions=2)
+        first, _ = store.create("male")
+        second, _ = store.create("male")
+        store.get(first)  # most recently used now
+        store.create("male")
+        self.assertIsNotNone(store.get(first))
+        self.assertIsNone(store.get(second))
+
+        store = ScoringSessionStore(self.service, ttl=0)
+        session_id, _ = store.create("male")
+        self.assertIsNone(store.get(session_id))
+        self.assertEqual(len(store), 0)
+
+    def test_sessions_are_shared_between_workers(self):
+        # A second store on the same file stands in for another web worker
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, "sessions.sqlite3")
+            store, other = ScoringSessionStore(self.service, path), ScoringSessionStore(self.service, path)
+            session_id, _ = store.create("male", {"A1": 4})
+
+            session, _ = other.update(session_id, {"A2": 3})
+            self.assertEqual(session.answers, {"A1": 4, "A2": 3})
+            # The first worker's cached session is stale now and gets rebuilt before the change
+            session, changed = store.update(session_id, {"A1": None})
+            self.assertEqual(session.answers, {"A2": 3})
+            self.assertEqual(_without_version(session.result()),
+                             _without_version(self.service.calculate({"A2": 3}, "male")))
+            reference = ScoringSessionStore(self.service)
+            _, before = reference.create("male", {"A1": 4, "A2": 3})
+            _, after = reference.create("male", {"A2": 3})
+            self.assertEqual(changed, [f for f, b, a in zip(session.engine.factor_ids, before.chart_points,
+                                                              after.chart_points) if b != a])
+
+            self.assertTrue(other.delete(session_id))
+            self.assertIsNone(store.get(session_id))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_routes(self):
+        client = app.test_client()
+        response = client.post('/api/diagnosis/sessions', json={"gender": "male", "answers": {"A1": 4}})
+        self.assertEqual(response.status_code, 201)
+        session_id = response.get_json()["session_id"]
+        self.assertEqual(response.get_json()["answered"], 1)
+
+        response = client.patch(f'/api/diagnosis/sessions/{session_id}', json={"answers": {"A2": 4, "A1": None}})
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body["answered"], 1)
+        self.assertEqual(body["result"], {
+            "high_stress": False,
+            "summary_scores": _without_version(self.service.calculate({"A2": 4}, "male"))["result"]["summary_scores"],
+        })
+
+        result = client.get(f'/api/diagnosis/sessions/{session_id}').get_json()
+        expected = self.service.calculate({"A2": 4}, "male")
+        self.assertEqual(result["charts"], expected["charts"])
+
+        response = client.patch(f'/api/diagnosis/sessions/{session_id}', json={"answers": {"A2": 9}})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("A2", response.get_json()["fields"])
+
+        self.assertEqual(client.delete(f'/api/diagnosis/sessions/{session_id}').status_code, 204)
+        self.assertEqual(client.get(f'/api/diagnosis/sessions/{session_id}').status_code, 404)
+        self.assertEqual(client.patch(f'/api/diagnosis/sessions/{session_id}', json={"answers": {"A1": 1}}).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from app import create_app
+from services.diagnosis_service import DiagnosisService, ScoringState
+from utils.data_loader import DataLoader
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+
+# Wall-clock budget for `from app import create_app; create_app(swagger=False)` in a fresh
+# interpreter (about 0.3s measured; generous so slow CI machines do not flake)
+STARTUP_BUDGET_SECONDS = 2.0
+
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+create_app(swagger=False)
+print(json.dumps({"seconds": time.perf_counter() - started, "modules": sorted(sys.modules)}))
+"""
+
+
+class TestPrebuiltSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        for filename in DataLoader.FILES.values():
+            shutil.copy(os.path.join(BACKEND_DIR, filename), self.data_dir)
+        self.snapshot_path = os.path.join(self.data_dir, "snapshot.pkl")
+
+        self._previous_instance = DataLoader._instance
+        loader = DataLoader._instance = DataLoader(base_dir=self.data_dir)
+        DiagnosisService()  # registers the compiler
+        loader.save_snapshot(self.snapshot_path)
+
+    def tearDown(self):
+        DataLoader._instance = self._previous_instance
+        shutil.rmtree(self.data_dir)
+
+    def test_snapshot_is_loaded_with_compiled_state(self):
+        loader = DataLoader(base_dir=self.data_dir, snapshot_path=self.snapshot_path)
+        self.assertIsInstance(loader.snapshot.compiled[DiagnosisService.COMPILED_KEY], ScoringState)
+        self.assertEqual(loader.snapshot.version, DataLoader._instance.snapshot.version)
+        # Not mistaken for a change by the reload watcher
+        self.assertFalse(loader.reload())
+
+        DataLoader._instance = loader
+        service = DiagnosisService(cache_size=0)
+        answers = {q['id']: 3 for q in service.questions}
+        expected = service._calculate_reference(answers, "female")
+        result = service.calculate(answers, "female")
+        self.assertEqual({k: v for k, v in result.items() if k != "data_version"}, expected)
+
+    def test_snapshot_built_by_other_code_is_rejected(self):
+        with mock.patch('utils.data_loader.code_fingerprint', return_value="other-code"):
+            loader = DataLoader(base_dir=self.data_dir, snapshot_path=self.snapshot_path)
+        self.assertEqual(loader.snapshot.version, DataLoader._instance.snapshot.version)
+        self.assertEqual(loader.snapshot.compiled, {})
+
+    def test_stale_or_broken_snapshot_falls_back_to_data_files(self):
+        path = os.path.join(self.data_dir, 'scoring_maps.json')
+        with open(path, encoding='utf-8') as f:
+            scoring_maps = json.load(f)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(scoring_maps, f, indent=1)
+
+        loader = DataLoader(base_dir=self.data_dir, snapshot_path=self.snapshot_path)
+        self.assertNotEqual(loader.snapshot.version, DataLoader._instance.snapshot.version)
+        self.assertEqual(loader.snapshot.compiled, {})
+
+        with open(self.snapshot_path, 'wb') as f:
+            f.write(b"not a pickle")
+        loader = DataLoader(base_dir=self.data_dir, snapshot_path=self.snapshot_path)
+        self.assertEqual(loader.snapshot.compiled, {})
+
+
+class TestAppFactory(unittest.TestCase):
+    def test_swagger_can_be_disabled(self):
+        client = create_app(swagger=False).test_client()
+        self.assertEqual(client.get('/apidocs/').status_code, 404)
+        self.assertEqual(client.get('/').status_code, 200)
+        self.assertEqual(client.get('/health-check').status_code, 200)
+
+        client = create_app(swagger=True).test_client()
+        self.assertEqual(client.get('/').status_code, 302)
+
+    def test_startup_stays_within_budget(self):
+        env = dict(os.environ)
+        env.pop('DATA_RELOAD_INTERVAL', None)
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=BACKEND_DIR, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        startup = json.loads(output.strip().splitlines()[-1])
+        # Heavy optional modules are imported on first use only
+        self.assertNotIn("matplotlib", startup["modules"])
+        self.assertNotIn("flasgger", startup["modules"])
+        self.assertLess(startup["seconds"], STARTUP_BUDGET_SECONDS)
+
+
+if __name__ == '__main__':
+    unittest.main()
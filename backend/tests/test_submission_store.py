@@ -0,0 +1,190 @@
+import unittest
+import os
+import random
+import shutil
+import stat
+import sys
+import tempfile
+from collections import Counter
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import support  # noqa: F401  Test-run store paths; must precede the app import
+from app import app
+from services.diagnosis_service import DiagnosisService
+from services.submission_store import SubmissionStore, suppressed_groups
+
+ORGS = ["ACME", "ACME/Sales", "ACME/RnD/Lab", "ACME2", "Other/Team"]
+PERIODS = ["2025-H1", "2025-H2"]
+
+
+class TestSubmissionStore(unittest.TestCase):
+    def setUp(self):
+        self.service = DiagnosisService(cache_size=0)
+        self.rng = random.Random(21)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.question_ids = self.service.engine.question_ids
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _record(self):
+        answers = {q: self.rng.randint(1, 4) for q in self.question_ids}
+        if self.rng.random() < 0.1:
+            del answers["A1"]  # not part of the organization diagnosis
+        return {
+            "org": self.rng.choice(ORGS),
+            "period": self.rng.choice(PERIODS),
+            "gender": self.rng.choice(["male", "female"]),
+            "answers": answers,
+        }
+
+    def _in_org(self, record, org):
+        return record["org"] == org or record["org"].startswith(org + "/")
+
+    def test_queries_match_rescoring(self):
+        store = SubmissionStore()
+        records = [self._record() for _ in range(600)]
+        stored, errors = self.service.store_submissions(store, records)
+        self.assertEqual((stored, errors), (600, []))
+        store.insert_many([], self.service.engine.factor_ids)  # no-op
+
+        for org in (None, "ACME", "ACME/RnD", "Other"):
+            for period in (None, "2025-H2"):
+                selected = [r for r in records
+                            if (org is None or self._in_org(r, org)) and (period is None or r["period"] == period)]
+                self.assertEqual(store.count(org, period), len(selected))
+
+                expected = self.service.aggregate_organization(r["answers"] for r in selected)
+                self.assertEqual(store.organization_aggregate(org, period).to_dict(), expected.to_dict())
+
+                results = [self.service.calculate(r["answers"], r["gender"]) for r in selected]
+                flagged = sum(result["result"]["high_stress"] for result in results)
+                self.assertEqual(store.count(org, period, high_stress=True), flagged)
+                total = store.high_stress_counts(org, period, group_by=())
+                self.assertEqual([(g["submissions"], g["high_stress"]) for g in total],
+                                 [(len(selected), flagged)] if selected else [])
+
+        # Factor scales, checked against the engine's scale output
+        engine = self.service.engine
+        selected = [r for r in records if self._in_org(r, "ACME") and r["period"] == "2025-H1"]
+        expected = {factor_id: Counter() for factor_id in engine.factor_ids}
+        for r in selected:
+            scales = engine.score_matrix(engine.encode(r["answers"])[None, :],
+                                         [engine.gender_index[r["gender"]]])["scale"][0]
+            for factor_id, scale in zip(engine.factor_ids, scales.tolist()):
+                expected[factor_id][scale] += 1
+        self.assertEqual(store.factor_distributions("ACME", "2025-H1"),
+                         {factor_id: dict(counts) for factor_id, counts in expected.items()})
+
+    def test_high_stress_groups(self):
+        store = SubmissionStore()
+        records = [self._record() for _ in range(200)]
+        self.service.store_submissions(store, records)
+        groups = store.high_stress_counts(org="ACME", group_by=["org"])
+        self.assertEqual([g["org"] for g in groups], ["ACME", "ACME/RnD/Lab", "ACME/Sales"])
+        self.assertEqual(sum(g["submissions"] for g in groups), store.count("ACME"))
+        with self.assertRaises(ValueError):
+            store.high_stress_counts(group_by=["gender; DROP TABLE submissions"])
+
+    def test_small_groups_are_suppressed(self):
+        store = SubmissionStore()
+        records = [dict(self._record(), org=org, period="2025-H1")
+                   for org, size in (("A/x", 12), ("A/y", 11), ("A/z", 4)) for _ in range(size)]
+        self.service.store_submissions(store, records)
+        groups = store.high_stress_counts(org="A", group_by=["org"], min_group_size=10)
+        self.assertEqual([(g["org"], g["submissions"], g["suppressed"]) for g in groups],
+                         [("A/x", 12, False), ("A/y", 11, True), ("A/z", 4, True)])
+        # A/y is hidden too, or the total minus A/x and A/y would give A/z away
+        self.assertNotIn("high_stress", groups[2])
+        self.assertFalse(store.high_stress_counts(org="A", group_by=(), min_group_size=10)[0]["suppressed"])
+
+    def test_complementary_suppression_covers_every_dimension(self):
+        groups = [{"org": org, "period": period, "submissions": size}
+                  for org, period, size in (("x", "p1", 3), ("x", "p2", 20), ("y", "p1", 20), ("y", "p2", 20))]
+        # x/p1 is small; x/p2 and y/p1 would reveal it, and then y/p2 would reveal those
+        self.assertEqual(suppressed_groups(groups, ("org", "period"), 10), {0, 1, 2, 3})
+        self.assertEqual(suppressed_groups(groups, ("org", "period"), 1), set())
+
+    def test_scale_columns_are_created_when_opened(self):
+        path = os.path.join(self.tmp_dir, "submissions.sqlite3")
+        factor_ids = self.service.engine.factor_ids
+        stores = [SubmissionStore(path, factor_ids=factor_ids) for _ in range(2)]
+        self.assertEqual(stores[0].factor_distributions(), {factor_id: {} for factor_id in factor_ids})
+        self.assertEqual(stores[1].count(), 0)  # Second opener finds the columns in place
+        with stores[0]._lock:
+            self.assertEqual(stores[0]._scale_columns(stores[0]._connection()), list(factor_ids))
+        self.service.store_submissions(stores[1], [self._record() for _ in range(3)])
+        self.assertEqual(stores[0].count(), 3)
+        for store in stores:
+            store.close()
+
+    def test_invalid_records_are_reported(self):
+        store = SubmissionStore()
+        records = [
+            self._record(),
+            {"org": "", "period": "2025-H1", "gender": "male", "answers": {"A1": 1}},
+            {"org": "ACME", "gender": "male", "answers": {"A1": 1}},
+            {"org": "ACME", "period": "2025-H1", "gender": "other", "answers": {"A1": 1}},
+            {"org": "ACME", "period": "2025-H1", "gender": "male", "answers": {"A1": 7}},
+        ]
+        stored, errors = self.service.store_submissions(store, records)
+        self.assertEqual(stored, 1)
+        self.assertEqual([e["index"] for e in errors], [1, 2, 3, 4])
+        self.assertEqual(errors[3]["fields"], {"A1": "Must be between 1 and 4"})
+
+    def test_file_store_persists(self):
+        path = os.path.join(self.tmp_dir, "submissions.sqlite3")
+        store = SubmissionStore(path)
+        self.service.store_submissions(store, [self._record() for _ in range(50)])
+        expected = store.factor_distributions()
+        store.close()
+        # Health data: readable by the owner only, including the WAL files
+        for name in os.listdir(self.tmp_dir):
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.tmp_dir, name)).st_mode), 0o600, name)
+
+        os.chmod(path, 0o644)
+        with self.assertLogs('utils.sqlite_files', 'WARNING'):
+            reopened = SubmissionStore(path)
+            reopened.count()
+        reopened.close()
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+        reopened = SubmissionStore(path)
+        self.assertEqual(reopened.count(), 50)
+        self.assertEqual(reopened.factor_distributions(), expected)
+        reopened.close()
+
+    def test_routes(self):
+        client = app.test_client()
+        base = "RouteTest"
+        records = [dict(self._record(), org=f"{base}/Unit") for _ in range(10)]
+        records += [dict(self._record(), org=f"{base}/Small") for _ in range(3)]
+        for record in records:
+            record["answers"].setdefault("A1", 1)  # All part of the organization diagnosis
+        response = client.post('/api/submissions', json={"submissions": records})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()["stored"], 13)
+
+        response = client.get(f'/api/submissions/organization?org={base}/Unit')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["high_stress"]["submissions"], 10)
+        response = client.get(f'/api/submissions/organization?org={base}/Small')
+        self.assertEqual(response.get_json(), {"count": 3, "suppressed": True, "min_group_size": 10})
+
+        response = client.get(f'/api/submissions/high-stress?org={base}&group_by=org')
+        groups = response.get_json()["groups"]
+        self.assertEqual([(g["org"], g["suppressed"]) for g in groups],
+                         [(f"{base}/Small", True), (f"{base}/Unit", True)])
+        response = client.get(f'/api/submissions/factors?org={base}/Unit')
+        self.assertEqual(sum(response.get_json()["factors"]["F-A1"].values()), 10)
+        self.assertTrue(client.get(f'/api/submissions/factors?org={base}/Small').get_json()["suppressed"])
+        self.assertEqual(client.get('/api/submissions/high-stress?min_group_size=0').status_code, 400)
+
+        self.assertEqual(client.get('/api/submissions/organization?org=Nobody').status_code, 404)
+        self.assertEqual(client.get('/api/submissions/high-stress?group_by=gender').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,233 @@
+"""
+Async serving for the Flask app (see asgi.py).
+
+AsyncWSGIBridge is an ASGI application that runs the WSGI app behind an event loop:
+
+- Request bodies are received on the loop. A view only starts once its body is complete, so a
+  slow (mobile) client costs a coroutine while it uploads, not a worker.
+- At most max_uploads bodies are received at once, counted from before their first byte, so
+  buffered request bodies stay within max_uploads * max_body_bytes.
+- The WSGI call (JSON decoding, scoring, encoding) runs in a bounded ThreadPoolExecutor.
+  At most max_pending requests wait for or occupy the executor; beyond that, requests are
+  answered with 503 and Retry-After right away instead of queueing without limit.
+- Response bodies are sent from the loop, so slow downloads do not hold executor threads.
+
+The maintained adapters do not keep these properties: asgiref's WsgiToAsgi runs every WSGI
+call on one shared thread that also sends the response, and a2wsgi reads wsgi.input from the
+executor thread, so a slow upload holds a thread.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Response bytes collected per executor hop when iterating a streamed WSGI response
+RESPONSE_CHUNK_BYTES = 256 * 1024
+
+JSON_HEADERS = [(b"content-type", b"application/json")]
+
+# _read_body() result for bodies over max_body_bytes
+TOO_LARGE = object()
+
+
+class _WSGIResponse:
+    __slots__ = ("status", "headers", "iterable", "iterator", "chunks", "exhausted", "sent")
+
+
+class AsyncWSGIBridge:
+    def __init__(self, wsgi_app, max_workers, max_pending, max_body_bytes, max_uploads=None, inline_paths=(),
+                 on_startup=None):
+        """
+        :param max_workers: Executor threads running WSGI calls
+        :param max_pending: Requests allowed to wait for or run in the executor
+        :param max_body_bytes: Larger request bodies are answered with 413
+        :param max_uploads: Requests allowed to upload their bodies at once (default: max_pending)
+        :param inline_paths: Paths of trivial views (e.g. the health check) called on the event
+                             loop, so they answer even while the executor is saturated
+        :param on_startup: Called once on ASGI lifespan startup (e.g. start_background_tasks)
+        """
+        self.wsgi_app = wsgi_app
+        self.max_pending = max_pending
+        self.max_body_bytes = max_body_bytes
+        self.max_uploads = max_pending if max_uploads is None else max_uploads
+        self.inline_paths = frozenset(inline_paths)
+        self.on_startup = on_startup
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asgi-wsgi")
+        # Only touched on the event loop thread, so no lock
+        self.pending = 0
+        self.uploading = 0
+        self.rejected = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        inline = scope["path"] in self.inline_paths
+        # Checked before the body is read, so a busy server spends nothing on the upload
+        if not inline and (self.uploading >= self.max_uploads or self.pending >= self.max_pending):
+            await self._reject(send)
+            return
+        self.uploading += 1
+        try:
+            body = await self._read_body(scope, receive)
+        finally:
+            self.uploading -= 1
+        if body is None:
+            return  # Client went away
+        if body is TOO_LARGE:
+            await self._send_error(send, 413, b'{"error":"Request body too large"}')
+            return
+
+        environ = self._environ(scope, body)
+        loop = asyncio.get_running_loop()
+        if inline:
+            response = self._start(environ)
+        else:
+            if self.pending >= self.max_pending:
+                await self._reject(send)
+                return
+            self.pending += 1
+            try:
+                response = await loop.run_in_executor(self.executor, self._start, environ)
+            finally:
+                self.pending -= 1
+        await self._send_response(send, response, loop)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if self.on_startup is not None:
+                    self.on_startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_body(self, scope, receive):
+        """
+        :return: The complete body, TOO_LARGE, or None if the client disconnected
+        """
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_body_bytes:
+                return TOO_LARGE  # Rejected without reading it
+
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                return TOO_LARGE
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    def _environ(self, scope, body):
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client")
+        root_path = scope.get("root_path", "")
+        path = scope["path"]
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            # WSGI strings carry the raw bytes as latin-1
+            "SCRIPT_NAME": root_path.encode("utf-8").decode("latin-1"),
+            "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server[0],
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": client[0] if client else "",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+        for name, value in scope["headers"]:
+            name = name.decode("latin-1")
+            value = value.decode("latin-1")
+            if name == "content-length":
+                continue
+            if name == "content-type":
+                environ["CONTENT_TYPE"] = value
+                continue
+            key = "HTTP_" + name.upper().replace("-", "_")
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def _start(self, environ):
+        # Runs the WSGI app up to its first response chunks (in an executor thread, or inline)
+        response = _WSGIResponse()
+        response.sent = False
+        written = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and response.sent:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response.status = int(status.split(" ", 1)[0])
+            response.headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+            return written.append
+
+        response.iterable = self.wsgi_app(environ, start_response)
+        response.iterator = iter(response.iterable)
+        response.chunks = []
+        self._collect(response)
+        # start_response may run during the first iteration (generators), so read it afterwards
+        response.chunks[:0] = written
+        return response
+
+    def _collect(self, response):
+        chunks = []
+        size = 0
+        for chunk in response.iterator:
+            if chunk:
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= RESPONSE_CHUNK_BYTES:
+                    response.chunks = chunks
+                    response.exhausted = False
+                    return response
+        response.chunks = chunks
+        response.exhausted = True
+        self._close(response)
+        return response
+
+    @staticmethod
+    def _close(response):
+        close = getattr(response.iterable, "close", None)
+        if close is not None:
+            close()
+
+    async def _send_response(self, send, response, loop):
+        try:
+            await send({"type": "http.response.start", "status": response.status, "headers": response.headers})
+            response.sent = True
+            while not response.exhausted:
+                await send({"type": "http.response.body", "body": b"".join(response.chunks), "more_body": True})
+                await loop.run_in_executor(self.executor, self._collect, response)
+            await send({"type": "http.response.body", "body": b"".join(response.chunks), "more_body": False})
+        finally:
+            if not response.exhausted:
+                await loop.run_in_executor(self.executor, self._close, response)
+
+    async def _reject(self, send):
+        self.rejected += 1
+        await self._send_error(send, 503, b'{"error":"Server busy, please retry"}', [(b"retry-after", b"1")])
+
+    @staticmethod
+    async def _send_error(send, status, body, headers=()):
+        await send({"type": "http.response.start", "status": status, "headers": [*JSON_HEADERS, *headers]})
+        await send({"type": "http.response.body", "body": body, "more_body": False})
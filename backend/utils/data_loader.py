@@ -1,35 +1,346 @@
+import functools
+import hashlib
 import json
+import logging
 import os
+import pickle
+import secrets
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Source files of the classes pickled into prebuilt snapshots (relative to the backend directory)
+SNAPSHOT_CODE_FILES = (
+    'services/scoring_engine.py',
+    'services/answer_validator.py',
+    'services/diagnosis_service.py',
+    'utils/data_loader.py',
+)
+
+# Files in the reload directory (DATA_RELOAD_DIR): the requested data version, and one
+# "worker-<pid>-<id>" file per watching process with the version it serves
+REQUESTED_VERSION_FILE = "requested-version"
+WORKER_FILE_PREFIX = "worker-"
+# Seconds between worker status checks while waiting for a host-wide reload
+RELOAD_STATUS_POLL_INTERVAL = 0.05
+
+
+@functools.lru_cache(maxsize=1)
+def code_fingerprint():
+    """
+    Hash of SNAPSHOT_CODE_FILES, computed once per process (the code that was imported).
+    A prebuilt snapshot is only used by the code that built it.
+    """
+    code_hash = hashlib.sha256()
+    for filename in SNAPSHOT_CODE_FILES:
+        with open(os.path.join(BACKEND_DIR, filename), 'rb') as f:
+            code_hash.update(filename.encode('utf-8'))
+            code_hash.update(f.read())
+    return code_hash.hexdigest()[:12]
+
+
+class DataSnapshot:
+    """
+    One immutable, versioned set of scoring data (questions, factor definitions, scoring maps)
+    plus everything compiled from it. Treat all contents as read-only.
+    A request should fetch the snapshot once and use it throughout, so a concurrent reload
+    never mixes data versions within one computation.
+    """
+
+    def __init__(self, data, version, mtimes):
+        self._data = data
+        self.version = version
+        self.mtimes = mtimes
+        # Compiler name -> compiled artifact (see DataLoader.register_compiler)
+        self.compiled = {}
+
+    def get(self, key):
+        return self._data.get(key)
+
 
 class DataLoader:
+    """
+    Process-wide loader for the scoring data files.
+
+    The current DataSnapshot is swapped atomically on reload (a single reference assignment),
+    so readers never take a lock. Registered compilers run against a new snapshot before it is
+    published; if loading or compiling fails, the previous snapshot stays active.
+
+    With a reload directory (DATA_RELOAD_DIR, shared by the worker processes of one server),
+    reloads are host-wide: request_reload() records the requested data version there, every
+    worker's watcher reloads until it serves that version, and each watcher reports the version
+    it serves in a file of its own, so the requester can tell when all workers have switched.
+    """
+
     _instance = None
-    _data = {}
+
+    # Snapshot key -> file name (relative to the backend directory)
+    FILES = {
+        'questions': 'questions.json',
+        'factor_definitions': 'factor_definitions.json',
+        'scoring_maps': 'scoring_maps.json',
+    }
+
+    # Format of save_snapshot() files; bump when the file layout changes
+    SNAPSHOT_FORMAT = 2
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
-            cls._instance = DataLoader()
+            cls._instance = DataLoader(snapshot_path=os.environ.get('SCORING_SNAPSHOT_FILE') or None,
+                                       reload_dir=os.environ.get('DATA_RELOAD_DIR') or None)
         return cls._instance
 
-    def __init__(self):
-        self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self._load_all()
+    def __init__(self, base_dir=None, snapshot_path=None, reload_dir=None):
+        self.base_dir = base_dir or BACKEND_DIR
+        self.snapshot_path = snapshot_path
+        self.reload_dir = reload_dir
+        self._lock = threading.Lock()
+        self._compilers = {}
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        # Name of this process's status file in reload_dir (one per loader, so tests can run several)
+        self._worker_name = None
+        self._snapshot = self._load_prebuilt() or self._load_snapshot()
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def get_snapshot(self):
+        return self._snapshot
+
+    def _path(self, filename):
+        return os.path.join(self.base_dir, filename)
+
+    def _file_mtimes(self):
+        return tuple(os.stat(self._path(filename)).st_mtime_ns for filename in self.FILES.values())
+
+    def _read_files(self):
+        """
+        :return: (snapshot key -> raw file bytes, version hash)
+        """
+        raw_files = {}
+        version_hash = hashlib.sha256()
+        for key, filename in self.FILES.items():
+            with open(self._path(filename), 'rb') as f:
+                raw = f.read()
+            version_hash.update(filename.encode('utf-8'))
+            version_hash.update(raw)
+            raw_files[key] = raw
+        return raw_files, version_hash.hexdigest()[:12]
+
+    def _load_snapshot(self):
+        mtimes = self._file_mtimes()
+        raw_files, version = self._read_files()
+        data = {key: json.loads(raw.decode('utf-8')) for key, raw in raw_files.items()}
+        return DataSnapshot(data, version, mtimes)
+
+    def _load_prebuilt(self):
+        """
+        Loads a snapshot written by save_snapshot(), compiled artifacts included, so startup
+        skips JSON parsing and compilation. Only used while it matches the data files' content
+        hash and the scoring code (code_fingerprint()); returns None otherwise (the data files
+        are loaded as usual).
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        mtimes = self._file_mtimes()
+        _, version = self._read_files()
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                # Header first, so a snapshot from other code is rejected before its objects are unpickled
+                header = pickle.load(f)
+                current = (self.SNAPSHOT_FORMAT, code_fingerprint(), version)
+                if not isinstance(header, dict) or (header.get("format"), header.get("code"),
+                                                    header.get("version")) != current:
+                    logger.warning("Prebuilt scoring snapshot %s is stale; loading the data files", self.snapshot_path)
+                    return None
+                snapshot = pickle.load(f)
+        except Exception:
+            logger.exception("Cannot read prebuilt scoring snapshot %s; loading the data files", self.snapshot_path)
+            return None
+        snapshot.mtimes = mtimes
+        return snapshot
+
+    def save_snapshot(self, path):
+        """
+        Writes the current snapshot, including everything registered compilers built from it,
+        to a pickle file for fast startup (SCORING_SNAPSHOT_FILE). Unpickling runs code, so only
+        load files built by your own deployment.
+        """
+        header = {"format": self.SNAPSHOT_FORMAT, "code": code_fingerprint(), "version": self._snapshot.version}
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(self._snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+
+    def register_compiler(self, name, compiler):
+        """
+        Registers a function compiled against every snapshot (e.g. the scoring engine).
+        The result is available as snapshot.compiled[name]. Registering the same name again is a no-op.
+        """
+        with self._lock:
+            if name in self._compilers:
+                return
+            self._compilers[name] = compiler
+            snapshot = self._snapshot
+            if name not in snapshot.compiled:
+                snapshot.compiled[name] = compiler(snapshot)
+
+    def reload(self, force=False):
+        """
+        Reloads the data files if they changed (by mtime, or always when force=True).
+        The new snapshot is compiled before being published; in-flight requests keep
+        using the snapshot they already fetched.
+        :return: True if a new data version was published
+        :raises: Any load/compile error (the previous snapshot stays active)
+        """
+        with self._lock:
+            current = self._snapshot
+            if not force and self._file_mtimes() == current.mtimes:
+                return False
+
+            snapshot = self._load_snapshot()
+            if snapshot.version == current.version:
+                # Files were touched but their content is identical
+                current.mtimes = snapshot.mtimes
+                return False
+
+            for name, compiler in self._compilers.items():
+                snapshot.compiled[name] = compiler(snapshot)
+
+            self._snapshot = snapshot
+            logger.info("Scoring data reloaded: %s -> %s", current.version, snapshot.version)
+            return True
+
+    def start_watcher(self, interval):
+        """
+        Polls the data files for changes every `interval` seconds in a daemon thread, and
+        with a reload directory also follows request_reload() and reports the served version.
+        """
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+        self._report_version()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                requested = self._requested_version()
+                try:
+                    self.reload(force=requested is not None and requested != self._snapshot.version)
+                except Exception:
+                    logger.exception("Scoring data reload failed; keeping version %s", self._snapshot.version)
+                self._report_version()
+
+        self._watcher = threading.Thread(target=watch, name="data-loader-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        watcher = self._watcher
+        if watcher is not None:
+            self._stop_watching.set()
+            watcher.join(timeout=5)
+            self._watcher = None
+        if self._worker_name is not None:
+            try:
+                os.remove(os.path.join(self.reload_dir, self._worker_name))
+            except FileNotFoundError:
+                pass
+            self._worker_name = None
+
+    def request_reload(self, force=False):
+        """
+        Reloads in this process (see reload()) and, with a reload directory, asks every worker
+        watching it to switch to the resulting version.
+        :return: (True if this process published a new version, data version now served here)
+        :raises: Any load/compile error (nothing is requested from the other workers)
+        """
+        reloaded = self.reload(force=force)
+        version = self._snapshot.version
+        if self.reload_dir:
+            self._write_file(REQUESTED_VERSION_FILE, version)
+            self._report_version()
+        return reloaded, version
+
+    def worker_versions(self):
+        """
+        :return: {worker status file: data version} of the live workers reporting to the reload
+            directory (empty without one). Files of exited processes are removed.
+        """
+        if not self.reload_dir:
+            return {}
+        versions = {}
+        for name in os.listdir(self.reload_dir):
+            if not name.startswith(WORKER_FILE_PREFIX):
+                continue
+            path = os.path.join(self.reload_dir, name)
+            try:
+                os.kill(int(name[len(WORKER_FILE_PREFIX):].split("-")[0]), 0)
+            except ProcessLookupError:
+                # The worker exited without cleaning up (e.g. it was killed)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            except (ValueError, PermissionError):
+                pass  # Not a pid we can check: count it
+            try:
+                with open(path, encoding='utf-8') as f:
+                    versions[name] = f.read().strip()
+            except FileNotFoundError:
+                pass  # Removed by its worker meanwhile
+        return versions
+
+    def wait_for_workers(self, version, timeout):
+        """
+        Waits up to `timeout` seconds for every live worker to serve `version`.
+        :return: (number of workers, number still serving another version)
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            versions = self.worker_versions()
+            pending = sum(1 for served in versions.values() if served != version)
+            if not pending or time.monotonic() >= deadline:
+                return len(versions), pending
+            time.sleep(RELOAD_STATUS_POLL_INTERVAL)
+
+    def _requested_version(self):
+        if not self.reload_dir:
+            return None
+        try:
+            with open(os.path.join(self.reload_dir, REQUESTED_VERSION_FILE), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
 
-    def _load_all(self):
-        self._data['questions'] = self._load_json('questions.json')
-        self._data['factor_definitions'] = self._load_json('factor_definitions.json')
-        self._data['scoring_maps'] = self._load_json('scoring_maps.json')
+    def _report_version(self):
+        if not self.reload_dir:
+            return
+        if self._worker_name is None:
+            self._worker_name = f"{WORKER_FILE_PREFIX}{os.getpid()}-{secrets.token_hex(4)}"
+        self._write_file(self._worker_name, self._snapshot.version)
 
-    def _load_json(self, filename):
-        path = os.path.join(self.base_dir, filename)
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def _write_file(self, name, text):
+        # Atomic replace, so readers never see a partial version
+        fd, tmp_path = tempfile.mkstemp(dir=self.reload_dir, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, os.path.join(self.reload_dir, name))
 
     def get_questions(self):
-        return self._data.get('questions')
+        return self._snapshot.get('questions')
 
     def get_factor_definitions(self):
-        return self._data.get('factor_definitions')
+        return self._snapshot.get('factor_definitions')
 
     def get_scoring_maps(self):
-        return self._data.get('scoring_maps')
+        return self._snapshot.get('scoring_maps')
@@ -0,0 +1,79 @@
+"""
+JSON encoding and decoding for the app: orjson when it is installed, the stdlib json module
+otherwise. FastJSONProvider plugs it into Flask (jsonify, request.get_json), and loads() is
+used for bodies parsed outside Flask's request helpers (NDJSON streams).
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder is used when orjson is not installed
+    orjson = None
+
+if orjson is not None:
+    # Integer keys (e.g. scale -> count maps) and numpy values are encoded like the stdlib
+    # provider would after conversion. Dates and dataclasses go through Flask's default()
+    # so they are formatted exactly as before.
+    ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                      | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+    loads = orjson.loads
+else:
+    ORJSON_OPTIONS = 0
+    loads = json.loads
+
+
+def fast_json_available():
+    return orjson is not None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Keeps the DefaultJSONProvider settings (sort_keys, compact, pretty-printing in debug mode).
+    Output is UTF-8 rather than ASCII with \\u escapes, and NaN is encoded as null. Calls with
+    json.dumps()/json.loads() keyword arguments, and values orjson rejects (e.g. integers
+    beyond 64 bits), fall back to the stdlib provider, as does everything when orjson is
+    not installed.
+    """
+
+    def _orjson_option(self, indent=False):
+        option = ORJSON_OPTIONS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dump_bytes(self, obj, indent=False):
+        """
+        :return: UTF-8 bytes, or None if orjson cannot encode obj
+        """
+        if orjson is None:
+            return None
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._orjson_option(indent))
+        except TypeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            body = self._dump_bytes(obj)
+            if body is not None:
+                return body.decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if kwargs or orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self._dump_bytes(obj, indent)
+        if body is None:
+            return super().response(obj)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
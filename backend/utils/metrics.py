@@ -0,0 +1,353 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Observations only update a few counters under a short lock; formatting happens
+when /metrics is scraped, so the cost is negligible when nobody scrapes.
+
+With a metrics directory (METRICS_DIR, shared by the worker processes of one server), every
+process periodically writes its values to a file of its own there, and /metrics reports the
+sum over all of them, whichever worker is scraped. Counters and histograms of exited processes
+stay in the sum; gauges only count live processes.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+logger = logging.getLogger(__name__)
+
+# Shared directory for the per-process metric files (unset: every process reports only its own values)
+METRICS_DIR = os.environ.get('METRICS_DIR') or None
+# Seconds between writes of this process's values (how stale the other workers' values can be)
+METRICS_EXPORT_INTERVAL = float(os.environ.get('METRICS_EXPORT_INTERVAL', 1))
+PROCESS_FILE_PREFIX = "metrics-"
+PROCESS_FILE_SUFFIX = ".json"
+
+# Latency buckets in seconds (50us .. 10s)
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+COUNT_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000, 20000, 50000, 100000)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    # Summed over every process that wrote a metrics file, exited ones included
+    cumulative = True
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def collect(self):
+        """
+        :return: {label values tuple: value} of this process
+        """
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def add(values, labels, value):
+        values[labels] = values.get(labels, 0) + value
+
+    def render(self, values=None):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted((self.collect() if values is None else values).items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    cumulative = True
+
+    def __init__(self, name, documentation, buckets=LATENCY_BUCKETS, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        # label values -> [per-bucket counts (last = +Inf)], [sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            counts, totals = state
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def count(self, *labels):
+        state = self._values.get(labels)
+        return state[1][1] if state else 0
+
+    def collect(self):
+        """
+        :return: {label values tuple: [per-bucket counts, sum, count]} of this process
+        """
+        with self._lock:
+            return {labels: [list(counts), total, count] for labels, (counts, (total, count)) in self._values.items()}
+
+    @staticmethod
+    def add(values, labels, value):
+        state = values.get(labels)
+        if state is None:
+            values[labels] = [list(value[0]), value[1], value[2]]
+        else:
+            state[0] = [a + b for a, b in zip(state[0], value[0])]
+            state[1] += value[1]
+            state[2] += value[2]
+
+    def render(self, values=None):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted((self.collect() if values is None else values).items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class CallbackMetric:
+    """
+    Metric whose values are read from `collect()` at scrape time ({label values tuple: value}).
+    Useful for exposing counters another component already keeps (e.g. cache statistics).
+    """
+
+    def __init__(self, name, documentation, metric_type, collect, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.metric_type = metric_type
+        self.collect = collect
+        self.labelnames = tuple(labelnames)
+        # Gauges describe the current state, which ends with the process
+        self.cumulative = metric_type == "counter"
+
+    add = staticmethod(Counter.add)
+
+    def render(self, values=None):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        for labels, value in sorted((self.collect() if values is None else values).items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self, directory=METRICS_DIR):
+        """
+        :param directory: Metrics directory shared with the other processes (None = this process only)
+        """
+        self.directory = directory
+        self._metrics = []
+        self._exporter = None
+        self._stop_exporting = threading.Event()
+        # Last text written to this process's file, to skip writes while idle
+        self._written = None
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, buckets=LATENCY_BUCKETS, labelnames=()):
+        metric = Histogram(name, documentation, buckets, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def callback(self, name, documentation, metric_type, collect, labelnames=()):
+        metric = CallbackMetric(name, documentation, metric_type, collect, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Prometheus text of this process's values plus, with a directory, the other processes' files.
+        """
+        others = self._read_process_files() if self.directory else []
+        lines = []
+        for metric in self._metrics:
+            values = metric.collect()
+            for alive, data in others:
+                if alive or metric.cumulative:
+                    for labels, value in data.get(metric.name, ()):
+                        metric.add(values, tuple(labels), value)
+            lines.extend(metric.render(values))
+        return "\n".join(lines) + "\n"
+
+    def _process_file(self, pid):
+        return os.path.join(self.directory, f"{PROCESS_FILE_PREFIX}{pid}{PROCESS_FILE_SUFFIX}")
+
+    def write_process_file(self):
+        """
+        Writes this process's values to its file in the metrics directory (atomic replace).
+        """
+        text = json.dumps({
+            metric.name: [[list(labels), value] for labels, value in metric.collect().items()]
+            for metric in self._metrics
+        })
+        if text == self._written:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=PROCESS_FILE_PREFIX, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, self._process_file(os.getpid()))
+        self._written = text
+
+    def _read_process_files(self):
+        # :return: [(process alive, {metric name: [[label values, value], ...]})] of the other processes
+        others = []
+        for name in os.listdir(self.directory):
+            if not (name.startswith(PROCESS_FILE_PREFIX) and name.endswith(PROCESS_FILE_SUFFIX)):
+                continue
+            try:
+                pid = int(name[len(PROCESS_FILE_PREFIX):-len(PROCESS_FILE_SUFFIX)])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue  # Reported from memory, which is newer
+            try:
+                os.kill(pid, 0)
+                alive = True
+            except ProcessLookupError:
+                alive = False
+            except PermissionError:
+                alive = True
+            try:
+                with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                    others.append((alive, json.load(f)))
+            except (FileNotFoundError, ValueError):
+                logger.warning("Skipping unreadable metrics file %s", name)
+        return others
+
+    def start_exporter(self, interval=METRICS_EXPORT_INTERVAL):
+        """
+        With a directory, writes this process's values there every `interval` seconds in a daemon thread.
+        """
+        if not self.directory or self._exporter is not None:
+            return
+        self._stop_exporting.clear()
+        self.write_process_file()
+
+        def export():
+            while not self._stop_exporting.wait(interval):
+                try:
+                    self.write_process_file()
+                except OSError:
+                    logger.exception("Writing the metrics file failed")
+
+        self._exporter = threading.Thread(target=export, name="metrics-exporter", daemon=True)
+        self._exporter.start()
+
+    def stop_exporter(self):
+        """
+        Stops the exporter after a last write, so an exiting process's counts stay in the sum.
+        """
+        exporter = self._exporter
+        if exporter is None:
+            return
+        self._stop_exporting.set()
+        exporter.join(timeout=5)
+        self._exporter = None
+        self.write_process_file()
+
+
+def remove_process_files(directory):
+    """
+    Removes the metric files of an earlier server run (call before starting the workers).
+    """
+    for name in os.listdir(directory):
+        if name.startswith(PROCESS_FILE_PREFIX):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    labelnames=("method", "route", "status"),
+)
+REQUEST_SIZE = REGISTRY.histogram(
+    "http_request_size_bytes", "HTTP request body size by route.",
+    buckets=SIZE_BUCKETS, labelnames=("route",),
+)
+RESPONSE_SIZE = REGISTRY.histogram(
+    "http_response_size_bytes", "HTTP response body size by route.",
+    buckets=SIZE_BUCKETS, labelnames=("route",),
+)
+DIAGNOSIS_STAGE_LATENCY = REGISTRY.histogram(
+    "diagnosis_stage_duration_seconds",
+    "Time spent per diagnosis stage (json_parse, validation, factor_scoring, high_stress_summation, serialization).",
+    labelnames=("endpoint", "stage"),
+)
+BATCH_SIZE = REGISTRY.histogram(
+    "diagnosis_batch_size", "Records (respondents) per bulk request.",
+    buckets=COUNT_BUCKETS, labelnames=("endpoint",),
+)
+DIAGNOSES = REGISTRY.counter(
+    "diagnosis_respondents_total", "Respondents processed.", labelnames=("endpoint",),
+)
+
+
+class StageTimer:
+    """
+    Records consecutive stages of one request into DIAGNOSIS_STAGE_LATENCY.
+    mark(stage) records the time since the previous mark (or creation / restart()).
+    """
+
+    __slots__ = ("endpoint", "_last")
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self._last = perf_counter()
+
+    def mark(self, stage):
+        now = perf_counter()
+        DIAGNOSIS_STAGE_LATENCY.observe(now - self._last, self.endpoint, stage)
+        self._last = now
+
+    def restart(self):
+        self._last = perf_counter()
+
@@ -0,0 +1,101 @@
+"""
+Bounded LRU cache with optional TTL, hit/miss statistics and version-based invalidation.
+"""
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+
+class ResultCache:
+    """
+    LRU cache of computed results.
+
+    Entries belong to a data version: get()/put() with a different version than the
+    cached entries were stored under clears the cache first, so results computed from
+    old scoring data are never served after a reload.
+
+    Cached values are returned as-is to every caller: store immutable values, or copy them on
+    the way in and out (DiagnosisService does the latter).
+    """
+
+    def __init__(self, max_size=4096, ttl=None):
+        """
+        :param max_size: Maximum number of entries (0 disables caching)
+        :param ttl: Seconds an entry stays valid (None = until evicted)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def _check_version(self, version):
+        # Caller holds the lock
+        if version != self.version:
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+            self.version = version
+
+    def get(self, key, version):
+        """
+        :return: The cached value, or None on a miss
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version):
+        if not self.max_size:
+            return
+        expires_at = monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,98 @@
+"""
+Content negotiation for individual diagnosis results.
+
+Besides the default JSON (labels nested into every result), clients can ask for a compact
+fixed-layout row per result via the Accept header:
+
+- application/vnd.jp-stress.compact+json: JSON array rows
+- application/msgpack: the same rows as MessagePack (requires the optional msgpack package)
+
+A row is [high_stress (0/1), sum_a, sum_b, sum_c, chart point of every factor...] in the
+order published once by GET /api/diagnosis/schema (result_schema()), which also carries the
+factor and chart labels.
+"""
+from flask import current_app, jsonify
+
+try:
+    import msgpack
+except ImportError:  # Optional: MessagePack is not offered when the package is not installed
+    msgpack = None
+
+JSON_MIMETYPE = "application/json"
+COMPACT_JSON_MIMETYPE = "application/vnd.jp-stress.compact+json"
+MSGPACK_MIMETYPE = "application/msgpack"
+MSGPACK_ALIASES = ("application/x-msgpack",)
+
+FORMAT_JSON = "json"
+FORMAT_COMPACT = "compact"
+FORMAT_MSGPACK = "msgpack"
+
+ROW_PREFIX = ("high_stress",)
+
+
+def available_mimetypes():
+    """
+    Offered response types, the default (JSON) first.
+    """
+    mimetypes = [(JSON_MIMETYPE, FORMAT_JSON), (COMPACT_JSON_MIMETYPE, FORMAT_COMPACT)]
+    if msgpack is not None:
+        mimetypes += [(mimetype, FORMAT_MSGPACK) for mimetype in (MSGPACK_MIMETYPE, *MSGPACK_ALIASES)]
+    return mimetypes
+
+
+def negotiate_format(request):
+    """
+    Picks the response format from the Accept header. Missing, wildcard or unsupported
+    Accept headers get JSON.
+    """
+    offered = available_mimetypes()
+    best = request.accept_mimetypes.best_match([mimetype for mimetype, _ in offered])
+    return dict(offered).get(best, FORMAT_JSON)
+
+
+def result_schema(engine, version):
+    """
+    Layout of compact rows plus the labels they leave out, built from the compiled
+    factor definitions.
+    """
+    chart_factors = [f for _, members in engine.charts for f in members]
+    return {
+        "data_version": version,
+        "row": [*ROW_PREFIX, *engine.section_keys, *(engine.factor_ids[f] for f in chart_factors)],
+        "factors": [
+            {"id": engine.factor_ids[f], "label": engine.factor_labels[f], "chart": c}
+            for c, (_, members) in enumerate(engine.charts) for f in members
+        ],
+        "charts": [label for label, _ in engine.charts],
+        "mimetypes": [mimetype for mimetype, _ in available_mimetypes()],
+    }
+
+
+def compact_result(result, section_keys):
+    """
+    Flattens a calculate() result into its compact row. Error results ({"error": ...}) are
+    returned unchanged.
+    :param section_keys: ScoringEngine.section_keys
+    """
+    if "error" in result:
+        return result
+    summary = result["result"]
+    summary_scores = summary["summary_scores"]
+    row = [int(summary["high_stress"]), *(summary_scores[key] for key in section_keys)]
+    for chart in result["charts"]:
+        row.extend(axis["score"] for axis in chart["axes"])
+    return row
+
+
+def format_response(payload, response_format):
+    """
+    Serializes a payload whose results were already converted for response_format.
+    """
+    if response_format == FORMAT_JSON:
+        response = jsonify(payload)
+    elif response_format == FORMAT_MSGPACK:
+        response = current_app.response_class(msgpack.packb(payload), mimetype=MSGPACK_MIMETYPE)
+    else:
+        response = current_app.response_class(current_app.json.dumps(payload), mimetype=COMPACT_JSON_MIMETYPE)
+    response.vary.add("Accept")
+    return response
@@ -0,0 +1,28 @@
+import logging
+import os
+import stat
+
+logger = logging.getLogger(__name__)
+
+# Permissions of SQLite files holding answers or results (SQLite gives -wal/-shm files the same mode)
+PRIVATE_FILE_MODE = 0o600
+
+
+def ensure_private_file(path):
+    """
+    Creates the database file readable and writable by its owner only, before SQLite opens it
+    (SQLite itself would create it with the umask permissions). An existing file that is open to
+    group or others is restricted with a warning. ":memory:" is left alone.
+    :return: path
+    """
+    if path == ":memory:":
+        return path
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, PRIVATE_FILE_MODE)
+    try:
+        mode = stat.S_IMODE(os.fstat(fd).st_mode)
+        if mode & 0o077:
+            logger.warning("Restricting permissions of %s from %o to %o", path, mode, PRIVATE_FILE_MODE)
+            os.chmod(path, PRIVATE_FILE_MODE)
+    finally:
+        os.close(fd)
+    return path
@@ -0,0 +1,59 @@
+import gzip
+import hashlib
+import json
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # Optional: brotli variants are skipped when the package is not installed
+    brotli = None
+
+
+class PrecomputedResponse:
+    """
+    JSON response for a payload that never changes at runtime (e.g. questions.json).
+    The body is serialized once, together with gzip/brotli variants and a strong ETag
+    derived from the serialized content, so requests never touch the JSON encoder.
+    Conditional GETs (If-None-Match) are answered with 304 Not Modified.
+    """
+
+    def __init__(self, payload, max_age=300):
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.cache_control = f"public, max-age={max_age}"
+
+        # Content-Encoding -> (body, strong ETag). Each representation gets its own ETag.
+        self.variants = {
+            None: (self.body, f'"{self.digest}"'),
+            'gzip': (gzip.compress(self.body, compresslevel=9, mtime=0), f'"{self.digest}-gz"'),
+        }
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(self.body, quality=11), f'"{self.digest}-br"')
+
+        self._etags = [etag.strip('"') for _, etag in self.variants.values()]
+
+    def _negotiate(self, request):
+        accept_encodings = request.accept_encodings
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding]:
+                return encoding
+        return None
+
+    def make_response(self, request):
+        encoding = self._negotiate(request)
+        body, etag = self.variants[encoding]
+
+        # Weak comparison, and any variant's ETag matches since the content is identical
+        if_none_match = request.if_none_match
+        if any(if_none_match.contains_weak(e) for e in self._etags):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+
+        response.headers['ETag'] = etag
+        response.headers['Cache-Control'] = self.cache_control
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
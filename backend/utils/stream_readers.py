@@ -0,0 +1,70 @@
+import codecs
+import csv
+
+from utils.json_provider import loads
+
+
+# CSV columns holding names or identifiers rather than answers: never converted to int
+TEXT_COLUMNS = frozenset({"org_path", "id", "gender"})
+
+
+class StreamFormatError(ValueError):
+    """Raised when a streamed request body cannot be parsed."""
+
+
+def iter_ndjson(stream):
+    """
+    Incrementally parses an NDJSON (one JSON object per line) byte stream.
+    Blank lines are ignored.
+    :param stream: Binary file-like object (e.g. flask.request.stream)
+    """
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield loads(line)
+        except ValueError:
+            raise StreamFormatError(f"Invalid JSON at line {line_no}")
+
+
+def iter_csv(stream):
+    """
+    Incrementally parses a CSV byte stream whose header row holds question IDs (A1, A2, ...).
+    Yields one answers dict per data row; empty cells are treated as missing answers.
+    Numeric cells become ints, except in TEXT_COLUMNS (e.g. an org_path of "100").
+    """
+    reader = csv.reader(codecs.iterdecode(stream, 'utf-8-sig'))
+    try:
+        header = [name.strip() for name in next(reader)]
+    except StopIteration:
+        return
+    except (csv.Error, UnicodeDecodeError):
+        raise StreamFormatError("Invalid CSV header")
+
+    try:
+        for row in reader:
+            answers = {}
+            for name, cell in zip(header, row):
+                cell = cell.strip()
+                if cell:
+                    answers[name] = cell if name in TEXT_COLUMNS else _parse_cell(cell)
+            if answers:
+                yield answers
+    except (csv.Error, UnicodeDecodeError):
+        raise StreamFormatError(f"Invalid CSV at line {reader.line_num}")
+
+
+def _parse_cell(cell):
+    try:
+        return int(cell)
+    except ValueError:
+        return cell
+
+
+# Request Content-Type -> incremental reader
+STREAM_READERS = {
+    'application/x-ndjson': iter_ndjson,
+    'application/jsonl': iter_ndjson,
+    'text/csv': iter_csv,
+}
@@ -45,3 +45,47 @@ export const postOrganizationDiagnosis = async (answersList, gender) => {
     }
     return response.json();
 };
+
+export const createScoringSession = async (gender, answers = {}) => {
+    const response = await fetch(`${API_BASE_URL}/api/diagnosis/sessions`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ gender, answers }),
+    });
+
+    if (!response.ok) {
+        throw new Error('Failed to start scoring session');
+    }
+    return response.json();
+};
+
+// Resolves to null when the session is unknown or expired (the caller recreates it)
+export const patchScoringSession = async (sessionId, answers) => {
+    const response = await fetch(`${API_BASE_URL}/api/diagnosis/sessions/${sessionId}`, {
+        method: 'PATCH',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ answers }),
+    });
+
+    if (response.status === 404) {
+        return null;
+    }
+    if (!response.ok) {
+        throw new Error('Failed to update scoring session');
+    }
+    return response.json();
+};
+
+export const deleteScoringSession = async (sessionId) => {
+    const response = await fetch(`${API_BASE_URL}/api/diagnosis/sessions/${sessionId}`, {
+        method: 'DELETE',
+    });
+
+    if (!response.ok && response.status !== 404) {
+        throw new Error('Failed to end scoring session');
+    }
+};
@@ -1,5 +1,5 @@
-import React, { useEffect, useState } from 'react';
-import { getQuestions } from '../api';
+import React, { useEffect, useRef, useState } from 'react';
+import { createScoringSession, deleteScoringSession, getQuestions, patchScoringSession } from '../api';
 import toast from 'react-hot-toast';
 
 const SECTIONS = ['A', 'B', 'C', 'D'];
@@ -10,6 +10,18 @@ const SECTION_TITLES = {
     'D': 'Part D. 직무 만족도'
 };
 
+// Changes that turn one answer set into another (null clears an answer)
+const answerChanges = (from, to) => {
+    const changes = {};
+    Object.keys(to).forEach(id => {
+        if (from[id] !== to[id]) changes[id] = to[id];
+    });
+    Object.keys(from).forEach(id => {
+        if (!(id in to)) changes[id] = null;
+    });
+    return changes;
+};
+
 const Questionnaire = ({ gender, onComplete }) => {
     const [questions, setQuestions] = useState([]);
     const [answers, setAnswers] = useState({});
@@ -20,6 +32,85 @@ const Questionnaire = ({ gender, onComplete }) => {
     const [error, setError] = useState(null);
     const [currentSectionIndex, setCurrentSectionIndex] = useState(0);
 
+    // Live preview: the server rescores only what each changed answer affects
+    const [preview, setPreview] = useState(null);
+    const sessionRef = useRef(null);
+    const previewSeqRef = useRef(0);
+    // Answers sent with a create request that is still pending, and the newest answers given meanwhile
+    const creatingRef = useRef(null);
+    const queuedAnswersRef = useRef(null);
+    // Set when the questionnaire closes while a create request is pending
+    const discardRef = useRef(false);
+
+    const startSession = (currentAnswers) => {
+        discardRef.current = false;
+        if (creatingRef.current) {
+            // One create request at a time; the newest answers are sent once it finishes
+            queuedAnswersRef.current = currentAnswers;
+            return;
+        }
+        creatingRef.current = currentAnswers;
+        const seq = ++previewSeqRef.current;
+        createScoringSession(gender, currentAnswers)
+            .then(data => {
+                const queued = queuedAnswersRef.current;
+                creatingRef.current = null;
+                queuedAnswersRef.current = null;
+                if (discardRef.current) {
+                    deleteScoringSession(data.session_id).catch(() => {});
+                    return;
+                }
+                sessionRef.current = data.session_id;
+                const changes = queued ? answerChanges(currentAnswers, queued) : {};
+                if (Object.keys(changes).length > 0) {
+                    sendChanges(changes, queued);
+                } else if (seq === previewSeqRef.current) {
+                    setPreview(data.result);
+                }
+            })
+            .catch(() => {
+                // The preview is optional; the final result does not depend on it
+                creatingRef.current = null;
+                queuedAnswersRef.current = null;
+                sessionRef.current = null;
+            });
+    };
+
+    const sendChanges = (changes, nextAnswers) => {
+        if (!sessionRef.current) {
+            startSession(nextAnswers);
+            return;
+        }
+        if (Object.keys(changes).length === 0) {
+            return;
+        }
+        const seq = ++previewSeqRef.current;
+        patchScoringSession(sessionRef.current, changes)
+            .then(data => {
+                if (!data) {
+                    // Expired: start over with all answers
+                    sessionRef.current = null;
+                    startSession(nextAnswers);
+                } else if (seq === previewSeqRef.current) {
+                    setPreview(data.result);
+                }
+            })
+            .catch(() => {});
+    };
+
+    const updatePreview = (questionId, value, nextAnswers) => {
+        sendChanges({ [questionId]: value }, nextAnswers);
+    };
+
+    const endSession = () => {
+        if (sessionRef.current) {
+            deleteScoringSession(sessionRef.current).catch(() => {});
+            sessionRef.current = null;
+        } else if (creatingRef.current) {
+            discardRef.current = true;
+        }
+    };
+
     const handleFillDebugData = () => {
         const a_scores = [1, 1, 2, 3, 3, 1, 4, 4, 3, 3, 2, 3, 2, 4, 3, 3, 4];
         const b_scores = [1, 1, 1, 2, 3, 3, 4, 4, 4, 3, 3, 4, 4, 4, 3, 3, 2, 2, 2, 2, 3, 4, 3, 4, 2, 3, 3, 3, 3];
@@ -33,6 +124,7 @@ const Questionnaire = ({ gender, onComplete }) => {
         d_scores.forEach((score, i) => debugAnswers[`D${i + 1}`] = score);
 
         setAnswers(debugAnswers);
+        sendChanges(answerChanges(answers, debugAnswers), debugAnswers);
     };
 
     useEffect(() => {
@@ -47,11 +139,18 @@ const Questionnaire = ({ gender, onComplete }) => {
             });
     }, []);
 
+    useEffect(() => {
+        startSession({});
+        return endSession;
+        // The session helpers only read refs and gender
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [gender]);
+
     const handleOptionChange = (questionId, value) => {
-        setAnswers(prev => ({
-            ...prev,
-            [questionId]: parseInt(value, 10)
-        }));
+        const answer = parseInt(value, 10);
+        const nextAnswers = { ...answers, [questionId]: answer };
+        setAnswers(nextAnswers);
+        updatePreview(questionId, answer, nextAnswers);
     };
 
     const currentSection = SECTIONS[currentSectionIndex];
@@ -131,6 +230,12 @@ const Questionnaire = ({ gender, onComplete }) => {
                     <div style={{ width: '100%', height: '10px', background: '#eee', borderRadius: '5px', overflow: 'hidden' }}>
                         <div style={{ width: `${progress}%`, height: '100%', background: themeColor, transition: 'width 0.3s' }}></div>
                     </div>
+                    {preview && (
+                        <p style={{ margin: '0.5rem 0 0', color: '#666', fontSize: '0.9rem' }}>
+                            중간 결과: 고스트레스 기준 {preview.high_stress ? '해당' : '비해당'}
+                            {' '}(A {preview.summary_scores.sum_a} · B {preview.summary_scores.sum_b} · C {preview.summary_scores.sum_c})
+                        </p>
+                    )}
                 </div>
 
                 <div style={{ paddingBottom: '0.5rem', borderBottom: `2px solid ${themeColor}` }}>